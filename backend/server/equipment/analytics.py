@@ -0,0 +1,295 @@
+"""Vectorized statistics over a dataset's equipment rows."""
+
+import math
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Max, Min, Value
+from django.db.models.functions import Floor, Least
+
+from .models import Equipment
+
+
+PARAMETERS = ['flowrate', 'pressure', 'temperature']
+PERCENTILES = [5, 25, 50, 75, 95]
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def dataset_cache_key(dataset, name, *parts):
+    """Build the cache key for a value derived from ``dataset`` at its current revision."""
+    return ':'.join(['dataset', str(dataset.pk), f'r{dataset.revision}', name, *(str(part) for part in parts)])
+
+
+def cached(dataset, name, compute, *parts):
+    """Return the cached value for ``dataset``/``name``, computing and storing it on a miss."""
+    key = dataset_cache_key(dataset, name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, CACHE_TIMEOUT)
+    return value
+
+
+def batch_aggregates(frame):
+    """Running aggregates (count, mean, M2, min, max per parameter, type counts) for a batch of rows."""
+    count = len(frame)
+    if not count:
+        return {}
+    result = {'count': count, 'type_counts': {
+        str(equipment_type): int(n) for equipment_type, n in frame['equipment_type'].value_counts(sort=False).items()
+    }}
+    for parameter in PARAMETERS:
+        values = frame[parameter].to_numpy(dtype=float)
+        mean = values.mean()
+        result[parameter] = {
+            'mean': float(mean),
+            'm2': float(np.square(values - mean).sum()),
+            'min': float(values.min()),
+            'max': float(values.max()),
+        }
+    return result
+
+
+def merge_aggregates(current, batch):
+    """Combine two sets of running aggregates with Chan et al.'s pairwise update.
+
+    Only the stored moments are touched, so appending a batch costs O(batch) no matter how
+    many rows the dataset already holds, and the result matches a two-pass computation
+    over all rows up to floating-point rounding.
+    """
+    if not current:
+        return batch
+    if not batch:
+        return current
+    n_a, n_b = current['count'], batch['count']
+    count = n_a + n_b
+    type_counts = dict(current['type_counts'])
+    for equipment_type, n in batch['type_counts'].items():
+        type_counts[equipment_type] = type_counts.get(equipment_type, 0) + n
+    result = {'count': count, 'type_counts': type_counts}
+    for parameter in PARAMETERS:
+        a, b = current[parameter], batch[parameter]
+        delta = b['mean'] - a['mean']
+        result[parameter] = {
+            'mean': a['mean'] + delta * n_b / count,
+            'm2': a['m2'] + b['m2'] + delta * delta * n_a * n_b / count,
+            'min': min(a['min'], b['min']),
+            'max': max(a['max'], b['max']),
+        }
+    return result
+
+
+def describe_aggregates(aggregates):
+    """Turn running aggregates into mean/std (sample)/min/max per parameter."""
+    count = aggregates['count']
+    return {
+        parameter: {
+            'mean': aggregates[parameter]['mean'],
+            'std': math.sqrt(aggregates[parameter]['m2'] / (count - 1)) if count > 1 else None,
+            'min': aggregates[parameter]['min'],
+            'max': aggregates[parameter]['max'],
+        }
+        for parameter in PARAMETERS
+    }
+
+
+def equipment_frame(queryset, fields=('equipment_type', *PARAMETERS)):
+    """Load ``fields`` from ``queryset`` into a DataFrame without building model instances."""
+    rows = queryset.order_by().values_list(*fields).iterator(chunk_size=10000)
+    frame = pd.DataFrame.from_records(rows, columns=list(fields))
+    if 'equipment_type' in frame:
+        frame['equipment_type'] = frame['equipment_type'].astype('category')
+    return frame
+
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _describe(aggregates, quantiles, count):
+    """Shape one row of aggregates and quantiles into ``{parameter: {stat: value}}``."""
+    result = {'count': int(count)}
+    for parameter in PARAMETERS:
+        stats = {stat: _clean(aggregates[(parameter, stat)]) for stat in ('min', 'max', 'mean', 'std')}
+        for pct in PERCENTILES:
+            stats[f'p{pct}'] = _clean(quantiles[(pct / 100, parameter)])
+        result[parameter] = stats
+    return result
+
+
+def type_statistics(frame):
+    """Return overall and per-type min/max/mean/std/percentiles for every parameter."""
+    quantile_levels = [pct / 100 for pct in PERCENTILES]
+    aggregations = ['min', 'max', 'mean', 'std']
+
+    overall_aggregates = frame[PARAMETERS].agg(aggregations).unstack()
+    overall_quantiles = frame[PARAMETERS].quantile(quantile_levels).stack()
+
+    grouped = frame.groupby('equipment_type', observed=True, sort=True)
+    type_aggregates = grouped[PARAMETERS].agg(aggregations)
+    type_quantiles = grouped[PARAMETERS].quantile(quantile_levels).stack()
+    type_counts = grouped.size()
+
+    return {
+        'total_count': len(frame),
+        'percentiles': PERCENTILES,
+        'overall': _describe(overall_aggregates, overall_quantiles, len(frame)),
+        'types': {
+            str(equipment_type): _describe(
+                type_aggregates.loc[equipment_type], type_quantiles.loc[equipment_type], type_counts[equipment_type]
+            )
+            for equipment_type in type_counts.index
+        },
+    }
+
+
+def histogram(frame, parameter, bins=None, edges=None, group_by_type=False):
+    """Count ``parameter`` values into bins in one vectorized pass, optionally split by type.
+
+    Either ``bins`` (equal-width bins over the data range) or explicit ``edges`` must be
+    given. As with ``numpy.histogram``, bins are half-open except the last, which includes
+    its right edge, and values outside the edges are not counted.
+    """
+    values = frame[parameter].to_numpy(dtype=float)
+    edges = np.asarray(edges, dtype=float) if edges is not None else np.histogram_bin_edges(values, bins)
+    bin_count = len(edges) - 1
+
+    index = np.searchsorted(edges, values, side='right') - 1
+    index[values == edges[-1]] = bin_count - 1
+    inside = (index >= 0) & (index < bin_count)
+    index = index[inside]
+
+    result = {
+        'parameter': parameter,
+        'edges': edges.tolist(),
+        'counts': np.bincount(index, minlength=bin_count).tolist(),
+        'total': int(inside.sum()),
+    }
+    if group_by_type:
+        types = frame['equipment_type'].cat.categories
+        codes = frame['equipment_type'].cat.codes.to_numpy()[inside]
+        grid = np.bincount(codes * bin_count + index, minlength=len(types) * bin_count)
+        result['groups'] = {
+            str(equipment_type): counts.tolist()
+            for equipment_type, counts in zip(types, grid.reshape(len(types), bin_count))
+        }
+    return result
+
+
+def row_envelope(queryset, start, stop, buckets):
+    """Minimum and maximum of every parameter per bucket of consecutive rows ``start:stop``.
+
+    Rows are taken in upload (id) order and split into at most ``buckets`` buckets of
+    ``step`` rows. Buckets begin at multiples of ``step``, so ranges that overlap share
+    their buckets; ``start`` is moved back to the first one. At ``step`` 1 the buckets are
+    the rows themselves and their names are included.
+    """
+    step = max(-(-(stop - start) // buckets), 1)
+    start -= start % step
+    fields = ('equipment_name', *PARAMETERS) if step == 1 else tuple(PARAMETERS)
+    rows = queryset.order_by('id').values_list(*fields)[start:stop]
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=10000), columns=list(fields))
+
+    count = len(frame)
+    firsts = np.arange(0, count, step)
+    lasts = np.minimum(firsts + step, count) - 1
+    result = {
+        'start': start,
+        'stop': start + count,
+        'step': step,
+        'x': (start + (firsts + lasts) / 2).tolist(),
+        'parameters': {},
+    }
+    for parameter in PARAMETERS:
+        values = frame[parameter].to_numpy(dtype=float)
+        result['parameters'][parameter] = {
+            'min': np.minimum.reduceat(values, firsts).tolist() if count else [],
+            'max': np.maximum.reduceat(values, firsts).tolist() if count else [],
+        }
+    if step == 1:
+        result['names'] = frame['equipment_name'].tolist()
+    return result
+
+
+def bin_expression(parameter, low, high, bins):
+    """SQL expression placing ``parameter`` into one of ``bins`` equal-width bins over [low, high]."""
+    width = (high - low) / bins or 1.0
+    offset = ExpressionWrapper((F(parameter) - Value(low)) / Value(width), output_field=FloatField())
+    return Least(Floor(offset), Value(float(bins - 1)))
+
+
+def compare_datasets(datasets, bins):
+    """Build aligned, chart-ready comparison data for ``datasets`` with a fixed number of queries."""
+    ids = [dataset.id for dataset in datasets]
+    equipment = Equipment.objects.filter(dataset_id__in=ids).order_by()
+
+    aggregates = {}
+    for stat, function in (('avg', Avg), ('min', Min), ('max', Max)):
+        for parameter in PARAMETERS:
+            aggregates[f'{stat}_{parameter}'] = function(parameter)
+    per_dataset = {
+        row.pop('dataset_id'): row
+        for row in equipment.values('dataset_id').annotate(total_count=Count('id'), **aggregates)
+    }
+
+    per_type = {}
+    type_aggregates = {f'avg_{parameter}': Avg(parameter) for parameter in PARAMETERS}
+    for row in equipment.values('dataset_id', 'equipment_type').annotate(count=Count('id'), **type_aggregates):
+        per_type[(row['dataset_id'], row['equipment_type'])] = row
+    types = sorted({equipment_type for _, equipment_type in per_type})
+
+    summaries = []
+    for dataset in datasets:
+        row = per_dataset.get(dataset.id, {'total_count': 0})
+        summaries.append({
+            'id': dataset.id,
+            'name': dataset.name,
+            'uploaded_at': dataset.uploaded_at,
+            'total_count': row['total_count'],
+            **{key: row.get(key) for key in aggregates},
+        })
+
+    baseline = ids[0]
+    type_counts, type_means, deltas = {}, {parameter: {} for parameter in PARAMETERS}, {}
+    for equipment_type in types:
+        rows = [per_type.get((dataset_id, equipment_type)) for dataset_id in ids]
+        counts = [row['count'] if row else 0 for row in rows]
+        type_counts[equipment_type] = counts
+        type_deltas = {'count': [count - counts[0] for count in counts]}
+        for parameter in PARAMETERS:
+            means = [row[f'avg_{parameter}'] if row else None for row in rows]
+            type_means[parameter][equipment_type] = means
+            type_deltas[parameter] = [
+                None if mean is None or means[0] is None else mean - means[0] for mean in means
+            ]
+        deltas[equipment_type] = type_deltas
+
+    distributions = {}
+    for parameter in PARAMETERS:
+        lows = [row[f'min_{parameter}'] for row in per_dataset.values()]
+        highs = [row[f'max_{parameter}'] for row in per_dataset.values()]
+        if not lows:
+            distributions[parameter] = {'edges': [], 'counts': [[] for _ in ids]}
+            continue
+        low, high = min(lows), max(highs)
+        counts = {dataset_id: [0] * bins for dataset_id in ids}
+        binned = equipment.annotate(bin=bin_expression(parameter, low, high, bins))
+        for row in binned.values('dataset_id', 'bin').annotate(count=Count('id')):
+            counts[row['dataset_id']][int(row['bin'])] = row['count']
+        distributions[parameter] = {
+            'edges': np.linspace(low, high, bins + 1).tolist(),
+            'counts': [counts[dataset_id] for dataset_id in ids],
+        }
+
+    return {
+        'baseline_id': baseline,
+        'labels': [dataset.name for dataset in datasets],
+        'datasets': summaries,
+        'types': types,
+        'type_counts': type_counts,
+        'type_means': type_means,
+        'deltas': deltas,
+        'distributions': distributions,
+    }
@@ -0,0 +1,45 @@
+"""ETags for responses derived from a single dataset.
+
+Everything served for a dataset (details, summary, stats, histograms, reports) only changes
+when the dataset does, and every change bumps its ``revision``. The ETag is therefore built
+from the dataset's id, upload time and revision plus the request path, so a conditional GET
+is answered with a 304 after the one query that loads the dataset, before anything is
+computed. Other GETs get content-hash ETags from ``ConditionalGetMiddleware``.
+"""
+
+import functools
+import hashlib
+
+from django.utils.cache import get_conditional_response
+
+
+def dataset_etag(request, dataset):
+    """ETag for the response to ``request`` about ``dataset`` at its current revision."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = ':'.join([
+        str(dataset.pk),
+        dataset.uploaded_at.isoformat(),
+        str(dataset.revision),
+        request.get_full_path(),
+        getattr(renderer, 'format', ''),
+    ])
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"'
+
+
+def revision_etag(view):
+    """Serve conditional GETs of a detail action from the dataset's revision.
+
+    The viewset's ``get_object`` must cache its result, so the action reuses the dataset
+    loaded here instead of querying again.
+    """
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        etag = dataset_etag(request, self.get_object())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = view(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        return response
+    return wrapper
@@ -0,0 +1,122 @@
+"""Streaming exports of a dataset's equipment rows.
+
+Rows are read in fixed-size chunks and written out as they arrive, so memory stays bounded
+by ``EXPORT_CHUNK_SIZE`` whatever the dataset size.
+"""
+
+import csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+from .instrumentation import phase
+
+
+EXPORT_CHUNK_SIZE = 10000
+# Same headers the upload endpoint expects, so an export can be uploaded again as is.
+EXPORT_COLUMNS = {
+    'equipment_name': 'Equipment Name',
+    'equipment_type': 'Type',
+    'flowrate': 'Flowrate',
+    'pressure': 'Pressure',
+    'temperature': 'Temperature',
+}
+
+
+def export_rows(queryset):
+    """Yield export rows in id order, fetched ``EXPORT_CHUNK_SIZE`` at a time."""
+    return queryset.order_by('id').values_list(*EXPORT_COLUMNS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the value straight back."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """Yield the CSV export in chunks of ``EXPORT_CHUNK_SIZE`` lines."""
+    writer = csv.writer(_Echo())
+    lines = [writer.writerow(EXPORT_COLUMNS.values())]
+    for row in export_rows(queryset):
+        lines.append(writer.writerow(row))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def parquet_available():
+    return pq is not None
+
+
+class _ChunkSink:
+    """Write-only file that collects bytes until ``drain`` is called."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('equipment_name', pa.string()),
+        ('equipment_type', pa.dictionary(pa.int32(), pa.string())),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+
+
+def stream_parquet(queryset):
+    """Yield a Parquet file with one row group per ``EXPORT_CHUNK_SIZE`` rows."""
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    def row_group(rows):
+        with phase('parquet_encode'):
+            columns = list(zip(*rows))
+            arrays = [
+                pa.array(columns[0], pa.string()),
+                pa.array(columns[1], pa.string()).dictionary_encode(),
+                *(pa.array(values, pa.float64()) for values in columns[2:]),
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        return sink.drain()
+
+    rows = []
+    for row in export_rows(queryset):
+        rows.append(row)
+        if len(rows) >= EXPORT_CHUNK_SIZE:
+            yield row_group(rows)
+            rows = []
+    if rows:
+        yield row_group(rows)
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,51 @@
+from rest_framework import filters, serializers
+
+from .analytics import PARAMETERS
+
+
+RANGE_LOOKUPS = ['gt', 'gte', 'lt', 'lte']
+
+
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class EquipmentFilterBackend(filters.BaseFilterBackend):
+    """Filter equipment rows by dataset, type (single or repeated) and numeric ranges.
+
+    Supported query parameters: ``dataset=1,2``, ``type=Pump&type=Valve`` and
+    ``<parameter>__<lookup>=<number>`` for flowrate, pressure and temperature with
+    gt, gte, lt and lte lookups (e.g. ``pressure__gt=5``). Types are matched as given,
+    so a type containing a comma is still one type.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        errors = {}
+
+        if 'dataset' in params:
+            try:
+                queryset = queryset.filter(dataset_id__in=[int(value) for value in _split(params['dataset'])])
+            except ValueError:
+                errors['dataset'] = 'Must be an integer or a comma-separated list of integers.'
+
+        if 'type' in params:
+            types = params.getlist('type')
+            if len(types) == 1:
+                queryset = queryset.filter(equipment_type=types[0])
+            else:
+                queryset = queryset.filter(equipment_type__in=types)
+
+        for parameter in PARAMETERS:
+            for lookup in RANGE_LOOKUPS:
+                key = f'{parameter}__{lookup}'
+                if key not in params:
+                    continue
+                try:
+                    queryset = queryset.filter(**{key: float(params[key])})
+                except ValueError:
+                    errors[key] = 'Must be a number.'
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return queryset
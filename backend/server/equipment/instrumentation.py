@@ -0,0 +1,208 @@
+"""Request timing instrumentation: Server-Timing phases and Prometheus metrics.
+
+Enable with ``INSTRUMENTATION_ENABLED=True``. When disabled the middleware removes
+itself from the stack and ``phase()`` returns a shared no-op context manager, so the
+only cost left in the views is one context-variable lookup per phase.
+
+Metrics are kept in process memory; with several gunicorn workers each worker
+exposes its own counters. ``/metrics`` answers only staff users (session or token) and
+clients whose address is in ``METRICS_ALLOWED_IPS``.
+
+Streaming responses are timed until their last chunk is sent: phases entered while the
+body is generated count, and the generation itself is the ``stream`` phase. Their
+``Server-Timing`` header goes out before the body, so it only covers the time until the
+response started; the metrics include the whole request.
+"""
+
+import ipaddress
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_PHASE = nullcontext()
+_request_phases = ContextVar('request_phases', default=None)
+
+
+class _Phase:
+    """Context manager adding its elapsed time to the current request's phases."""
+
+    __slots__ = ('phases', 'name', 'started')
+
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.started
+
+
+def phase(name):
+    """Time a named phase of the current request (e.g. ``csv_parse``, ``pdf_build``)."""
+    phases = _request_phases.get()
+    if phases is None:
+        return _NULL_PHASE
+    return _Phase(phases, name)
+
+
+class MetricsRegistry:
+    """Thread-safe per-endpoint counters, latency histograms and phase totals."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.phases = {}
+
+    def observe(self, endpoint, method, status, duration, phases):
+        with self.lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += duration
+            histogram['count'] += 1
+
+            for name, seconds in phases.items():
+                totals = self.phases.setdefault((endpoint, name), [0.0, 0])
+                totals[0] += seconds
+                totals[1] += 1
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self.lock:
+            lines = [
+                '# HELP equipment_http_requests_total Requests handled, by endpoint, method and status.',
+                '# TYPE equipment_http_requests_total counter',
+            ]
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'equipment_http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+                )
+
+            lines += [
+                '# HELP equipment_http_request_duration_seconds Request latency, by endpoint.',
+                '# TYPE equipment_http_request_duration_seconds histogram',
+            ]
+            for endpoint, histogram in sorted(self.latency.items()):
+                for bound, count in zip(LATENCY_BUCKETS, histogram['buckets']):
+                    lines.append(
+                        f'equipment_http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'equipment_http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram["count"]}'
+                )
+                lines.append(f'equipment_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram["sum"]:.6f}')
+                lines.append(f'equipment_http_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram["count"]}')
+
+            lines += [
+                '# HELP equipment_phase_duration_seconds Time spent in named request phases.',
+                '# TYPE equipment_phase_duration_seconds summary',
+            ]
+            for (endpoint, name), (total, count) in sorted(self.phases.items()):
+                labels = f'endpoint="{endpoint}",phase="{name}"'
+                lines.append(f'equipment_phase_duration_seconds_sum{{{labels}}} {total:.6f}')
+                lines.append(f'equipment_phase_duration_seconds_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+class TimingMiddleware:
+    """Record per-request latency and phases, and emit a ``Server-Timing`` header."""
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        phases = {}
+        token = _request_phases.set(phases)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_phases.reset(token)
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        endpoint = match.view_name if match else 'unmatched'
+        entries = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in phases.items()]
+        entries.append(f'total;dur={duration * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(entries)
+
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._timed_stream(
+                response.streaming_content, phases, started, endpoint, request.method, response.status_code
+            )
+        else:
+            metrics.observe(endpoint, request.method, response.status_code, duration, phases)
+        return response
+
+    @staticmethod
+    def _timed_stream(chunks, phases, started, endpoint, method, status):
+        """Yield ``chunks`` with the request's phases active, recording metrics once the body is done."""
+        streamed = 0.0
+        try:
+            while True:
+                token = _request_phases.set(phases)
+                chunk_started = time.perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    streamed += time.perf_counter() - chunk_started
+                    _request_phases.reset(token)
+                yield chunk
+        finally:
+            phases['stream'] = phases.get('stream', 0.0) + streamed
+            metrics.observe(endpoint, method, status, time.perf_counter() - started, phases)
+
+
+def metrics_allowed(request):
+    """Whether ``request`` comes from an allow-listed address or a staff user."""
+    address = request.META.get('REMOTE_ADDR', '')
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        ip = None
+    if ip is not None and any(ip in ipaddress.ip_network(net, strict=False) for net in settings.METRICS_ALLOWED_IPS):
+        return True
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    try:
+        authenticated = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+def metrics_view(request):
+    """Expose collected metrics for Prometheus-compatible scrapers."""
+    if not settings.INSTRUMENTATION_ENABLED:
+        raise Http404
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,98 @@
+"""Compare default pandas CSV parsing with the typed parsing layer on wide, messy files."""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment.parsing import CSV_COLUMNS, pyarrow, read_equipment_csv
+
+
+TYPES = ['Centrifugal Pump', 'Heat Exchanger', 'Reactor', 'Compressor', 'Valve', 'Distillation Column']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark upload CSV parsing: default pd.read_csv vs. typed C and pyarrow engines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Rows in the generated CSV.')
+        parser.add_argument('--extra-columns', type=int, default=40,
+                            help='Unused columns mixed in with the required ones.')
+        parser.add_argument('--csv', help='Benchmark this file instead of a generated one.')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed parses per configuration.')
+
+    def handle(self, *args, **options):
+        if options['csv']:
+            if not os.path.exists(options['csv']):
+                raise CommandError(f'No such file: {options["csv"]}')
+            self.run(options['csv'], options['repeat'])
+            return
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        try:
+            started = time.perf_counter()
+            self.generate(path, options['rows'], options['extra_columns'])
+            self.stderr.write(
+                f'Generated {options["rows"]} rows x {options["extra_columns"] + len(CSV_COLUMNS)} columns '
+                f'({os.path.getsize(path) / 2**20:.1f} MiB) in {time.perf_counter() - started:.1f}s'
+            )
+            self.run(path, options['repeat'])
+        finally:
+            os.remove(path)
+
+    def generate(self, path, rows, extra_columns):
+        """Write a CSV shaped like real exports: many unused columns of mixed, dirty content."""
+        rng = np.random.default_rng(0)
+        columns = {}
+        for i in range(extra_columns):
+            kind = i % 5
+            if kind == 0:
+                values = pd.Series(rng.choice(['ok', 'n/a', '', 'check, later', 'Ölpumpe "alt"'], rows))
+            elif kind == 1:
+                values = pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10**7, rows), 's'))
+            elif kind == 2:
+                values = pd.Series(rng.integers(0, 10**6, rows)).astype(str).where(rng.random(rows) > 0.05, 'NULL')
+            elif kind == 3:
+                values = pd.Series(rng.normal(size=rows)).round(6).where(rng.random(rows) > 0.1)
+            else:
+                values = pd.Series([f'note {n} - free text' for n in rng.integers(0, 1000, rows)])
+            columns[f'extra_{i}'] = values
+        required = {
+            'Equipment Name': [f'EQ-{i:07d}' for i in range(rows)],
+            'Type': rng.choice(TYPES, rows),
+            'Flowrate': rng.uniform(50, 500, rows).round(3),
+            'Pressure': rng.uniform(1, 10, rows).round(3),
+            'Temperature': rng.uniform(20, 200, rows).round(3),
+        }
+        # Spread the required columns through the file rather than grouping them up front.
+        names = list(columns)
+        for offset, (name, values) in enumerate(required.items()):
+            names.insert((offset + 1) * len(names) // (len(required) + 1), name)
+            columns[name] = values
+        pd.DataFrame(columns)[names].to_csv(path, index=False)
+
+    def run(self, path, repeat):
+        configs = [('default read_csv', self.parse_default), ('typed, c', lambda f: read_equipment_csv(f, 'c'))]
+        if pyarrow is not None:
+            configs.append(('typed, pyarrow', lambda f: read_equipment_csv(f, 'pyarrow')))
+        else:
+            self.stderr.write('pyarrow is not installed; skipping the pyarrow engine.')
+
+        self.stdout.write(f'{"parser":<18}{"median s":>10}{"best s":>10}{"frame MiB":>11}')
+        for label, parse in configs:
+            timings = []
+            for _ in range(repeat):
+                with open(path, 'rb') as csv_file:
+                    started = time.perf_counter()
+                    frame = parse(csv_file)
+                    timings.append(time.perf_counter() - started)
+            memory = frame.memory_usage(deep=True).sum() / 2**20
+            self.stdout.write(f'{label:<18}{np.median(timings):>10.3f}{min(timings):>10.3f}{memory:>11.1f}')
+
+    def parse_default(self, csv_file):
+        """What upload_csv did before the parsing layer: infer every column, keep the whole frame."""
+        return pd.read_csv(csv_file)
@@ -0,0 +1,143 @@
+"""Compare concurrent upload/read throughput on SQLite with and without tuning pragmas."""
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from server.database import sqlite_pragmas
+
+
+SCHEMA = """
+CREATE TABLE equipment (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset_id INTEGER NOT NULL,
+    equipment_name TEXT NOT NULL,
+    equipment_type TEXT NOT NULL,
+    flowrate REAL NOT NULL,
+    pressure REAL NOT NULL,
+    temperature REAL NOT NULL
+);
+CREATE INDEX equipment_dataset ON equipment (dataset_id);
+"""
+TYPES = ['Pump', 'Valve', 'Reactor', 'Compressor', 'Heat Exchanger']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent writers and readers on SQLite, default settings vs. tuned pragmas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help='Threads inserting datasets.')
+        parser.add_argument('--readers', type=int, default=8, help='Threads running summary queries.')
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per inserted dataset.')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per configuration.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"config":<10}{"uploads/s":>12}{"reads/s":>10}{"write p95 ms":>14}{"read p95 ms":>13}{"errors":>8}'
+        )
+        for label, pragmas, isolation in [
+            ('default', [], ''),
+            ('tuned', sqlite_pragmas(), 'IMMEDIATE'),
+        ]:
+            result = self.run_config(pragmas, isolation, options)
+            self.stdout.write(
+                f'{label:<10}{result["uploads"] / options["duration"]:>12.1f}'
+                f'{result["reads"] / options["duration"]:>10.1f}'
+                f'{result["write_p95"]:>14.1f}{result["read_p95"]:>13.1f}{result["errors"]:>8}'
+            )
+
+    def connect(self, path, pragmas, isolation):
+        # Without tuning, sqlite3's default 5 s busy handler still applies, as it does for Django.
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=isolation)
+        for name, value in pragmas:
+            conn.execute(f'PRAGMA {name}={value}')
+        return conn
+
+    def run_config(self, pragmas, isolation, options):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        try:
+            setup = self.connect(path, pragmas, isolation)
+            setup.executescript(SCHEMA)
+            self.insert_dataset(setup, 0, options['rows'])
+            setup.commit()
+            setup.close()
+
+            stop = threading.Event()
+            lock = threading.Lock()
+            result = {'uploads': 0, 'reads': 0, 'errors': 0, 'write_times': [], 'read_times': []}
+
+            def record(kind, started):
+                with lock:
+                    result[kind + 's'] += 1
+                    result[('write' if kind == 'upload' else 'read') + '_times'].append(time.perf_counter() - started)
+
+            def writer(seed):
+                conn = self.connect(path, pragmas, isolation)
+                dataset_id = seed * 1_000_000
+                while not stop.is_set():
+                    dataset_id += 1
+                    started = time.perf_counter()
+                    try:
+                        with conn:
+                            self.insert_dataset(conn, dataset_id, options['rows'])
+                        record('upload', started)
+                    except sqlite3.OperationalError:
+                        with lock:
+                            result['errors'] += 1
+                conn.close()
+
+            def reader():
+                conn = self.connect(path, pragmas, isolation)
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        conn.execute(
+                            'SELECT COUNT(*), AVG(flowrate), AVG(pressure), AVG(temperature) '
+                            'FROM equipment WHERE dataset_id = 0'
+                        ).fetchone()
+                        conn.execute(
+                            'SELECT equipment_type, COUNT(*) FROM equipment WHERE dataset_id = 0 GROUP BY 1'
+                        ).fetchall()
+                        record('read', started)
+                    except sqlite3.OperationalError:
+                        with lock:
+                            result['errors'] += 1
+                conn.close()
+
+            threads = [threading.Thread(target=writer, args=(i + 1,)) for i in range(options['writers'])]
+            threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+            for thread in threads:
+                thread.start()
+            time.sleep(options['duration'])
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            result['write_p95'] = self.p95(result['write_times'])
+            result['read_p95'] = self.p95(result['read_times'])
+            return result
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def insert_dataset(self, conn, dataset_id, rows):
+        rng = random.Random(dataset_id)
+        conn.executemany(
+            'INSERT INTO equipment (dataset_id, equipment_name, equipment_type, flowrate, pressure, temperature) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                (dataset_id, f'EQ-{i}', rng.choice(TYPES), rng.uniform(50, 500), rng.uniform(1, 10), rng.uniform(20, 200))
+                for i in range(rows)
+            ],
+        )
+
+    def p95(self, samples):
+        return float(np.percentile(samples, 95) * 1000) if samples else float('nan')
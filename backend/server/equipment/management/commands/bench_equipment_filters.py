@@ -0,0 +1,109 @@
+"""Show that filtered equipment listings stay flat as datasets grow, thanks to the composite indexes."""
+
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from equipment.filters import EquipmentFilterBackend
+from equipment.models import Dataset, Equipment
+
+
+TYPES = ['Centrifugal Pump', 'Heat Exchanger', 'Reactor', 'Compressor', 'Valve', 'Distillation Column']
+QUERIES = {
+    'type+range': 'type=Heat Exchanger&pressure__gt=9.5&ordering=-pressure',
+    'range+sort': 'flowrate__gte=490&ordering=flowrate',
+    'type IN': 'type=Reactor&type=Valve&temperature__lt=25&ordering=temperature',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark /api/equipment/ filters on growing datasets, with and without the indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,500000',
+                            help='Comma-separated dataset sizes (rows) to seed and query.')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per query.')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run(sizes, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, sizes, repeat):
+        user = User.objects.create_user('bench', password='bench-password')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+
+        datasets = []
+        for size in sizes:
+            started = time.perf_counter()
+            datasets.append((size, self.seed(user, size)))
+            self.stderr.write(f'Seeded {size} rows in {time.perf_counter() - started:.1f}s')
+
+        indexed = self.measure(client, datasets, repeat)
+        self.stdout.write('Query plans with indexes:')
+        for name, query in QUERIES.items():
+            self.stdout.write(f'  {name}: {self.plan(datasets[-1][1], query)}')
+
+        with connection.schema_editor() as editor:
+            for index in Equipment._meta.indexes:
+                editor.remove_index(Equipment, index)
+        unindexed = self.measure(client, datasets, repeat)
+
+        self.stdout.write(f'\n{"query":<12}{"rows":>10}{"indexed p50 ms":>16}{"no index p50 ms":>17}')
+        for name in QUERIES:
+            for size, _ in datasets:
+                self.stdout.write(
+                    f'{name:<12}{size:>10}{indexed[name, size]:>16.2f}{unindexed[name, size]:>17.2f}'
+                )
+
+    def seed(self, user, rows):
+        dataset = Dataset.objects.create(name=f'bench-{rows}.csv', user=user, file='datasets/bench.csv')
+        rng = np.random.default_rng(rows)
+        types = rng.choice(TYPES, rows)
+        values = np.column_stack([rng.uniform(50, 500, rows), rng.uniform(1, 10, rows), rng.uniform(20, 200, rows)])
+        table = Equipment._meta.db_table
+        with connection.cursor() as cursor:
+            for start in range(0, rows, 50000):
+                stop = min(start + 50000, rows)
+                cursor.executemany(
+                    f'INSERT INTO {table} (dataset_id, equipment_name, equipment_type, flowrate, pressure, temperature) '
+                    'VALUES (%s, %s, %s, %s, %s, %s)',
+                    [
+                        (dataset.id, f'EQ-{i:07d}', types[i], *values[i].tolist())
+                        for i in range(start, stop)
+                    ],
+                )
+        return dataset
+
+    def measure(self, client, datasets, repeat):
+        results = {}
+        for name, query in QUERIES.items():
+            for size, dataset in datasets:
+                url = f'/api/equipment/?dataset={dataset.id}&{query}'
+                client.get(url)
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append(time.perf_counter() - started)
+                    assert response.status_code == 200, response.content
+                results[name, size] = float(np.median(timings) * 1000)
+        return results
+
+    def plan(self, dataset, query):
+        request = Request(APIRequestFactory().get(f'/?{query}'))
+        queryset = EquipmentFilterBackend().filter_queryset(request, Equipment.objects.filter(dataset=dataset), None)
+        return queryset.order_by(request.query_params['ordering']).explain().replace('\n', ' | ')
@@ -0,0 +1,335 @@
+"""Replay a concurrent mix of API calls against a locally running server."""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+
+ENDPOINTS = ['login', 'upload', 'list', 'detail', 'summary', 'report']
+DATASET_ENDPOINTS = {'detail', 'summary', 'report'}
+REQUEST_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError)
+DEFAULT_MIX = 'login=1,upload=1,list=4,detail=3,summary=3,report=1'
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1'}
+USER_PREFIX = 'loadtest-'
+USER_PASSWORD = 'loadtest-password'
+EQUIPMENT_TYPES = ['Centrifugal Pump', 'Shell and Tube', 'Plate', 'Reactor', 'Compressor', 'Valve']
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client on top of asyncio streams."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, headers=None, body=b''):
+        """Send a request and return ``(status, body)``, reconnecting once if the server closed us."""
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await self._roundtrip(method, path, headers or {}, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _roundtrip(self, method, path, headers, body):
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(body)}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Server closed the connection')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            payload = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            payload = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            payload = await self.reader.read()
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+class VirtualUser:
+    """One provisioned account replaying requests over its own connection."""
+
+    def __init__(self, username, token, connection, api_path):
+        self.username = username
+        self.token = token
+        self.connection = connection
+        self.api_path = api_path
+        self.dataset_ids = []
+
+    @property
+    def auth_headers(self):
+        return {'Authorization': f'Token {self.token}'}
+
+    async def call(self, endpoint, csv_payload, rng):
+        """Issue one request for ``endpoint`` and return its HTTP status."""
+        if endpoint == 'login':
+            body = json.dumps({'username': self.username, 'password': USER_PASSWORD}).encode()
+            status, _ = await self.connection.request(
+                'POST', f'{self.api_path}/auth/login/', {'Content-Type': 'application/json'}, body
+            )
+        elif endpoint == 'upload':
+            boundary = uuid.uuid4().hex
+            body = (
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="file"; filename="{self.username}.csv"\r\n'
+                'Content-Type: text/csv\r\n\r\n'
+            ).encode() + csv_payload + f'\r\n--{boundary}--\r\n'.encode()
+            headers = dict(self.auth_headers, **{'Content-Type': f'multipart/form-data; boundary={boundary}'})
+            status, payload = await self.connection.request('POST', f'{self.api_path}/upload/', headers, body)
+            if status == 201:
+                self.dataset_ids = (self.dataset_ids + [json.loads(payload)['id']])[-5:]
+        elif endpoint == 'list':
+            status, _ = await self.connection.request('GET', f'{self.api_path}/datasets/', self.auth_headers)
+        else:
+            if not self.dataset_ids:
+                raise LookupError(f'{self.username} has no dataset to request {endpoint!r} for')
+            dataset_id = rng.choice(self.dataset_ids)
+            suffix = '' if endpoint == 'detail' else f'{endpoint}/'
+            status, _ = await self.connection.request(
+                'GET', f'{self.api_path}/datasets/{dataset_id}/{suffix}', self.auth_headers
+            )
+        return status
+
+
+class Command(BaseCommand):
+    help = 'Load-test a local API server with concurrent virtual users and report latency percentiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000/api',
+                            help='API root of the server under test (must be localhost).')
+        parser.add_argument('--users', type=int, default=10,
+                            help='Number of test users to provision; each one is a concurrent client.')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Total number of timed requests across all users.')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help=f'Weighted endpoint mix, e.g. "{DEFAULT_MIX}".')
+        parser.add_argument('--rows', type=int, default=200,
+                            help='Rows in the generated CSV used for uploads.')
+        parser.add_argument('--csv', help='Upload this CSV file instead of a generated one.')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+        parser.add_argument('--keep-users', action='store_true',
+                            help='Do not delete the provisioned users (and their datasets) afterwards.')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['base_url'])
+        if url.scheme != 'http' or url.hostname not in LOCAL_HOSTS:
+            raise CommandError('loadtest only runs against a plain-http localhost server.')
+        if options['users'] < 1 or options['requests'] < 1:
+            raise CommandError('--users and --requests must be positive.')
+        mix = self.parse_mix(options['mix'])
+        csv_payload = self.load_csv(options)
+
+        tokens = self.provision_users(options['users'])
+        try:
+            results, elapsed = asyncio.run(self.run(url, tokens, mix, csv_payload, options))
+        finally:
+            if not options['keep_users']:
+                User.objects.filter(username__in=[username for username, _ in tokens]).delete()
+
+        self.report(results, elapsed, options['json'])
+
+    def parse_mix(self, spec):
+        mix = {}
+        for part in spec.split(','):
+            name, _, weight = part.strip().partition('=')
+            if name not in ENDPOINTS:
+                raise CommandError(f'Unknown endpoint in mix: {name!r} (choose from {", ".join(ENDPOINTS)})')
+            try:
+                mix[name] = float(weight or 1)
+            except ValueError:
+                raise CommandError(f'Invalid weight for {name!r}: {weight!r}')
+        if not any(weight > 0 for weight in mix.values()):
+            raise CommandError('The mix needs at least one endpoint with a positive weight.')
+        return mix
+
+    def load_csv(self, options):
+        if options['csv']:
+            with open(options['csv'], 'rb') as f:
+                return f.read()
+        rng = random.Random(options['seed'])
+        lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+        for i in range(options['rows']):
+            lines.append(
+                f'EQ-{i:05d},{rng.choice(EQUIPMENT_TYPES)},'
+                f'{rng.uniform(50, 500):.2f},{rng.uniform(1, 10):.2f},{rng.uniform(20, 200):.2f}'
+            )
+        return ('\n'.join(lines) + '\n').encode()
+
+    def provision_users(self, count):
+        """Create ``count`` test users sharing one password hash and return their tokens."""
+        run_id = uuid.uuid4().hex[:8]
+        password = make_password(USER_PASSWORD)
+        User.objects.bulk_create([
+            User(username=f'{USER_PREFIX}{run_id}-{i}', password=password) for i in range(count)
+        ])
+        users = User.objects.filter(username__startswith=f'{USER_PREFIX}{run_id}-').order_by('id')
+        tokens = Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+        self.stderr.write(f'Provisioned {len(tokens)} users ({USER_PREFIX}{run_id}-*)')
+        return [(token.user.username, token.key) for token in tokens]
+
+    async def run(self, url, tokens, mix, csv_payload, options):
+        port = url.port or 80
+        users = [
+            VirtualUser(username, key, HttpConnection(url.hostname, port), url.path.rstrip('/'))
+            for username, key in tokens
+        ]
+        endpoints, weights = zip(*mix.items())
+        results = {endpoint: {'latencies': [], 'errors': 0, 'skipped': 0} for endpoint in ENDPOINTS}
+        remaining = [options['requests']]
+        timeout = options['timeout']
+
+        # Give every user a dataset up front so detail/summary/report have something to hit.
+        try:
+            statuses = await asyncio.gather(*(
+                asyncio.wait_for(user.call('upload', csv_payload, None), timeout) for user in users
+            ))
+        except REQUEST_ERRORS as e:
+            await asyncio.gather(*(user.connection.close() for user in users))
+            raise CommandError(
+                f'Could not upload the initial datasets to {url.geturl()}: {e!r}. Is the server running?'
+            )
+        failed = [status for status in statuses if status != 201]
+        if failed:
+            await asyncio.gather(*(user.connection.close() for user in users))
+            raise CommandError(
+                f'{len(failed)} of {len(users)} initial uploads to {url.geturl()} failed (HTTP {failed[0]}).'
+            )
+
+        async def ensure_dataset(user):
+            """Re-upload, untimed, for a user whose datasets are all gone; False if that fails too."""
+            if not user.dataset_ids:
+                try:
+                    await asyncio.wait_for(user.call('upload', csv_payload, None), timeout)
+                except REQUEST_ERRORS:
+                    await user.connection.close()
+            return bool(user.dataset_ids)
+
+        async def worker(user, rng):
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                endpoint = rng.choices(endpoints, weights)[0]
+                bucket = results[endpoint]
+                if endpoint in DATASET_ENDPOINTS and not await ensure_dataset(user):
+                    bucket['skipped'] += 1
+                    continue
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(user.call(endpoint, csv_payload, rng), timeout)
+                except REQUEST_ERRORS:
+                    status = None
+                    await user.connection.close()
+                bucket['latencies'].append(time.perf_counter() - started)
+                if status is None or status >= 400:
+                    bucket['errors'] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            worker(user, random.Random(options['seed'] + i)) for i, user in enumerate(users)
+        ))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(user.connection.close() for user in users))
+        return results, elapsed
+
+    def report(self, results, elapsed, as_json):
+        rows = []
+        all_latencies = []
+        total_errors = total_skipped = 0
+        for endpoint in ENDPOINTS:
+            latencies, errors, skipped = (results[endpoint][key] for key in ('latencies', 'errors', 'skipped'))
+            if not latencies and not skipped:
+                continue
+            all_latencies += latencies
+            total_errors += errors
+            total_skipped += skipped
+            rows.append(self.summarize(endpoint, latencies, errors, skipped, elapsed))
+        rows.append(self.summarize('total', all_latencies, total_errors, total_skipped, elapsed))
+
+        if as_json:
+            self.stdout.write(json.dumps({'elapsed_s': round(elapsed, 3), 'endpoints': rows}, indent=2))
+            return
+
+        header = (
+            f'{"endpoint":<10}{"requests":>10}{"errors":>8}{"skipped":>9}{"req/s":>10}'
+            f'{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in rows:
+            timings = ''.join(
+                f'{"-":>10}' if row[key] is None else f'{row[key]:>10.1f}'
+                for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+            )
+            self.stdout.write(
+                f'{row["endpoint"]:<10}{row["requests"]:>10}{row["errors"]:>8}{row["skipped"]:>9}'
+                f'{row["throughput"]:>10.1f}{timings}'
+            )
+        self.stdout.write(f'\nElapsed: {elapsed:.2f}s')
+
+    def summarize(self, endpoint, latencies, errors, skipped, elapsed):
+        """Latency statistics for one endpoint; requests skipped for lack of a dataset are only counted."""
+        millis = np.asarray(latencies) * 1000
+        if not len(millis):
+            mean = p50 = p95 = p99 = None
+        else:
+            mean = float(millis.mean())
+            p50, p95, p99 = (float(value) for value in np.percentile(millis, [50, 95, 99]))
+        return {
+            'endpoint': endpoint,
+            'requests': len(latencies),
+            'errors': errors,
+            'skipped': skipped,
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            'mean_ms': mean,
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
+        }
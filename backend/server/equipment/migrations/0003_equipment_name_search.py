@@ -0,0 +1,75 @@
+import logging
+
+from django.db import migrations, transaction
+from django.db.utils import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    # Matches the UPPER(...) LIKE expression Django emits for icontains/istartswith.
+    'CREATE INDEX IF NOT EXISTS equipment_name_trgm_idx ON equipment_equipment '
+    'USING gin (UPPER(equipment_name) gin_trgm_ops)',
+]
+POSTGRES_REVERSE = ['DROP INDEX IF EXISTS equipment_name_trgm_idx']
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE equipment_search USING fts5("
+    "equipment_name, content='equipment_equipment', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER equipment_search_insert AFTER INSERT ON equipment_equipment BEGIN "
+    "INSERT INTO equipment_search(rowid, equipment_name) VALUES (new.id, new.equipment_name); END",
+    "CREATE TRIGGER equipment_search_delete AFTER DELETE ON equipment_equipment BEGIN "
+    "INSERT INTO equipment_search(equipment_search, rowid, equipment_name) "
+    "VALUES ('delete', old.id, old.equipment_name); END",
+    "CREATE TRIGGER equipment_search_update AFTER UPDATE OF equipment_name ON equipment_equipment BEGIN "
+    "INSERT INTO equipment_search(equipment_search, rowid, equipment_name) "
+    "VALUES ('delete', old.id, old.equipment_name); "
+    "INSERT INTO equipment_search(rowid, equipment_name) VALUES (new.id, new.equipment_name); END",
+    "INSERT INTO equipment_search(equipment_search) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS equipment_search_insert',
+    'DROP TRIGGER IF EXISTS equipment_search_delete',
+    'DROP TRIGGER IF EXISTS equipment_search_update',
+    'DROP TABLE IF EXISTS equipment_search',
+]
+
+
+def _run(schema_editor, statements):
+    # Search indexes are an optimisation: if the extension or FTS5 trigram tokenizer is
+    # unavailable, leave the schema as is and let search fall back to plain LIKE queries.
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for statement in statements:
+                schema_editor.execute(statement)
+    except DatabaseError as exc:
+        logger.warning('Equipment name search index unavailable, searches fall back to LIKE scans: %s', exc)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_equipment_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
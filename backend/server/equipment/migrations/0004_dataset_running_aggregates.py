@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:54
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Min, Variance
+
+
+PARAMETERS = ['flowrate', 'pressure', 'temperature']
+
+
+def backfill_aggregates(apps, schema_editor):
+    Dataset = apps.get_model('equipment', 'Dataset')
+    Equipment = apps.get_model('equipment', 'Equipment')
+    for dataset in Dataset.objects.all():
+        rows = Equipment.objects.filter(dataset=dataset).order_by()
+        functions = {'count': Count('id')}
+        for parameter in PARAMETERS:
+            functions.update({
+                f'{parameter}_mean': Avg(parameter),
+                f'{parameter}_var': Variance(parameter),
+                f'{parameter}_min': Min(parameter),
+                f'{parameter}_max': Max(parameter),
+            })
+        values = rows.aggregate(**functions)
+        if not values['count']:
+            continue
+        aggregates = {
+            'count': values['count'],
+            'type_counts': dict(rows.values_list('equipment_type').annotate(count=Count('id'))),
+        }
+        for parameter in PARAMETERS:
+            aggregates[parameter] = {
+                'mean': values[f'{parameter}_mean'],
+                # Population variance times n is the sum of squared deviations.
+                'm2': values[f'{parameter}_var'] * values['count'],
+                'min': values[f'{parameter}_min'],
+                'max': values[f'{parameter}_max'],
+            }
+        dataset.aggregates = aggregates
+        dataset.save(update_fields=['aggregates'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_equipment_name_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='aggregates',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -8,6 +10,11 @@ class Dataset(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='datasets')
     file = models.FileField(upload_to='datasets/')
+    # Running count/mean/M2/min/max per parameter and type counts, merged on every append
+    # (see analytics.merge_aggregates) so summaries never re-read the equipment rows.
+    aggregates = models.JSONField(default=dict, blank=True)
+    # Bumped whenever rows are added; part of every derived cache key.
+    revision = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['-uploaded_at']
@@ -25,5 +32,30 @@ class Equipment(models.Model):
     pressure = models.FloatField()
     temperature = models.FloatField()
 
+    class Meta:
+        # Every listing is scoped to one or a few datasets, so each index leads with the
+        # dataset and lets type filters, numeric ranges and sorts run as index range scans.
+        indexes = [
+            models.Index(fields=['dataset', 'equipment_type'], name='equipment_dataset_type_idx'),
+            models.Index(fields=['dataset', 'equipment_name'], name='equipment_dataset_name_idx'),
+            models.Index(fields=['dataset', 'flowrate'], name='equipment_dataset_flow_idx'),
+            models.Index(fields=['dataset', 'pressure'], name='equipment_dataset_press_idx'),
+            models.Index(fields=['dataset', 'temperature'], name='equipment_dataset_temp_idx'),
+        ]
+
     def __str__(self):
         return f"{self.equipment_name} ({self.equipment_type})"
+
+
+class UploadSession(models.Model):
+    """A resumable upload whose numbered chunks are stored on disk until it is completed."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_chunks = models.PositiveIntegerField()
+    # Existing dataset to append to, or None to create a new one.
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.total_chunks} chunks)"
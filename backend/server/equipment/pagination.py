@@ -0,0 +1,8 @@
+from rest_framework.pagination import PageNumberPagination
+
+
+class EquipmentPagination(PageNumberPagination):
+    """Page through equipment rows; clients may ask for up to 1000 rows per page."""
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,108 @@
+"""Typed CSV parsing for equipment uploads.
+
+Only the five required columns are read, each with a declared dtype, so pandas neither
+infers types nor materialises extra columns. The multi-threaded pyarrow engine is used when
+available; files it rejects (or servers without pyarrow) go through the C engine instead.
+"""
+
+from django.conf import settings
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+import pandas as pd
+
+
+# CSV header -> Equipment field.
+CSV_COLUMNS = {
+    'Equipment Name': 'equipment_name',
+    'Type': 'equipment_type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+CSV_DTYPES = {
+    'Equipment Name': 'string',
+    'Type': 'category',
+    'Flowrate': 'float64',
+    'Pressure': 'float64',
+    'Temperature': 'float64',
+}
+ENGINES = ['auto', 'pyarrow', 'c']
+# Accepted file suffixes and the pandas compression each one is decoded with.
+CSV_SUFFIXES = {
+    '.csv': None,
+    '.csv.gz': 'gzip',
+    '.csv.bz2': 'bz2',
+    '.csv.zst': 'zstd',
+}
+
+
+class CSVSchemaError(ValueError):
+    """Raised when a CSV does not match the equipment schema."""
+
+
+def csv_compression(filename):
+    """Return the compression for an accepted CSV ``filename``, or raise ``CSVSchemaError``."""
+    for suffix, compression in CSV_SUFFIXES.items():
+        if filename.lower().endswith(suffix):
+            return compression
+    raise CSVSchemaError(f'File must be a CSV ({", ".join(CSV_SUFFIXES)})')
+
+
+def csv_display_name(filename):
+    """``filename`` without its compression suffix, e.g. ``plant.csv.gz`` -> ``plant.csv``."""
+    compression = csv_compression(filename)
+    return filename.rsplit('.', 1)[0] if compression else filename
+
+
+def resolve_engine(engine=None):
+    """Return the pandas engine to try first for ``engine`` (default: ``CSV_PARSE_ENGINE``)."""
+    engine = engine or settings.CSV_PARSE_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f'CSV engine must be one of {ENGINES}')
+    if engine == 'auto':
+        return 'pyarrow' if pyarrow is not None else 'c'
+    return engine
+
+
+def read_equipment_csv(csv_file, engine=None, compression=None):
+    """Parse ``csv_file`` into a frame with Equipment field names and enforced dtypes.
+
+    Compressed files are decompressed as a stream while parsing. Raises ``CSVSchemaError``
+    for missing columns, non-numeric values or empty cells.
+    """
+    # pandas only decompresses objects it recognises as binary files, which Django's
+    # File wrappers are not, so parse the file object they wrap.
+    csv_file = getattr(csv_file, 'file', csv_file)
+    try:
+        header = pd.read_csv(csv_file, nrows=0, compression=compression).columns
+    except ImportError as e:
+        raise CSVSchemaError(f'{compression} files are not supported on this server') from e
+    missing_cols = [col for col in CSV_COLUMNS if col not in header]
+    if missing_cols:
+        raise CSVSchemaError(f'Missing columns: {missing_cols}')
+
+    engine = resolve_engine(engine)
+    options = {'usecols': list(CSV_COLUMNS), 'dtype': CSV_DTYPES, 'compression': compression}
+    csv_file.seek(0)
+    try:
+        frame = pd.read_csv(csv_file, engine=engine, **options)
+    except ValueError as e:
+        if engine == 'c':
+            raise CSVSchemaError(str(e)) from e
+        # pyarrow is stricter about quoting and malformed lines than the C parser.
+        csv_file.seek(0)
+        try:
+            frame = pd.read_csv(csv_file, engine='c', **options)
+        except ValueError as e:
+            raise CSVSchemaError(str(e)) from e
+
+    frame = frame[list(CSV_COLUMNS)].rename(columns=CSV_COLUMNS)
+    empty = frame.isna().sum()
+    empty = {column: int(count) for column, count in empty.items() if count}
+    if empty:
+        raise CSVSchemaError(f'Empty values in required columns: {empty}')
+    return frame
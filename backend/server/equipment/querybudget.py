@@ -0,0 +1,128 @@
+"""SQL query budgets for views.
+
+Views declare how many queries a request may run, either with the ``query_budget``
+decorator or, for viewset actions, a ``query_budgets`` mapping on the class. The
+middleware (enabled by ``QUERY_BUDGET_ENABLED``, on by default with ``DEBUG``) records
+the query count and database time of every request and logs views that go over
+budget together with their duplicated SQL. ``QueryBudgetTestMixin`` turns the same
+budgets into test assertions.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of SQL queries a view may run per request."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(view_func, method):
+    """Return the declared budget for ``view_func`` handling ``method``, or None."""
+    budget = getattr(view_func, 'query_budget', None)
+    view_class = getattr(view_func, 'cls', None)
+    if budget is None and view_class is not None:
+        actions = getattr(view_func, 'actions', None) or {}
+        handler_name = actions.get(method.lower(), method.lower())
+        budget = getattr(getattr(view_class, handler_name, None), 'query_budget', None)
+        if budget is None:
+            budget = getattr(view_class, 'query_budgets', {}).get(handler_name)
+    return budget
+
+
+def duplicated_queries(queries):
+    """Return ``(sql, count)`` pairs for statements that ran more than once."""
+    return [(sql, count) for sql, count in Counter(queries).most_common() if count > 1]
+
+
+class QueryRecorder:
+    """Database execute wrapper collecting SQL statements and their total time."""
+
+    def __init__(self):
+        self.queries = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.queries.append(sql)
+
+
+class QueryBudgetMiddleware:
+    """Count queries per request and report views that exceed their budget."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        count = len(recorder.queries)
+        response['X-Query-Count'] = str(count)
+        response['X-Query-Time-Ms'] = f'{recorder.duration * 1000:.1f}'
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and count > budget:
+            match = request.resolver_match
+            view_name = match.view_name if match else request.path
+            message = '%s %s (%s) ran %d queries in %.1f ms, budget is %d'
+            args = [request.method, request.path, view_name, count, recorder.duration * 1000, budget]
+            if settings.DEBUG:
+                for sql, repeats in duplicated_queries(recorder.queries):
+                    message += '\n  %dx %s'
+                    args += [repeats, sql]
+            logger.warning(message, *args)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin that fails when a request exceeds its view's declared budget."""
+
+    def assertWithinQueryBudget(self, method, path, *args, client=None, **kwargs):
+        match = resolve(urlsplit(path).path)
+        budget = get_query_budget(match.func, method)
+        if budget is None:
+            self.fail(f'{match.view_name} does not declare a query budget')
+
+        client = client or self.client
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(client, method.lower())(path, *args, **kwargs)
+            if response.streaming:
+                # Queries run while the body is generated count too; keep the body readable.
+                response.streaming_content = [b''.join(response.streaming_content)]
+
+        queries = [query['sql'] for query in captured.captured_queries]
+        if len(queries) > budget:
+            details = '\n'.join(f'  {repeats}x {sql}' for sql, repeats in duplicated_queries(queries))
+            self.fail(
+                f'{method.upper()} {path} ({match.view_name}) ran {len(queries)} queries, '
+                f'budget is {budget}' + (f'\nDuplicated:\n{details}' if details else '')
+            )
+        return response
@@ -0,0 +1,16 @@
+"""PDF report generation for datasets.
+
+The layout lives in ``shared/reports.py`` at the repository root, which the desktop app
+uses to render the same report locally.
+"""
+
+from shared.reports import FIELDS, build_report as build_columns_report
+
+from .instrumentation import phase
+
+
+def build_report(dataset, equipment):
+    """Build the PDF report for ``dataset`` from the ``equipment`` queryset and return it as a buffer."""
+    rows = list(equipment.order_by('id').values_list(*FIELDS))
+    columns = {field: [row[i] for row in rows] for i, field in enumerate(FIELDS)}
+    return build_columns_report(dataset.name, columns, phase=phase)
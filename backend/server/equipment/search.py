@@ -0,0 +1,56 @@
+"""Equipment name search.
+
+On PostgreSQL the ``icontains``/``istartswith`` lookups are served by a trigram GIN
+index; on SQLite candidates come from the ``equipment_search`` FTS5 trigram table that
+triggers keep in sync with inserts and deletes (see migration 0003). Both fall back to
+plain LIKE scans when the index could not be created.
+"""
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+
+
+SEARCH_MODES = ['substring', 'prefix']
+FTS_TABLE = 'equipment_search'
+# The FTS5 trigram tokenizer cannot match anything shorter than one trigram.
+FTS_MIN_LENGTH = 3
+
+_fts_tables = {}
+
+
+def _has_fts_table(alias):
+    if alias not in _fts_tables:
+        with connections[alias].cursor() as cursor:
+            _fts_tables[alias] = FTS_TABLE in connections[alias].introspection.table_names(cursor)
+    return _fts_tables[alias]
+
+
+def search_equipment(queryset, query, mode='substring'):
+    """Filter ``queryset`` to names matching ``query`` and order them by relevance.
+
+    Exact matches rank first, then prefix matches, then other substring matches; ties
+    go to shorter (closer) names.
+    """
+    if mode == 'prefix':
+        queryset = queryset.filter(equipment_name__istartswith=query)
+    else:
+        queryset = queryset.filter(equipment_name__icontains=query)
+
+    alias = queryset.db
+    if connections[alias].vendor == 'sqlite' and len(query) >= FTS_MIN_LENGTH and _has_fts_table(alias):
+        phrase = '"' + query.replace('"', '""') + '"'
+        queryset = queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [phrase])
+        )
+
+    rank = Case(
+        When(equipment_name__iexact=query, then=Value(0)),
+        When(equipment_name__istartswith=query, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(rank=rank, name_length=Length('equipment_name')).order_by(
+        'rank', 'name_length', 'equipment_name', 'id'
+    )
@@ -1,6 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Dataset, Equipment
+from .models import Dataset, Equipment, UploadSession
+from .parsing import CSVSchemaError, csv_compression
+from .uploads import received_chunks
 
 
 class EquipmentSerializer(serializers.ModelSerializer):
@@ -10,13 +13,21 @@ class EquipmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
 
 
+class EquipmentSearchSerializer(EquipmentSerializer):
+    """Serializer for search results, which span several datasets."""
+    dataset_name = serializers.CharField(source='dataset.name', read_only=True)
+
+    class Meta(EquipmentSerializer.Meta):
+        fields = EquipmentSerializer.Meta.fields + ['dataset', 'dataset_name']
+
+
 class DatasetListSerializer(serializers.ModelSerializer):
     """Serializer for dataset list view."""
-    equipment_count = serializers.IntegerField(source='equipment.count', read_only=True)
+    equipment_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Dataset
-        fields = ['id', 'name', 'uploaded_at', 'equipment_count']
+        fields = ['id', 'name', 'uploaded_at', 'revision', 'equipment_count']
 
 
 class DatasetDetailSerializer(serializers.ModelSerializer):
@@ -25,7 +36,7 @@ class DatasetDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Dataset
-        fields = ['id', 'name', 'uploaded_at', 'file', 'equipment']
+        fields = ['id', 'name', 'uploaded_at', 'revision', 'file', 'equipment']
 
 
 class SummarySerializer(serializers.Serializer):
@@ -35,6 +46,41 @@ class SummarySerializer(serializers.Serializer):
     avg_pressure = serializers.FloatField()
     avg_temperature = serializers.FloatField()
     type_distribution = serializers.DictField(child=serializers.IntegerField())
+    parameters = serializers.DictField(child=serializers.DictField(child=serializers.FloatField(allow_null=True)))
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions, including which chunks have arrived."""
+    received = serializers.SerializerMethodField()
+    max_chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'total_chunks', 'dataset', 'created_at', 'received', 'max_chunk_size']
+        read_only_fields = ['id', 'created_at']
+
+    def get_received(self, obj):
+        return received_chunks(obj)
+
+    def get_max_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_MAX_SIZE
+
+    def validate_filename(self, value):
+        try:
+            csv_compression(value)
+        except CSVSchemaError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate_total_chunks(self, value):
+        if not 1 <= value <= settings.UPLOAD_SESSION_MAX_CHUNKS:
+            raise serializers.ValidationError(f'Must be between 1 and {settings.UPLOAD_SESSION_MAX_CHUNKS}.')
+        return value
+
+    def validate_dataset(self, value):
+        if value is not None and value.user_id != self.context['request'].user.id:
+            raise serializers.ValidationError('Dataset not found.')
+        return value
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -1,3 +1,893 @@
-from django.test import TestCase
+import bz2
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from .analytics import PARAMETERS, PERCENTILES
+from .exports import parquet_available, pq
+from .instrumentation import MetricsRegistry
+from .models import Dataset
+from .parsing import CSV_COLUMNS, CSVSchemaError, pyarrow, read_equipment_csv, resolve_engine
+from .querybudget import QueryBudgetTestMixin
+from .search import FTS_TABLE, _has_fts_table
+from .views import MAX_DATASETS_PER_USER
+
+
+TYPES = ['Pump', 'Reactor', 'Valve']
+CSV_HEADER = 'Equipment Name,Type,Flowrate,Pressure,Temperature'
+
+
+def sample_rows(count, start=0):
+    """Deterministic equipment rows cycling through ``TYPES``."""
+    return [
+        (f'EQ-{i:04d}', TYPES[i % len(TYPES)], 100.0 + i, 1.0 + (i % 7) * 0.5, 20.0 + (i % 11) * 3)
+        for i in range(start, start + count)
+    ]
+
+
+def equipment_csv(rows, header=CSV_HEADER):
+    lines = [header] + [','.join(str(value) for value in row) for row in rows]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+class APITestCase(TestCase):
+    """Token-authenticated client with media and upload sessions in a temporary directory."""
+    client_class = APIClient
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(
+            MEDIA_ROOT=media_root, UPLOAD_SESSION_ROOT=os.path.join(media_root, 'upload_sessions')
+        )
+        media.enable()
+        self.addCleanup(media.disable)
+        # Derived values are cached by dataset id, which the test database reuses.
+        cache.clear()
+
+        self.user = User.objects.create_user('alice', password='alice-password')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def upload(self, rows, name='plant.csv', content=None, **data):
+        """POST one CSV (``rows`` or raw ``content``) to the upload endpoint."""
+        content = equipment_csv(rows) if content is None else content
+        return self.client.post('/api/upload/', {'file': SimpleUploadedFile(name, content), **data})
+
+    def create_dataset(self, rows, name='plant.csv'):
+        response = self.upload(rows, name)
+        self.assertEqual(response.status_code, 201, response.content)
+        return Dataset.objects.get(pk=response.data['id'])
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Every view with a declared budget stays within it."""
+
+    def test_auth_views(self):
+        anonymous = APIClient()
+        response = self.assertWithinQueryBudget('post', '/api/auth/register/', {
+            'username': 'bob', 'email': 'bob@example.com', 'password': 'bob-password',
+            'password_confirm': 'bob-password',
+        }, client=anonymous)
+        self.assertEqual(response.status_code, 201)
+        response = self.assertWithinQueryBudget(
+            'post', '/api/auth/login/', {'username': 'alice', 'password': 'alice-password'}, client=anonymous
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.assertWithinQueryBudget('post', '/api/auth/logout/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_upload_and_append(self):
+        for i in range(MAX_DATASETS_PER_USER):
+            self.create_dataset(sample_rows(5), f'old-{i}.csv')
+        # With the retention limit reached, the upload also deletes the oldest dataset.
+        response = self.assertWithinQueryBudget(
+            'post', '/api/upload/', {'file': SimpleUploadedFile('new.csv', equipment_csv(sample_rows(50)))}
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.assertWithinQueryBudget('post', '/api/upload/', {
+            'file': SimpleUploadedFile('more.csv', equipment_csv(sample_rows(20, 50))),
+            'dataset': response.data['id'],
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_full_batch(self):
+        for i in range(MAX_DATASETS_PER_USER):
+            self.create_dataset(sample_rows(5), f'old-{i}.csv')
+        files = [
+            SimpleUploadedFile(f'shift-{i}.csv', equipment_csv(sample_rows(10, i)))
+            for i in range(settings.BATCH_UPLOAD_MAX_FILES)
+        ]
+        # Declared as BATCH_QUERY_BUDGET, which grows with BATCH_UPLOAD_MAX_FILES.
+        response = self.assertWithinQueryBudget('post', '/api/upload/batch/', {'files': files})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['deleted']), len(files))
+
+    def test_dataset_views(self):
+        datasets = [self.create_dataset(sample_rows(30, i), f'plant-{i}.csv') for i in range(MAX_DATASETS_PER_USER)]
+        dataset_id = datasets[0].id
+        ids = ','.join(str(dataset.id) for dataset in datasets)
+        for path in [
+            '/api/datasets/',
+            f'/api/datasets/{dataset_id}/',
+            f'/api/datasets/{dataset_id}/summary/',
+            f'/api/datasets/{dataset_id}/stats/',
+            f'/api/datasets/{dataset_id}/series/?start=5&buckets=4',
+            f'/api/datasets/{dataset_id}/histogram/?parameter=pressure',
+            f'/api/datasets/{dataset_id}/histogram/?parameter=flowrate&group_by=type&edges=100,110,200',
+            f'/api/datasets/compare/?ids={ids}',
+            f'/api/datasets/{dataset_id}/report/',
+            f'/api/datasets/{dataset_id}/export.csv',
+            f'/api/datasets/{dataset_id}/export.parquet',
+        ]:
+            with self.subTest(path=path):
+                response = self.assertWithinQueryBudget('get', path)
+                self.assertEqual(response.status_code, 200)
+        response = self.assertWithinQueryBudget('delete', f'/api/datasets/{dataset_id}/')
+        self.assertEqual(response.status_code, 204)
+
+    def test_equipment_views(self):
+        dataset = self.create_dataset(sample_rows(150))
+        equipment_id = dataset.equipment.order_by('id').first().id
+        for path in [
+            f'/api/equipment/?dataset={dataset.id}&type=Pump&type=Valve&pressure__gt=2&ordering=-flowrate',
+            f'/api/equipment/{equipment_id}/',
+            '/api/equipment/search/?q=EQ-01&mode=prefix',
+        ]:
+            with self.subTest(path=path):
+                response = self.assertWithinQueryBudget('get', path)
+                self.assertEqual(response.status_code, 200)
+
+    def test_upload_session_views(self):
+        response = self.assertWithinQueryBudget('post', '/api/uploads/', {'filename': 'plant.csv', 'total_chunks': 1})
+        self.assertEqual(response.status_code, 201)
+        session = f'/api/uploads/{response.data["id"]}/'
+        response = self.assertWithinQueryBudget(
+            'put', f'{session}chunks/0/', equipment_csv(sample_rows(10)), content_type='application/octet-stream'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.assertWithinQueryBudget('get', session)
+        self.assertEqual(response.status_code, 200)
+        response = self.assertWithinQueryBudget('post', f'{session}complete/')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/uploads/', {'filename': 'other.csv', 'total_chunks': 2})
+        response = self.assertWithinQueryBudget('delete', f'/api/uploads/{response.data["id"]}/')
+        self.assertEqual(response.status_code, 204)
+
+
+class StatsTests(APITestCase):
+
+    def test_per_type_statistics_match_pandas(self):
+        rows = sample_rows(200)
+        dataset = self.create_dataset(rows)
+        frame = pd.DataFrame(rows, columns=['equipment_name', 'equipment_type', *PARAMETERS])
+
+        response = self.client.get(f'/api/datasets/{dataset.id}/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_count'], 200)
+        self.assertEqual(response.data['percentiles'], PERCENTILES)
+        self.assertEqual(sorted(response.data['types']), TYPES)
+
+        expected = {'overall': frame, **dict(iter(frame.groupby('equipment_type')))}
+        for name, group in expected.items():
+            stats = response.data['overall'] if name == 'overall' else response.data['types'][name]
+            self.assertEqual(stats['count'], len(group))
+            for parameter in PARAMETERS:
+                values = group[parameter]
+                with self.subTest(group=name, parameter=parameter):
+                    self.assertAlmostEqual(stats[parameter]['min'], values.min())
+                    self.assertAlmostEqual(stats[parameter]['max'], values.max())
+                    self.assertAlmostEqual(stats[parameter]['mean'], values.mean())
+                    self.assertAlmostEqual(stats[parameter]['std'], values.std())
+                    for pct in PERCENTILES:
+                        self.assertAlmostEqual(stats[parameter][f'p{pct}'], values.quantile(pct / 100))
+
+    def test_single_row_type_has_no_std(self):
+        dataset = self.create_dataset(sample_rows(3))
+        response = self.client.get(f'/api/datasets/{dataset.id}/stats/')
+        self.assertIsNone(response.data['types']['Pump']['flowrate']['std'])
+
+    def test_cached_per_revision(self):
+        dataset = self.create_dataset(sample_rows(30))
+        first = self.client.get(f'/api/datasets/{dataset.id}/stats/')
+        # Token and dataset lookups only; the rows are not read again.
+        with self.assertNumQueries(2):
+            second = self.client.get(f'/api/datasets/{dataset.id}/stats/')
+        self.assertEqual(second.data, first.data)
+
+    def test_other_users_dataset_is_not_found(self):
+        dataset = self.create_dataset(sample_rows(5))
+        other = User.objects.create_user('mallory', password='mallory-password')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=other).key}')
+        self.assertEqual(self.client.get(f'/api/datasets/{dataset.id}/stats/').status_code, 404)
+
+
+class CompareTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows_a = sample_rows(30)
+        # No reactors in the second dataset.
+        self.rows_b = [row for row in sample_rows(40, 100) if row[1] != 'Reactor']
+        self.a = self.create_dataset(self.rows_a, 'a.csv')
+        self.b = self.create_dataset(self.rows_b, 'b.csv')
+
+    def compare(self, ids, **params):
+        query = '&'.join([f'ids={",".join(map(str, ids))}'] + [f'{key}={value}' for key, value in params.items()])
+        return self.client.get(f'/api/datasets/compare/?{query}')
+
+    def test_aligned_summaries_and_deltas(self):
+        response = self.compare([self.a.id, self.b.id], bins=4)
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['baseline_id'], self.a.id)
+        self.assertEqual(data['labels'], ['a.csv', 'b.csv'])
+        self.assertEqual(data['types'], TYPES)
+
+        frames = [pd.DataFrame(rows, columns=['equipment_name', 'equipment_type', *PARAMETERS])
+                  for rows in (self.rows_a, self.rows_b)]
+        for summary, frame in zip(data['datasets'], frames):
+            self.assertEqual(summary['total_count'], len(frame))
+            for parameter in PARAMETERS:
+                self.assertAlmostEqual(summary[f'avg_{parameter}'], frame[parameter].mean())
+                self.assertAlmostEqual(summary[f'min_{parameter}'], frame[parameter].min())
+                self.assertAlmostEqual(summary[f'max_{parameter}'], frame[parameter].max())
+
+        counts = [frame['equipment_type'].value_counts() for frame in frames]
+        self.assertEqual(data['type_counts']['Pump'], [counts[0]['Pump'], counts[1]['Pump']])
+        self.assertEqual(data['type_counts']['Reactor'], [counts[0]['Reactor'], 0])
+        self.assertEqual(data['deltas']['Pump']['count'], [0, counts[1]['Pump'] - counts[0]['Pump']])
+        self.assertIsNone(data['type_means']['flowrate']['Reactor'][1])
+        self.assertEqual(data['deltas']['Reactor']['flowrate'][1], None)
+        pump_means = [frame[frame['equipment_type'] == 'Pump']['flowrate'].mean() for frame in frames]
+        self.assertAlmostEqual(data['deltas']['Pump']['flowrate'][1], pump_means[1] - pump_means[0])
+
+        for parameter in PARAMETERS:
+            distribution = data['distributions'][parameter]
+            self.assertEqual(len(distribution['edges']), 5)
+            self.assertEqual([sum(counts) for counts in distribution['counts']], [len(frame) for frame in frames])
+
+    def test_order_of_ids_sets_the_baseline(self):
+        data = self.compare([self.b.id, self.a.id]).data
+        self.assertEqual(data['baseline_id'], self.b.id)
+        self.assertEqual(data['labels'], ['b.csv', 'a.csv'])
+
+    def test_query_count_does_not_grow_with_datasets(self):
+        with self.assertNumQueries(7):
+            self.compare([self.a.id])
+        with self.assertNumQueries(7):
+            self.compare([self.a.id, self.b.id])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/api/datasets/compare/?ids=a,b').status_code, 400)
+        self.assertEqual(self.client.get('/api/datasets/compare/').status_code, 400)
+        self.assertEqual(self.compare(range(1, MAX_DATASETS_PER_USER + 2)).status_code, 400)
+        self.assertEqual(self.compare([self.a.id], bins=0).status_code, 400)
+        response = self.compare([self.a.id, 9999])
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('9999', response.data['error'])
+
+
+class HistogramTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows = sample_rows(120)
+        self.dataset = self.create_dataset(self.rows)
+        self.frame = pd.DataFrame(self.rows, columns=['equipment_name', 'equipment_type', *PARAMETERS])
+
+    def histogram(self, query):
+        return self.client.get(f'/api/datasets/{self.dataset.id}/histogram/?{query}')
+
+    def test_equal_width_bins_match_numpy(self):
+        for parameter in PARAMETERS:
+            with self.subTest(parameter=parameter):
+                response = self.histogram(f'parameter={parameter}&bins=7')
+                self.assertEqual(response.status_code, 200)
+                counts, edges = np.histogram(self.frame[parameter], bins=7)
+                self.assertEqual(response.data['parameter'], parameter)
+                self.assertEqual(response.data['counts'], counts.tolist())
+                np.testing.assert_allclose(response.data['edges'], edges)
+                self.assertEqual(response.data['total'], len(self.rows))
+                self.assertNotIn('groups', response.data)
+
+    def test_grouped_by_type(self):
+        response = self.histogram('parameter=temperature&bins=5&group_by=type')
+        groups = response.data['groups']
+        self.assertEqual(sorted(groups), TYPES)
+        self.assertEqual([sum(column) for column in zip(*groups.values())], response.data['counts'])
+        for equipment_type, counts in groups.items():
+            values = self.frame[self.frame['equipment_type'] == equipment_type]['temperature']
+            self.assertEqual(counts, np.histogram(values, bins=response.data['edges'])[0].tolist())
+
+    def test_explicit_edges_skip_values_outside(self):
+        # Flowrates are 100..219; the last bin includes its right edge.
+        response = self.histogram('parameter=flowrate&edges=110,150,200')
+        self.assertEqual(response.data['edges'], [110.0, 150.0, 200.0])
+        self.assertEqual(response.data['counts'], [40, 51])
+        self.assertEqual(response.data['total'], 91)
+
+    def test_invalid_requests(self):
+        for query in [
+            'bins=5',
+            'parameter=name',
+            'parameter=flowrate&bins=0',
+            'parameter=flowrate&bins=501',
+            'parameter=flowrate&bins=x',
+            'parameter=flowrate&edges=1',
+            'parameter=flowrate&edges=1,3,2',
+            'parameter=flowrate&edges=1,inf',
+        ]:
+            with self.subTest(query=query):
+                self.assertEqual(self.histogram(query).status_code, 400)
+
+
+class AppendTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first, self.second = sample_rows(50), sample_rows(25, 1000)
+        self.dataset = self.create_dataset(self.first)
+
+    def append(self, rows, dataset_id=None):
+        return self.upload(rows, 'more.csv', dataset=self.dataset.id if dataset_id is None else dataset_id)
+
+    def test_aggregates_merge_into_the_dataset(self):
+        response = self.append(self.second)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'dataset_id': self.dataset.id, 'revision': 1, 'appended': 25, 'total_count': 75,
+        })
+        self.assertEqual(Dataset.objects.count(), 1)
+
+        frame = pd.DataFrame(self.first + self.second, columns=['equipment_name', 'equipment_type', *PARAMETERS])
+        summary = self.client.get(f'/api/datasets/{self.dataset.id}/summary/').data
+        self.assertEqual(summary['total_count'], 75)
+        self.assertEqual(summary['type_distribution'], frame['equipment_type'].value_counts().to_dict())
+        for parameter in PARAMETERS:
+            with self.subTest(parameter=parameter):
+                stats = summary['parameters'][parameter]
+                self.assertAlmostEqual(summary[f'avg_{parameter}'], frame[parameter].mean())
+                self.assertAlmostEqual(stats['std'], frame[parameter].std())
+                self.assertEqual(stats['min'], frame[parameter].min())
+                self.assertEqual(stats['max'], frame[parameter].max())
+
+    def test_append_bumps_revision_and_etag(self):
+        url = f'/api/datasets/{self.dataset.id}/summary/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.append(self.second)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['total_count'], 75)
+        self.assertEqual(self.client.get(f'/api/datasets/{self.dataset.id}/').data['revision'], 1)
+
+    def test_derived_caches_follow_the_revision(self):
+        stats_url = f'/api/datasets/{self.dataset.id}/stats/'
+        histogram_url = f'/api/datasets/{self.dataset.id}/histogram/?parameter=flowrate&bins=4'
+        self.assertEqual(self.client.get(stats_url).data['total_count'], 50)
+        self.assertEqual(self.client.get(histogram_url).data['total'], 50)
+        self.append(self.second)
+        self.assertEqual(self.client.get(stats_url).data['total_count'], 75)
+        self.assertEqual(self.client.get(histogram_url).data['total'], 75)
+
+    def test_invalid_targets(self):
+        self.assertEqual(self.append(self.second, 'latest').status_code, 400)
+        self.assertEqual(self.append(self.second, 9999).status_code, 404)
+        other = User.objects.create_user('mallory', password='mallory-password')
+        foreign = Dataset.objects.create(name='theirs.csv', user=other, file='datasets/theirs.csv')
+        self.assertEqual(self.append(self.second, foreign.id).status_code, 404)
+        self.assertEqual(foreign.equipment.count(), 0)
+
+
+class ExportTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows = sample_rows(25)
+        self.dataset = self.create_dataset(self.rows)
+
+    def export(self, extension):
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/export.{extension}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_round_trips_the_upload(self):
+        with mock.patch('equipment.exports.EXPORT_CHUNK_SIZE', 10):
+            response, content = self.export('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="plant.csv"')
+        self.assertEqual(content.decode().replace('\r\n', '\n'), equipment_csv(self.rows).decode())
+
+        # The export is accepted by the upload endpoint as is.
+        response = self.upload(None, 'again.csv', content=content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['equipment']), len(self.rows))
+
+    @skipUnless(parquet_available(), 'pyarrow is not installed')
+    def test_parquet_row_groups(self):
+        with mock.patch('equipment.exports.EXPORT_CHUNK_SIZE', 10):
+            response, content = self.export('parquet')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="plant.parquet"')
+        parquet = pq.ParquetFile(io.BytesIO(content))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.column_names, ['equipment_name', 'equipment_type', *PARAMETERS])
+        self.assertEqual([tuple(row.values()) for row in table.to_pylist()], self.rows)
+
+    def test_trailing_slash_is_optional(self):
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/export.csv/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ParsingTests(TestCase):
+    engines = ['c'] + (['pyarrow'] if pyarrow is not None else [])
+
+    def parse(self, content, engine='c'):
+        return read_equipment_csv(io.BytesIO(content), engine=engine)
+
+    def test_reads_only_the_required_columns_with_declared_dtypes(self):
+        content = equipment_csv(
+            [('Plant A', 'x', 'EQ-1', 1, 'Pump', 2.5, 3, 'ok', 40)],
+            'Site,Notes,Equipment Name,Serial,Type,Pressure,Flowrate,Status,Temperature',
+        )
+        for engine in self.engines:
+            with self.subTest(engine=engine):
+                frame = self.parse(content, engine)
+                self.assertEqual(list(frame.columns), list(CSV_COLUMNS.values()))
+                self.assertEqual(frame['equipment_type'].dtype, 'category')
+                self.assertEqual(frame['equipment_name'].dtype, 'string')
+                for parameter in PARAMETERS:
+                    self.assertEqual(frame[parameter].dtype, 'float64')
+                self.assertEqual(frame.iloc[0].tolist(), ['EQ-1', 'Pump', 3.0, 2.5, 40.0])
+
+    def test_numeric_columns_reject_text(self):
+        content = equipment_csv([('EQ-1', 'Pump', 'fast', 1, 2)])
+        for engine in self.engines:
+            with self.subTest(engine=engine), self.assertRaises(CSVSchemaError):
+                self.parse(content, engine)
+
+    def test_empty_cells_are_reported_per_column(self):
+        content = equipment_csv([('EQ-1', '', 1, 2, 3), ('EQ-2', 'Pump', 1, '', '')])
+        with self.assertRaisesMessage(CSVSchemaError, "{'equipment_type': 1, 'pressure': 1, 'temperature': 1}"):
+            self.parse(content)
+
+    def test_missing_columns(self):
+        content = equipment_csv([('EQ-1', 'Pump', 1)], 'Equipment Name,Type,Flowrate')
+        with self.assertRaisesMessage(CSVSchemaError, "Missing columns: ['Pressure', 'Temperature']"):
+            self.parse(content)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            resolve_engine('python')
+
+
+class UploadValidationTests(APITestCase):
+
+    def test_schema_errors_are_rejected_without_a_dataset(self):
+        for name, content in [
+            ('plant.csv', equipment_csv([('EQ-1', 'Pump', 'n/a', 1, 2)])),
+            ('plant.csv', equipment_csv([('EQ-1', 'Pump', 1)], 'Equipment Name,Type,Flowrate')),
+            ('plant.xlsx', equipment_csv(sample_rows(3))),
+        ]:
+            with self.subTest(name=name, content=content):
+                response = self.upload(None, name, content=content)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+        self.assertFalse(Dataset.objects.exists())
+
+
+class CompressedUploadTests(APITestCase):
+
+    def test_compressed_files_are_decompressed_while_parsing(self):
+        content = equipment_csv(sample_rows(40))
+        compressors = {'gz': gzip.compress, 'bz2': bz2.compress}
+        if zstandard is not None:
+            compressors['zst'] = zstandard.ZstdCompressor().compress
+        for suffix, compress in compressors.items():
+            with self.subTest(suffix=suffix):
+                response = self.upload(None, f'plant-{suffix}.csv.{suffix}', content=compress(content))
+                self.assertEqual(response.status_code, 201, response.data)
+                self.assertEqual(response.data['name'], f'plant-{suffix}.csv')
+                self.assertEqual(len(response.data['equipment']), 40)
+
+    def test_corrupt_archive_is_rejected(self):
+        response = self.upload(None, 'plant.csv.gz', content=b'not gzip at all')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Dataset.objects.exists())
+
+
+class ChunkedUploadTests(APITestCase):
+
+    def start(self, filename='plant.csv', total_chunks=3, **data):
+        response = self.client.post('/api/uploads/', {'filename': filename, 'total_chunks': total_chunks, **data})
+        self.assertEqual(response.status_code, 201, response.data)
+        return f'/api/uploads/{response.data["id"]}/'
+
+    def put_chunk(self, session, index, content):
+        return self.client.put(f'{session}chunks/{index}/', content, content_type='application/octet-stream')
+
+    def test_resume_after_missing_chunk(self):
+        content = gzip.compress(equipment_csv(sample_rows(300)))
+        size = len(content) // 3 + 1
+        chunks = [content[i:i + size] for i in range(0, len(content), size)]
+        session = self.start('plant.csv.gz', len(chunks))
+
+        self.assertEqual(self.put_chunk(session, 0, chunks[0]).status_code, 200)
+        self.assertEqual(self.put_chunk(session, 2, b'garbage from a dropped connection').status_code, 200)
+        self.assertEqual(self.put_chunk(session, 2, chunks[2]).data['received'], [0, 2])
+
+        response = self.client.post(f'{session}complete/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['missing'], [1])
+        # A resuming client asks which chunks arrived and sends only the rest.
+        self.assertEqual(self.client.get(session).data['received'], [0, 2])
+        self.put_chunk(session, 1, chunks[1])
+
+        response = self.client.post(f'{session}complete/')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['name'], 'plant.csv')
+        self.assertEqual(len(response.data['equipment']), 300)
+        self.assertEqual(self.client.get(session).status_code, 404)
+        self.assertEqual(os.listdir(settings.UPLOAD_SESSION_ROOT), [])
+
+    def test_failed_ingest_keeps_chunks_for_a_corrected_resend(self):
+        session = self.start(total_chunks=2)
+        self.put_chunk(session, 0, equipment_csv(sample_rows(5)))
+        self.put_chunk(session, 1, b'EQ-9,Pump,broken,1,2\n')
+        self.assertEqual(self.client.post(f'{session}complete/').status_code, 400)
+
+        self.put_chunk(session, 1, b'EQ-9,Pump,3,1,2\n')
+        response = self.client.post(f'{session}complete/')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['equipment']), 6)
+
+    def test_session_can_append_to_a_dataset(self):
+        dataset = self.create_dataset(sample_rows(10))
+        session = self.start(total_chunks=1, dataset=dataset.id)
+        self.put_chunk(session, 0, equipment_csv(sample_rows(4, 10)))
+        response = self.client.post(f'{session}complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_count'], 14)
+
+    def test_chunk_limits(self):
+        session = self.start(total_chunks=2)
+        self.assertEqual(self.put_chunk(session, 2, b'x').status_code, 400)
+        with self.settings(UPLOAD_CHUNK_MAX_SIZE=16):
+            self.assertEqual(self.put_chunk(session, 0, b'x' * 17).status_code, 413)
+        self.assertEqual(self.client.get(session).data['received'], [])
+
+        response = self.client.post('/api/uploads/', {'filename': 'plant.txt', 'total_chunks': 1})
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchUploadTests(APITestCase):
+
+    def batch(self, files):
+        return self.client.post('/api/upload/batch/', {
+            'files': [SimpleUploadedFile(name, content) for name, content in files],
+        })
+
+    def test_partial_failure(self):
+        response = self.batch([
+            ('a.csv', equipment_csv(sample_rows(5))),
+            ('b.csv', equipment_csv([('EQ-1', 'Pump', 'n/a', 1, 2)])),
+            ('c.csv.gz', gzip.compress(equipment_csv(sample_rows(7)))),
+            ('d.txt', equipment_csv(sample_rows(2))),
+        ])
+        self.assertEqual(response.status_code, 207)
+        results = response.data['results']
+        self.assertEqual([result['file'] for result in results], ['a.csv', 'b.csv', 'c.csv.gz', 'd.txt'])
+        self.assertEqual([result['status'] for result in results], [201, 400, 201, 400])
+        self.assertIn('error', results[1])
+        self.assertEqual(results[2]['dataset']['name'], 'c.csv')
+        self.assertEqual(results[2]['dataset']['equipment_count'], 7)
+        self.assertEqual(sorted(Dataset.objects.values_list('name', flat=True)), ['a.csv', 'c.csv'])
+        self.assertEqual(Dataset.objects.get(name='c.csv').aggregates['count'], 7)
+
+    def test_retention_applies_once_to_the_whole_batch(self):
+        old = [self.create_dataset(sample_rows(3), f'old-{i}.csv').id for i in range(MAX_DATASETS_PER_USER - 1)]
+        response = self.batch([(f'new-{i}.csv', equipment_csv(sample_rows(3, i))) for i in range(3)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(response.data['deleted']), old[:2])
+        self.assertTrue(all(result['retained'] for result in response.data['results']))
+        self.assertEqual(Dataset.objects.count(), MAX_DATASETS_PER_USER)
+
+    def test_batch_larger_than_retention_keeps_its_newest_files(self):
+        count = MAX_DATASETS_PER_USER + 2
+        response = self.batch([(f'new-{i}.csv', equipment_csv(sample_rows(3, i))) for i in range(count)])
+        self.assertEqual(response.status_code, 201)
+        retained = [result['retained'] for result in response.data['results']]
+        self.assertEqual(retained, [False] * 2 + [True] * MAX_DATASETS_PER_USER)
+        self.assertEqual(
+            sorted(Dataset.objects.values_list('name', flat=True)),
+            [f'new-{i}.csv' for i in range(2, count)],
+        )
+
+    def test_file_count_limits(self):
+        self.assertEqual(self.client.post('/api/upload/batch/', {}).status_code, 400)
+        with self.settings(BATCH_UPLOAD_MAX_FILES=2):
+            response = self.batch([(f'{i}.csv', equipment_csv(sample_rows(1))) for i in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Dataset.objects.exists())
+
+
+class SeriesTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows = sample_rows(100)
+        self.dataset = self.create_dataset(self.rows)
+        self.frame = pd.DataFrame(self.rows, columns=['equipment_name', 'equipment_type', *PARAMETERS])
+
+    def series(self, query=''):
+        return self.client.get(f'/api/datasets/{self.dataset.id}/series/?{query}')
+
+    def test_buckets_hold_the_envelope_of_their_rows(self):
+        data = self.series('buckets=8').data
+        self.assertEqual((data['total'], data['start'], data['stop'], data['step']), (100, 0, 100, 13))
+        self.assertEqual(len(data['x']), 8)
+        self.assertEqual(data['x'][0], 6.0)
+        self.assertEqual(data['x'][-1], 95.0)
+        self.assertNotIn('names', data)
+        for parameter in PARAMETERS:
+            groups = self.frame[parameter].groupby(np.arange(100) // 13)
+            self.assertEqual(data['parameters'][parameter]['min'], groups.min().tolist())
+            self.assertEqual(data['parameters'][parameter]['max'], groups.max().tolist())
+
+    def test_ranges_align_to_buckets(self):
+        data = self.series('start=30&stop=70&buckets=10').data
+        self.assertEqual((data['start'], data['stop'], data['step']), (28, 70, 4))
+        self.assertEqual(data['parameters']['flowrate']['min'][0], 128.0)
+
+    def test_single_rows_include_names(self):
+        data = self.series('start=10&stop=15&buckets=100').data
+        self.assertEqual((data['start'], data['stop'], data['step']), (10, 15, 1))
+        self.assertEqual(data['x'], [10, 11, 12, 13, 14])
+        self.assertEqual(data['names'], [row[0] for row in self.rows[10:15]])
+        self.assertEqual(data['parameters']['pressure']['min'], [row[3] for row in self.rows[10:15]])
+
+    def test_stop_past_the_end_is_clamped(self):
+        data = self.series('start=95&stop=500').data
+        self.assertEqual((data['start'], data['stop']), (95, 100))
+        self.assertEqual(self.series('start=100').data['x'], [])
+        self.assertEqual(self.series('start=101').status_code, 400)
+
+    def test_invalid_requests(self):
+        for query in ['start=-1', 'start=50&stop=40', 'buckets=0', 'buckets=10001', 'start=x']:
+            with self.subTest(query=query):
+                self.assertEqual(self.series(query).status_code, 400)
+
+
+class FilterTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows = sample_rows(30)
+        self.dataset = self.create_dataset(self.rows)
+
+    def names(self, query):
+        response = self.client.get(f'/api/equipment/?page_size=1000&{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['equipment_name'] for row in response.data['results']]
+
+    def test_type(self):
+        self.assertEqual(self.names('type=Pump'), [row[0] for row in self.rows if row[1] == 'Pump'])
+        self.assertEqual(self.names('type=Pump&type=Valve'), [row[0] for row in self.rows if row[1] != 'Reactor'])
+        self.assertEqual(self.names('type=Compressor'), [])
+
+    def test_type_containing_a_comma(self):
+        self.dataset.equipment.create(
+            equipment_name='HX-1', equipment_type='Exchanger, shell', flowrate=1.0, pressure=1.0, temperature=1.0
+        )
+        self.assertEqual(self.names('type=Exchanger, shell'), ['HX-1'])
+        self.assertEqual(self.names('type=Exchanger'), [])
+        self.assertEqual(self.names('type=Exchanger, shell&type=Valve')[-1], 'HX-1')
+
+    def test_ranges(self):
+        bounds = {'flowrate': 115.0, 'pressure': 2.0, 'temperature': 35.0}
+        compare = {
+            'gt': lambda a, b: a > b, 'gte': lambda a, b: a >= b,
+            'lt': lambda a, b: a < b, 'lte': lambda a, b: a <= b,
+        }
+        for index, parameter in enumerate(PARAMETERS, start=2):
+            for lookup, matches in compare.items():
+                with self.subTest(parameter=parameter, lookup=lookup):
+                    expected = [row[0] for row in self.rows if matches(row[index], bounds[parameter])]
+                    self.assertTrue(0 < len(expected) < len(self.rows))
+                    self.assertEqual(self.names(f'{parameter}__{lookup}={bounds[parameter]}'), expected)
+        self.assertEqual(
+            self.names('type=Pump&pressure__gte=2&temperature__lt=40'),
+            [row[0] for row in self.rows if row[1] == 'Pump' and row[3] >= 2 and row[4] < 40],
+        )
+
+    def test_non_numeric_bound(self):
+        response = self.client.get('/api/equipment/?pressure__gt=high&flowrate__lte=1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data), ['pressure__gt'])
+
+    def test_ordering_across_pages(self):
+        expected = [row[0] for row in sorted(self.rows, key=lambda row: (-row[3], row[0]))]
+        names = []
+        for page in range(1, 6):
+            response = self.client.get(f'/api/equipment/?ordering=-pressure,id&page_size=7&page={page}')
+            self.assertEqual(response.data['count'], len(self.rows))
+            names += [row['equipment_name'] for row in response.data['results']]
+        self.assertEqual(names, expected)
+        self.assertEqual(self.client.get('/api/equipment/?page_size=7&page=6').status_code, 404)
+
+    def test_only_own_rows(self):
+        bob = User.objects.create_user('bob', password='bob-password')
+        other = Dataset.objects.create(user=bob, name='bob.csv')
+        other.equipment.create(
+            equipment_name='BOB-1', equipment_type='Pump', flowrate=500.0, pressure=9.0, temperature=90.0
+        )
+        self.assertNotIn('BOB-1', self.names('type=Pump&flowrate__gt=0'))
+        self.assertEqual(self.names(f'dataset={other.id}'), [])
+        self.assertEqual(self.names(f'dataset={self.dataset.id},{other.id}&pressure__gt=8'), [])
+        self.client.force_authenticate(bob)
+        self.assertEqual(self.names('type=Pump'), ['BOB-1'])
+
+class SearchTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        names = ['Old Feed Pump', 'Pump-10', 'Valve', 'Feed Pump', 'Pump', 'Pump-1']
+        self.dataset = self.create_dataset([(name, 'Pump', 100.0, 1.0, 20.0) for name in names])
+
+    def search(self, query, mode='substring'):
+        response = self.client.get('/api/equipment/search/', {'q': query, 'mode': mode})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['equipment_name'] for row in response.data['results']]
+
+    def fts_rowids(self, query):
+        """Rows the FTS index itself matches, bypassing the content table."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [f'"{query}"'])
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def require_fts(self):
+        if connection.vendor != 'sqlite' or not _has_fts_table(connection.alias):
+            self.skipTest('no FTS5 trigram index')
+
+    def test_substring_and_prefix(self):
+        self.assertEqual(self.search('feed pump'), ['Feed Pump', 'Old Feed Pump'])
+        self.assertEqual(self.search('feed', mode='prefix'), ['Feed Pump'])
+        self.assertEqual(self.search('ump-1', mode='prefix'), [])
+        self.assertEqual(self.search('nothing'), [])
+
+    def test_ranking(self):
+        # Exact, then prefix, then substring matches, shorter names first within each.
+        self.assertEqual(self.search('pump'), ['Pump', 'Pump-1', 'Pump-10', 'Feed Pump', 'Old Feed Pump'])
+        self.assertEqual(self.search('pump', mode='prefix'), ['Pump', 'Pump-1', 'Pump-10'])
+
+    def test_only_own_datasets(self):
+        bob = User.objects.create_user('bob', password='bob-password')
+        Dataset.objects.create(user=bob, name='bob.csv').equipment.create(
+            equipment_name='Pump-99', equipment_type='Pump', flowrate=1.0, pressure=1.0, temperature=1.0
+        )
+        self.assertNotIn('Pump-99', self.search('pump'))
+        self.client.force_authenticate(bob)
+        self.assertEqual(self.search('pump'), ['Pump-99'])
+
+    def test_index_follows_inserts_and_deletes(self):
+        self.require_fts()
+        ids = list(self.dataset.equipment.filter(equipment_name__icontains='pump').values_list('id', flat=True))
+        self.assertEqual(self.fts_rowids('Pump'), sorted(ids))
+        other = self.create_dataset([('Pump-20', 'Pump', 1.0, 1.0, 1.0)], 'other.csv')
+        self.assertEqual(len(self.fts_rowids('Pump-20')), 1)
+
+        # Deleting a dataset cascades to its rows, and the trigger drops them from the index.
+        self.client.delete(f'/api/datasets/{self.dataset.id}/')
+        self.assertEqual(self.fts_rowids('Pump'), [other.equipment.get().id])
+        self.assertEqual(self.search('pump'), ['Pump-20'])
+
+    def test_short_queries_scan_with_like(self):
+        self.require_fts()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search('p-'), ['Pump-1', 'Pump-10'])
+        self.assertFalse(any('MATCH' in query['sql'] for query in queries.captured_queries))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search('p-1'), ['Pump-1', 'Pump-10'])
+        self.assertTrue(any('MATCH' in query['sql'] for query in queries.captured_queries))
+
+    def test_without_fts_table(self):
+        with mock.patch.dict('equipment.search._fts_tables', {connection.alias: False}):
+            self.assertEqual(self.search('pump', mode='prefix'), ['Pump', 'Pump-1', 'Pump-10'])
+            self.assertEqual(self.search('feed pump'), ['Feed Pump', 'Old Feed Pump'])
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, METRICS_ALLOWED_IPS=['127.0.0.1'])
+class InstrumentationTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        registry = mock.patch('equipment.instrumentation.metrics', MetricsRegistry())
+        self.metrics = registry.start()
+        self.addCleanup(registry.stop)
+
+    def server_timing(self, response):
+        entries = [entry.split(';dur=') for entry in response['Server-Timing'].split(', ')]
+        return {name: float(duration) for name, duration in entries}
+
+    def scrape(self, client=None, **extra):
+        return (client or self.client).get('/metrics', **extra)
+
+    def test_server_timing_phases(self):
+        timings = self.server_timing(self.upload(sample_rows(20)))
+        self.assertEqual(list(timings), ['csv_parse', 'db_insert', 'total'])
+        self.assertLessEqual(timings['csv_parse'] + timings['db_insert'], timings['total'])
+
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        response = self.upload(sample_rows(5))
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.scrape().status_code, 404)
+        self.assertEqual(self.metrics.requests, {})
+
+    def test_prometheus_output(self):
+        self.upload(sample_rows(20))
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        lines = response.content.decode().splitlines()
+        self.assertIn('# TYPE equipment_http_requests_total counter', lines)
+        self.assertIn('equipment_http_requests_total{endpoint="upload",method="POST",status="201"} 1', lines)
+        self.assertIn('equipment_http_request_duration_seconds_bucket{endpoint="upload",le="+Inf"} 1', lines)
+        self.assertIn('equipment_http_request_duration_seconds_count{endpoint="upload"} 1', lines)
+        self.assertIn('equipment_phase_duration_seconds_count{endpoint="upload",phase="csv_parse"} 1', lines)
+        buckets = [line for line in lines if line.startswith('equipment_http_request_duration_seconds_bucket')]
+        counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+        self.assertEqual(counts, sorted(counts))
+
+    def test_metrics_access(self):
+        outsider = {'REMOTE_ADDR': '203.0.113.7'}
+        self.assertEqual(self.scrape(client=APIClient()).status_code, 200)
+        self.assertEqual(self.scrape(client=APIClient(), **outsider).status_code, 403)
+        self.assertEqual(self.scrape(**outsider).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.scrape(**outsider).status_code, 200)
+        with override_settings(METRICS_ALLOWED_IPS=['203.0.113.0/24']):
+            self.assertEqual(self.scrape(client=APIClient(), **outsider).status_code, 200)
+
+    def test_streaming_response(self):
+        dataset = self.create_dataset(sample_rows(25))
+        with mock.patch('equipment.exports.EXPORT_CHUNK_SIZE', 10):
+            response = self.client.get(f'/api/datasets/{dataset.id}/export.csv')
+            self.assertTrue(response.streaming)
+            # The header is sent before the body, so it cannot include the streaming yet.
+            self.assertNotIn('stream', self.server_timing(response))
+            self.assertFalse(any(key[0] == 'dataset-export-csv' for key in self.metrics.requests))
+            content = b''.join(response.streaming_content)
+        self.assertEqual(len(content.splitlines()), 26)
+        self.assertEqual(self.metrics.requests[('dataset-export-csv', 'GET', 200)], 1)
+        total, count = self.metrics.phases[('dataset-export-csv', 'stream')]
+        self.assertEqual(count, 1)
+        self.assertGreater(total, 0)
@@ -0,0 +1,90 @@
+"""Disk storage for resumable chunked uploads.
+
+Each ``UploadSession`` owns a directory under ``UPLOAD_SESSION_ROOT`` holding one file per
+received chunk. Chunks are written to a temporary name and renamed into place, so a
+connection dropped mid-chunk never leaves a truncated chunk behind; the client just sends
+that chunk again.
+"""
+
+import os
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import UploadSession
+
+
+class ChunkTooLarge(ValueError):
+    """Raised when a chunk exceeds ``UPLOAD_CHUNK_MAX_SIZE``."""
+
+
+def session_dir(session):
+    return os.path.join(settings.UPLOAD_SESSION_ROOT, str(session.id))
+
+
+def chunk_path(session, index):
+    return os.path.join(session_dir(session), f'{index:06d}.part')
+
+
+def write_chunk(session, index, stream):
+    """Copy ``stream`` to chunk ``index`` of ``session`` and return its size in bytes."""
+    os.makedirs(session_dir(session), exist_ok=True)
+    path = chunk_path(session, index)
+    partial = path + '.tmp'
+    size = 0
+    try:
+        with open(partial, 'wb') as f:
+            while True:
+                block = stream.read(64 * 1024) if stream is not None else b''
+                if not block:
+                    break
+                size += len(block)
+                if size > settings.UPLOAD_CHUNK_MAX_SIZE:
+                    raise ChunkTooLarge(f'Chunks may be at most {settings.UPLOAD_CHUNK_MAX_SIZE} bytes')
+                f.write(block)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return size
+
+
+def received_chunks(session):
+    """Indexes of the chunks stored for ``session``, in ascending order."""
+    try:
+        names = os.listdir(session_dir(session))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-len('.part')]) for name in names if name.endswith('.part'))
+
+
+def assemble(session):
+    """Concatenate all chunks of ``session`` into one file and return its path."""
+    path = os.path.join(session_dir(session), 'assembled')
+    with open(path, 'wb') as out:
+        for index in range(session.total_chunks):
+            with open(chunk_path(session, index), 'rb') as chunk:
+                shutil.copyfileobj(chunk, out)
+    return path
+
+
+def discard(session):
+    """Delete ``session`` and everything stored for it."""
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+    session.delete()
+
+
+def expire_sessions():
+    """Delete sessions older than ``UPLOAD_SESSION_TTL`` and chunk directories without a session."""
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    UploadSession.objects.filter(created_at__lt=cutoff).delete()
+    if not os.path.isdir(settings.UPLOAD_SESSION_ROOT):
+        return
+    live = {str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)}
+    for name in os.listdir(settings.UPLOAD_SESSION_ROOT):
+        path = os.path.join(settings.UPLOAD_SESSION_ROOT, name)
+        # Only sweep old directories, so a session created meanwhile keeps its first chunks.
+        if name not in live and os.path.getmtime(path) < cutoff.timestamp():
+            shutil.rmtree(path, ignore_errors=True)
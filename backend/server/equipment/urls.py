@@ -1,14 +1,36 @@
+import re
+
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 
-router = DefaultRouter()
+
+class Router(DefaultRouter):
+    """DefaultRouter that drops the trailing slash from file actions (``url_path=r'export\\.csv'``).
+
+    ``/datasets/1/export.csv`` then resolves directly instead of redirecting; the
+    slashed form still matches.
+    """
+    file_route = re.compile(r'\\\.\w+\{trailing_slash\}\$$')
+
+    def get_routes(self, viewset):
+        return [
+            route._replace(url=route.url.replace('{trailing_slash}', '/?'))
+            if self.file_route.search(route.url) else route
+            for route in super().get_routes(viewset)
+        ]
+
+
+router = Router()
 router.register(r'datasets', views.DatasetViewSet, basename='dataset')
+router.register(r'equipment', views.EquipmentViewSet, basename='equipment')
+router.register(r'uploads', views.UploadSessionViewSet, basename='upload-session')
 
 urlpatterns = [
     path('auth/register/', views.register, name='register'),
     path('auth/login/', views.login, name='login'),
     path('auth/logout/', views.logout, name='logout'),
     path('upload/', views.upload_csv, name='upload'),
+    path('upload/batch/', views.upload_batch, name='upload-batch'),
     path('', include(router.urls)),
 ]
@@ -1,37 +1,67 @@
-import io
-from django.http import HttpResponse
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.http import HttpResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate
-from rest_framework import status, viewsets
+from django.db import transaction
+from django.db.models import Count
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import numpy as np
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.enums import TA_CENTER
-
-from .models import Dataset, Equipment
+
+from .analytics import (
+    PARAMETERS,
+    batch_aggregates,
+    cached,
+    compare_datasets,
+    describe_aggregates,
+    equipment_frame,
+    histogram,
+    merge_aggregates,
+    row_envelope,
+    type_statistics,
+)
+from .etags import revision_etag
+from .exports import parquet_available, stream_csv, stream_parquet
+from .filters import EquipmentFilterBackend
+from .instrumentation import phase
+from .models import Dataset, Equipment, UploadSession
+from .querybudget import query_budget
+from .pagination import EquipmentPagination
+from .parsing import CSVSchemaError, csv_compression, csv_display_name, read_equipment_csv
+from .reports import build_report
+from .search import SEARCH_MODES, search_equipment
+from .uploads import ChunkTooLarge, assemble, discard, expire_sessions, received_chunks, write_chunk
 from .serializers import (
     DatasetListSerializer,
     DatasetDetailSerializer,
     SummarySerializer,
     EquipmentSerializer,
+    EquipmentSearchSerializer,
+    UploadSessionSerializer,
     UserRegistrationSerializer,
     LoginSerializer,
 )
 
 
 MAX_DATASETS_PER_USER = 5
+COMPARE_DEFAULT_BINS = 10
+COMPARE_MAX_BINS = 100
+HISTOGRAM_DEFAULT_BINS = 20
+HISTOGRAM_MAX_BINS = 500
+SERIES_DEFAULT_BUCKETS = 1000
+SERIES_MAX_BUCKETS = 10000
+# Retention, then one dataset insert, equipment insert and aggregates update (plus the
+# transaction savepoint) per file.
+BATCH_QUERY_BUDGET = 10 + 5 * settings.BATCH_UPLOAD_MAX_FILES
 
 
+@query_budget(6)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
@@ -51,6 +81,7 @@ def register(request):
         return Response({'error': 'Registration failed', 'details': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@query_budget(4)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login(request):
@@ -75,6 +106,7 @@ def login(request):
         return Response({'error': 'Login failed', 'details': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@query_budget(2)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout(request):
@@ -83,53 +115,88 @@ def logout(request):
     return Response({'message': 'Logged out successfully'})
 
 
+def create_equipment(dataset, frame):
+    """Insert ``frame`` rows into ``dataset`` and return their running aggregates."""
+    # Pull whole columns out as Python lists once instead of building a Series per row.
+    columns = [frame[column].tolist() for column in ('equipment_name', 'equipment_type', *PARAMETERS)]
+    equipment_list = [
+        Equipment(
+            dataset=dataset,
+            equipment_name=name,
+            equipment_type=equipment_type,
+            flowrate=flowrate,
+            pressure=pressure,
+            temperature=temperature
+        )
+        for name, equipment_type, flowrate, pressure, temperature in zip(*columns)
+    ]
+    Equipment.objects.bulk_create(equipment_list)
+    return batch_aggregates(frame)
+
+
+def enforce_retention(user, keep=MAX_DATASETS_PER_USER):
+    """Delete the user's oldest datasets so that at most ``keep`` remain; return their ids."""
+    stale = list(
+        Dataset.objects.filter(user=user).order_by('-uploaded_at', '-id').values_list('id', flat=True)[keep:]
+    )
+    if stale:
+        Dataset.objects.filter(id__in=stale).delete()
+    return stale
+
+
+def create_dataset(user, csv_file, frame):
+    """Save ``csv_file`` as a new dataset for ``user`` holding the rows of ``frame``."""
+    # Reset file pointer and save
+    csv_file.seek(0)
+    dataset = Dataset.objects.create(
+        name=csv_display_name(csv_file.name),
+        user=user,
+        file=csv_file
+    )
+    dataset.aggregates = create_equipment(dataset, frame)
+    dataset.save(update_fields=['aggregates'])
+    return dataset
+
+
+@query_budget(10)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def upload_csv(request):
-    """Upload CSV file and create dataset with equipment records."""
+    """Upload CSV file and create dataset with equipment records.
+    
+    With a ``dataset`` id, the rows are appended to that existing dataset instead.
+    """
     if 'file' not in request.FILES:
         return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
     
-    csv_file = request.FILES['file']
-    if not csv_file.name.endswith('.csv'):
-        return Response({'error': 'File must be a CSV'}, status=status.HTTP_400_BAD_REQUEST)
+    dataset_id = request.data.get('dataset')
+    if dataset_id is not None and not str(dataset_id).isdigit():
+        return Response({'error': 'dataset must be an integer id'}, status=status.HTTP_400_BAD_REQUEST)
     
+    return ingest_csv(request, request.FILES['file'], dataset_id)
+
+
+def ingest_csv(request, csv_file, dataset_id=None):
+    """Parse a (possibly compressed) CSV into a new dataset, or append it to ``dataset_id``."""
     try:
-        df = pd.read_csv(csv_file)
-        required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-        missing_cols = [col for col in required_columns if col not in df.columns]
-        if missing_cols:
-            return Response(
-                {'error': f'Missing columns: {missing_cols}'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Enforce 5-dataset limit
-        user_datasets = Dataset.objects.filter(user=request.user).order_by('-uploaded_at')
-        if user_datasets.count() >= MAX_DATASETS_PER_USER:
-            oldest = user_datasets.last()
-            oldest.delete()
+        compression = csv_compression(csv_file.name)
+    except CSVSchemaError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        with phase('csv_parse'):
+            try:
+                frame = read_equipment_csv(csv_file, compression=compression)
+            except CSVSchemaError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Reset file pointer and save
-        csv_file.seek(0)
-        dataset = Dataset.objects.create(
-            name=csv_file.name,
-            user=request.user,
-            file=csv_file
-        )
+        if dataset_id is not None:
+            return append_rows(request, int(dataset_id), frame)
         
-        # Create equipment records
-        equipment_list = []
-        for _, row in df.iterrows():
-            equipment_list.append(Equipment(
-                dataset=dataset,
-                equipment_name=row['Equipment Name'],
-                equipment_type=row['Type'],
-                flowrate=float(row['Flowrate']),
-                pressure=float(row['Pressure']),
-                temperature=float(row['Temperature'])
-            ))
-        Equipment.objects.bulk_create(equipment_list)
+        with phase('db_insert'):
+            # Enforce 5-dataset limit, leaving room for the new one
+            enforce_retention(request.user, MAX_DATASETS_PER_USER - 1)
+            dataset = create_dataset(request.user, csv_file, frame)
         
         return Response(
             DatasetDetailSerializer(dataset).data, 
@@ -139,231 +206,396 @@ def upload_csv(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+def parse_upload(csv_file):
+    """Parse one uploaded file, returning ``(frame, None)`` or ``(None, error message)``."""
+    try:
+        return read_equipment_csv(csv_file, compression=csv_compression(csv_file.name)), None
+    except Exception as e:
+        return None, str(e)
+
+
+@query_budget(BATCH_QUERY_BUDGET)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_batch(request):
+    """Upload several CSV files at once, each becoming its own dataset.
+    
+    Files are parsed concurrently, then inserted one transaction per file, so one bad file
+    does not affect the others. Retention runs once after the whole batch.
+    """
+    files = request.FILES.getlist('files')
+    if not files:
+        return Response({'error': 'No files provided'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+        return Response(
+            {'error': f'At most {settings.BATCH_UPLOAD_MAX_FILES} files per batch'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    with phase('csv_parse'):
+        workers = min(settings.BATCH_UPLOAD_WORKERS, len(files))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_upload, files))
+    
+    results = []
+    with phase('db_insert'):
+        for csv_file, (frame, error) in zip(files, parsed):
+            if error is None:
+                try:
+                    with transaction.atomic():
+                        dataset = create_dataset(request.user, csv_file, frame)
+                except Exception as e:
+                    error = str(e)
+            if error is not None:
+                results.append({'file': csv_file.name, 'status': status.HTTP_400_BAD_REQUEST, 'error': error})
+                continue
+            dataset.equipment_count = len(frame)
+            results.append({
+                'file': csv_file.name,
+                'status': status.HTTP_201_CREATED,
+                'dataset': DatasetListSerializer(dataset).data,
+            })
+        deleted = enforce_retention(request.user)
+    
+    # A batch larger than the retention limit only keeps its newest datasets.
+    for result in results:
+        if 'dataset' in result:
+            result['retained'] = result['dataset']['id'] not in deleted
+    failed = any(result['status'] != status.HTTP_201_CREATED for result in results)
+    return Response(
+        {'results': results, 'deleted': deleted},
+        status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
+    )
+
+
+def append_rows(request, dataset_id, frame):
+    """Append ``frame`` to one of the user's datasets, updating its aggregates in place."""
+    with phase('db_insert'), transaction.atomic():
+        # Lock the dataset row so concurrent appends merge into each other's aggregates.
+        dataset = (
+            Dataset.objects.select_for_update()
+            .only('id', 'aggregates', 'revision')
+            .filter(pk=dataset_id, user=request.user)
+            .first()
+        )
+        if dataset is None:
+            return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
+        batch = create_equipment(dataset, frame)
+        dataset.aggregates = merge_aggregates(dataset.aggregates, batch)
+        # A new revision moves every derived cache entry (stats, histograms) to fresh keys.
+        dataset.revision += 1
+        dataset.save(update_fields=['aggregates', 'revision'])
+    
+    return Response({
+        'dataset_id': dataset.id,
+        'revision': dataset.revision,
+        'appended': len(frame),
+        'total_count': dataset.aggregates.get('count', 0),
+    })
+
+
 class DatasetViewSet(viewsets.ModelViewSet):
     """ViewSet for dataset operations."""
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2,
+        'retrieve': 3,
+        'destroy': 5,
+    }
     
     def get_queryset(self):
-        return Dataset.objects.filter(user=self.request.user)
+        queryset = Dataset.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            # Meta.ordering is ignored once the query is grouped, so restate it.
+            queryset = queryset.annotate(equipment_count=Count('equipment')).order_by('-uploaded_at')
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
             return DatasetListSerializer
         return DatasetDetailSerializer
     
+    def get_object(self):
+        # Conditional GETs load the dataset before the action runs; look it up only once.
+        if not hasattr(self, '_dataset'):
+            self._dataset = super().get_object()
+        return self._dataset
+    
+    @revision_etag
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    @query_budget(7)
+    @action(detail=False, methods=['get'])
+    def compare(self, request):
+        """Compare several datasets: aligned summaries, per-type deltas and distributions."""
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+            bins = int(request.query_params.get('bins', COMPARE_DEFAULT_BINS))
+        except ValueError:
+            return Response({'error': 'ids and bins must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(ids))
+        if not 1 <= len(ids) <= MAX_DATASETS_PER_USER:
+            return Response(
+                {'error': f'Provide between 1 and {MAX_DATASETS_PER_USER} dataset ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= bins <= COMPARE_MAX_BINS:
+            return Response(
+                {'error': f'bins must be between 1 and {COMPARE_MAX_BINS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        datasets = {dataset.id: dataset for dataset in self.get_queryset().filter(id__in=ids)}
+        missing = [dataset_id for dataset_id in ids if dataset_id not in datasets]
+        if missing:
+            return Response({'error': f'Datasets not found: {missing}'}, status=status.HTTP_404_NOT_FOUND)
+        
+        with phase('aggregation'):
+            comparison = compare_datasets([datasets[dataset_id] for dataset_id in ids], bins)
+        return Response(comparison)
+    
+    @query_budget(2)
     @action(detail=True, methods=['get'])
+    @revision_etag
     def summary(self, request, pk=None):
         """Get summary statistics for a dataset."""
         dataset = self.get_object()
-        equipment = dataset.equipment.all()
-        
-        if not equipment.exists():
+        aggregates = dataset.aggregates
+        if not aggregates.get('count'):
             return Response({'error': 'No equipment data'}, status=status.HTTP_404_NOT_FOUND)
         
-        type_distribution = {}
-        for eq in equipment:
-            type_distribution[eq.equipment_type] = type_distribution.get(eq.equipment_type, 0) + 1
-        
+        # Served from the running aggregates kept on the dataset, not from the rows.
+        parameters = describe_aggregates(aggregates)
         summary_data = {
-            'total_count': equipment.count(),
-            'avg_flowrate': sum(e.flowrate for e in equipment) / equipment.count(),
-            'avg_pressure': sum(e.pressure for e in equipment) / equipment.count(),
-            'avg_temperature': sum(e.temperature for e in equipment) / equipment.count(),
-            'type_distribution': type_distribution,
+            'total_count': aggregates['count'],
+            'type_distribution': aggregates['type_counts'],
+            'parameters': parameters,
+            **{f'avg_{parameter}': parameters[parameter]['mean'] for parameter in PARAMETERS},
         }
-        
         return Response(SummarySerializer(summary_data).data)
     
+    @query_budget(3)
     @action(detail=True, methods=['get'])
-    def report(self, request, pk=None):
-        """Generate PDF report for a dataset with charts."""
+    @revision_etag
+    def stats(self, request, pk=None):
+        """Get per-type min, max, mean, std and percentiles for each parameter."""
         dataset = self.get_object()
-        equipment = list(dataset.equipment.all())
         
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=letter,
-            rightMargin=0.5*inch,
-            leftMargin=0.5*inch,
-            topMargin=0.5*inch,
-            bottomMargin=0.5*inch
-        )
-        elements = []
-        styles = getSampleStyleSheet()
+        def compute():
+            frame = equipment_frame(dataset.equipment.all())
+            if frame.empty:
+                return {}
+            with phase('aggregation'):
+                return type_statistics(frame)
         
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=20,
-            textColor=colors.HexColor('#1e293b'),
-            alignment=TA_CENTER
-        )
+        stats = cached(dataset, 'stats', compute)
+        if not stats:
+            return Response({'error': 'No equipment data'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'dataset_id': dataset.id, **stats})
+    
+    @query_budget(3)
+    @action(detail=True, methods=['get'])
+    @revision_etag
+    def histogram(self, request, pk=None):
+        """Get binned counts for one parameter, optionally grouped by equipment type."""
+        dataset = self.get_object()
+        parameter = request.query_params.get('parameter')
+        if parameter not in PARAMETERS:
+            return Response(
+                {'error': f'parameter must be one of {PARAMETERS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        group_by_type = request.query_params.get('group_by') == 'type'
         
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceBefore=20,
-            spaceAfter=10,
-            textColor=colors.HexColor('#334155')
-        )
+        try:
+            if 'edges' in request.query_params:
+                edges = [float(value) for value in request.query_params['edges'].split(',')]
+                bins = None
+                if not 2 <= len(edges) <= HISTOGRAM_MAX_BINS + 1 or not all(map(math.isfinite, edges)):
+                    raise ValueError
+                if any(high <= low for low, high in zip(edges, edges[1:])):
+                    raise ValueError
+            else:
+                edges = None
+                bins = int(request.query_params.get('bins', HISTOGRAM_DEFAULT_BINS))
+                if not 1 <= bins <= HISTOGRAM_MAX_BINS:
+                    raise ValueError
+        except ValueError:
+            return Response(
+                {'error': f'Provide bins (1-{HISTOGRAM_MAX_BINS}) or at least two strictly increasing edges'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Title
-        elements.append(Paragraph(f"Equipment Report: {dataset.name}", title_style))
-        elements.append(Spacer(1, 10))
+        def compute():
+            fields = ('equipment_type', parameter) if group_by_type else (parameter,)
+            frame = equipment_frame(dataset.equipment.all(), fields)
+            with phase('aggregation'):
+                return histogram(frame, parameter, bins=bins, edges=edges, group_by_type=group_by_type)
         
-        # Summary Statistics
-        if equipment:
-            count = len(equipment)
-            avg_flow = sum(e.flowrate for e in equipment) / count
-            avg_press = sum(e.pressure for e in equipment) / count
-            avg_temp = sum(e.temperature for e in equipment) / count
-            
-            # Summary cards as a table
-            summary_data = [
-                ['Total Equipment', 'Avg Flowrate', 'Avg Pressure', 'Avg Temperature'],
-                [str(count), f'{avg_flow:.2f}', f'{avg_press:.2f}', f'{avg_temp:.2f}']
-            ]
-            summary_table = Table(summary_data, colWidths=[1.8*inch]*4)
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e293b')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#f1f5f9')),
-                ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1e293b')),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, 1), 18),
-                ('TOPPADDING', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e1')),
-                ('LINEBEFORE', (1, 0), (1, -1), 1, colors.HexColor('#cbd5e1')),
-                ('LINEBEFORE', (2, 0), (2, -1), 1, colors.HexColor('#cbd5e1')),
-                ('LINEBEFORE', (3, 0), (3, -1), 1, colors.HexColor('#cbd5e1')),
-            ]))
-            elements.append(summary_table)
-            elements.append(Spacer(1, 20))
-            
-            # Generate Type Distribution Chart
-            type_distribution = {}
-            for eq in equipment:
-                type_distribution[eq.equipment_type] = type_distribution.get(eq.equipment_type, 0) + 1
-            
-            if type_distribution:
-                fig1, ax1 = plt.subplots(figsize=(7, 3.5))
-                types = list(type_distribution.keys())
-                counts = list(type_distribution.values())
-                
-                # Create gradient-like bar colors
-                bar_colors = ['#64748b'] * len(types)
-                bars = ax1.bar(types, counts, color=bar_colors, edgecolor='#334155', linewidth=0.5)
-                
-                ax1.set_ylabel('Count', fontsize=10, color='#334155')
-                ax1.set_title('Equipment Type Distribution', fontsize=14, fontweight='bold', color='#1e293b', pad=15)
-                ax1.set_xticklabels(types, rotation=45, ha='right', fontsize=8)
-                ax1.tick_params(axis='y', labelsize=8, colors='#64748b')
-                ax1.tick_params(axis='x', colors='#64748b')
-                ax1.spines['top'].set_visible(False)
-                ax1.spines['right'].set_visible(False)
-                ax1.spines['left'].set_color('#cbd5e1')
-                ax1.spines['bottom'].set_color('#cbd5e1')
-                ax1.set_facecolor('#f8fafc')
-                fig1.patch.set_facecolor('#ffffff')
-                
-                plt.tight_layout()
-                
-                chart1_buffer = io.BytesIO()
-                plt.savefig(chart1_buffer, format='png', dpi=150, bbox_inches='tight', 
-                           facecolor='white', edgecolor='none')
-                chart1_buffer.seek(0)
-                plt.close(fig1)
-                
-                chart1_img = Image(chart1_buffer, width=6.5*inch, height=3*inch)
-                elements.append(chart1_img)
-                elements.append(Spacer(1, 15))
-            
-            # Generate Parameter Chart (Line chart)
-            if len(equipment) > 1:
-                fig2, ax2 = plt.subplots(figsize=(7, 3.5))
-                
-                names = [eq.equipment_name for eq in equipment]
-                flowrates = [eq.flowrate for eq in equipment]
-                pressures = [eq.pressure for eq in equipment]
-                temperatures = [eq.temperature for eq in equipment]
-                
-                x = np.arange(len(names))
-                
-                ax2.plot(x, flowrates, marker='s', label='Flowrate', color='#64748b', linewidth=2, markersize=6)
-                ax2.plot(x, pressures, marker='s', label='Pressure', color='#94a3b8', linewidth=2, markersize=6)
-                ax2.plot(x, temperatures, marker='o', label='Temperature', color='#1e293b', linewidth=2, markersize=6)
-                
-                ax2.set_ylabel('Value', fontsize=10, color='#334155')
-                ax2.set_title('Equipment Parameters', fontsize=14, fontweight='bold', color='#1e293b', pad=15)
-                ax2.set_xticks(x)
-                ax2.set_xticklabels(names, rotation=45, ha='right', fontsize=7)
-                ax2.tick_params(axis='y', labelsize=8, colors='#64748b')
-                ax2.tick_params(axis='x', colors='#64748b')
-                ax2.legend(loc='upper right', fontsize=8, framealpha=0.9)
-                ax2.spines['top'].set_visible(False)
-                ax2.spines['right'].set_visible(False)
-                ax2.spines['left'].set_color('#cbd5e1')
-                ax2.spines['bottom'].set_color('#cbd5e1')
-                ax2.set_facecolor('#f8fafc')
-                ax2.grid(True, linestyle='--', alpha=0.3, color='#cbd5e1')
-                fig2.patch.set_facecolor('#ffffff')
-                
-                plt.tight_layout()
-                
-                chart2_buffer = io.BytesIO()
-                plt.savefig(chart2_buffer, format='png', dpi=150, bbox_inches='tight',
-                           facecolor='white', edgecolor='none')
-                chart2_buffer.seek(0)
-                plt.close(fig2)
-                
-                chart2_img = Image(chart2_buffer, width=6.5*inch, height=3*inch)
-                elements.append(chart2_img)
-                elements.append(Spacer(1, 20))
+        binning = f'bins={bins}' if edges is None else 'edges=' + ','.join(map(repr, edges))
+        result = cached(dataset, 'histogram', compute, parameter, binning, 'type' if group_by_type else 'all')
+        return Response({'dataset_id': dataset.id, **result})
+    
+    @query_budget(3)
+    @action(detail=True, methods=['get'])
+    @revision_etag
+    def series(self, request, pk=None):
+        """Get the parameters of a range of rows as per-bucket minima and maxima, for charts.
         
-        # Equipment table
-        elements.append(Paragraph("Equipment Data", heading_style))
-        table_data = [['Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']]
-        for eq in equipment:
-            table_data.append([
-                eq.equipment_name,
-                eq.equipment_type,
-                f"{eq.flowrate:.2f}",
-                f"{eq.pressure:.2f}",
-                f"{eq.temperature:.2f}"
-            ])
+        ``start``/``stop`` select rows in upload order (default: all of them), which are
+        split into at most ``buckets`` buckets; see ``analytics.row_envelope``.
+        """
+        dataset = self.get_object()
+        total = dataset.aggregates.get('count', 0)
+        try:
+            start = int(request.query_params.get('start', 0))
+            stop = min(int(request.query_params.get('stop', total)), total)
+            buckets = int(request.query_params.get('buckets', SERIES_DEFAULT_BUCKETS))
+            if not 0 <= start <= stop or not 1 <= buckets <= SERIES_MAX_BUCKETS:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': f'Provide rows 0 <= start <= stop and buckets (1-{SERIES_MAX_BUCKETS})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        col_widths = [2*inch, 1.5*inch, 1*inch, 1*inch, 1*inch]
-        table = Table(table_data, colWidths=col_widths)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e293b')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8fafc')),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#334155')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#f8fafc'), colors.HexColor('#f1f5f9')]),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e1')),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#1e293b')),
-            ('LINEBELOW', (0, 1), (-1, -2), 0.5, colors.HexColor('#e2e8f0')),
-        ]))
-        elements.append(table)
+        def compute():
+            with phase('aggregation'):
+                return row_envelope(dataset.equipment.all(), start, stop, buckets)
         
-        doc.build(elements)
-        buffer.seek(0)
+        result = cached(dataset, 'series', compute, start, stop, buckets)
+        return Response({'dataset_id': dataset.id, 'total': total, **result})
+    
+    @query_budget(3)
+    @action(detail=True, methods=['get'])
+    @revision_etag
+    def report(self, request, pk=None):
+        """Generate PDF report for a dataset with charts."""
+        dataset = self.get_object()
+        buffer = build_report(dataset, dataset.equipment.all())
         
         response = HttpResponse(buffer, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{dataset.name}_report.pdf"'
         return response
+    
+    @query_budget(3)
+    @action(detail=True, methods=['get'], url_path=r'export\.csv', url_name='export-csv')
+    def export_csv(self, request, pk=None):
+        """Stream the dataset's rows as CSV without loading them all into memory."""
+        dataset = self.get_object()
+        
+        response = StreamingHttpResponse(stream_csv(dataset.equipment.all()), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{os.path.splitext(dataset.name)[0]}.csv"'
+        return response
+    
+    @query_budget(3)
+    @action(detail=True, methods=['get'], url_path=r'export\.parquet', url_name='export-parquet')
+    def export_parquet(self, request, pk=None):
+        """Stream the dataset's rows as Parquet, one row group per chunk."""
+        if not parquet_available():
+            return Response(
+                {'error': 'Parquet export requires pyarrow on the server'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        dataset = self.get_object()
+        
+        response = StreamingHttpResponse(
+            stream_parquet(dataset.equipment.all()), content_type='application/vnd.apache.parquet'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{os.path.splitext(dataset.name)[0]}.parquet"'
+        return response
+
+
+class EquipmentViewSet(viewsets.ReadOnlyModelViewSet):
+    """Filterable, sortable and paginated equipment rows across the user's datasets."""
+    permission_classes = [IsAuthenticated]
+    serializer_class = EquipmentSerializer
+    pagination_class = EquipmentPagination
+    filter_backends = [EquipmentFilterBackend, filters.OrderingFilter]
+    ordering_fields = ['id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+    ordering = ['id']
+    query_budgets = {
+        'list': 3,
+        'retrieve': 2,
+    }
+    
+    def get_queryset(self):
+        return Equipment.objects.filter(dataset__user=self.request.user)
+    
+    @query_budget(4)
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Search equipment names across the user's datasets by substring or prefix."""
+        query = request.query_params.get('q', '').strip()
+        mode = request.query_params.get('mode', 'substring')
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if mode not in SEARCH_MODES:
+            return Response({'error': f'mode must be one of {SEARCH_MODES}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = EquipmentFilterBackend().filter_queryset(request, self.get_queryset(), self)
+        results = search_equipment(queryset.select_related('dataset'), query, mode)
+        page = self.paginate_queryset(results)
+        return self.get_paginated_response(EquipmentSearchSerializer(page, many=True).data)
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """Resumable chunked uploads: create a session, PUT numbered chunks, then complete it."""
+    permission_classes = [IsAuthenticated]
+    serializer_class = UploadSessionSerializer
+    query_budgets = {
+        'create': 6,
+        'retrieve': 2,
+        'destroy': 3,
+    }
+    
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        expire_sessions()
+        serializer.save(user=self.request.user)
+    
+    def perform_destroy(self, instance):
+        discard(instance)
+    
+    @query_budget(2)
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>\d+)')
+    def chunk(self, request, pk=None, index=None):
+        """Store one chunk from the raw request body; re-sending a chunk replaces it."""
+        session = self.get_object()
+        index = int(index)
+        if index >= session.total_chunks:
+            return Response(
+                {'error': f'Chunk index must be below {session.total_chunks}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            size = write_chunk(session, index, request.stream)
+        except ChunkTooLarge as e:
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return Response({'index': index, 'size': size, 'received': received_chunks(session)})
+    
+    @query_budget(12)
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Join the chunks and ingest them like a regular upload."""
+        session = self.get_object()
+        missing = sorted(set(range(session.total_chunks)) - set(received_chunks(session)))
+        if missing:
+            return Response({'error': 'Missing chunks', 'missing': missing}, status=status.HTTP_409_CONFLICT)
+        
+        path = assemble(session)
+        try:
+            with open(path, 'rb') as f:
+                response = ingest_csv(request, File(f, name=session.filename), session.dataset_id)
+        finally:
+            os.remove(path)
+        # Keep the chunks after a failed ingest so a corrected chunk can be re-sent.
+        if response.status_code < 400:
+            discard(session)
+        return response
 
@@ -0,0 +1,51 @@
+"""Environment-driven tuning for the ``DATABASES`` setting.
+
+PostgreSQL gets Django's native psycopg connection pool; SQLite gets pragmas that let
+reads proceed while an upload is writing (WAL) and that wait on locks instead of
+failing immediately.
+"""
+
+import os
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == 'true'
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def sqlite_pragmas():
+    """Return the ``(pragma, value)`` pairs applied to every new SQLite connection."""
+    return [
+        ('journal_mode', os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('mmap_size', _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative values are KiB, so this is a 64 MiB page cache.
+        ('cache_size', _env_int('SQLITE_CACHE_SIZE', -64 * 1024)),
+    ]
+
+
+def tune_database(config):
+    """Apply pooling or pragma options to a ``dj_database_url`` config dict."""
+    engine = config.get('ENGINE', '')
+    options = config.setdefault('OPTIONS', {})
+
+    if engine == 'django.db.backends.postgresql' and _env_bool('DB_POOL_ENABLED', True):
+        options['pool'] = {
+            'min_size': _env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': _env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        }
+        # The pool replaces persistent connections; Django rejects both together.
+        config['CONN_MAX_AGE'] = 0
+
+    elif engine == 'django.db.backends.sqlite3' and _env_bool('SQLITE_TUNING_ENABLED', True):
+        options['init_command'] = ';'.join(f'PRAGMA {name}={value}' for name, value in sqlite_pragmas())
+        # Take the write lock when a transaction starts so concurrent writers queue on
+        # busy_timeout instead of failing with "database is locked" on lock upgrade.
+        options['transaction_mode'] = 'IMMEDIATE'
+
+    return config
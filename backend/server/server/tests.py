@@ -0,0 +1,73 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .database import tune_database
+
+
+TUNING_VARIABLES = [
+    'DB_POOL_ENABLED', 'DB_POOL_MIN_SIZE', 'DB_POOL_MAX_SIZE', 'DB_POOL_TIMEOUT', 'SQLITE_TUNING_ENABLED',
+    'SQLITE_JOURNAL_MODE', 'SQLITE_SYNCHRONOUS', 'SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE',
+]
+
+
+class TuneDatabaseTests(SimpleTestCase):
+    """``tune_database`` on the config dicts ``dj_database_url`` produces."""
+
+    def setUp(self):
+        environ = mock.patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        for name in TUNING_VARIABLES:
+            os.environ.pop(name, None)
+
+    def postgres(self):
+        return {
+            'ENGINE': 'django.db.backends.postgresql', 'NAME': 'equipment', 'CONN_MAX_AGE': 600,
+            'OPTIONS': {'sslmode': 'require'},
+        }
+
+    def sqlite(self):
+        return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': '/tmp/db.sqlite3', 'CONN_MAX_AGE': 600}
+
+    def test_postgres_pool(self):
+        config = tune_database(self.postgres())
+        self.assertEqual(config['OPTIONS'], {
+            'sslmode': 'require', 'pool': {'min_size': 2, 'max_size': 10, 'timeout': 10},
+        })
+        # Django refuses a pool together with persistent connections.
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertNotIn('init_command', config['OPTIONS'])
+
+    def test_postgres_pool_settings(self):
+        os.environ.update(DB_POOL_MIN_SIZE='4', DB_POOL_MAX_SIZE='32', DB_POOL_TIMEOUT='3')
+        config = tune_database(self.postgres())
+        self.assertEqual(config['OPTIONS']['pool'], {'min_size': 4, 'max_size': 32, 'timeout': 3})
+
+    def test_postgres_pool_disabled(self):
+        os.environ['DB_POOL_ENABLED'] = 'False'
+        self.assertEqual(tune_database(self.postgres()), self.postgres())
+
+    def test_sqlite_pragmas(self):
+        config = tune_database(self.sqlite())
+        self.assertEqual(config['OPTIONS'], {
+            'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;PRAGMA busy_timeout=5000;'
+                            'PRAGMA mmap_size=268435456;PRAGMA cache_size=-65536',
+            'transaction_mode': 'IMMEDIATE',
+        })
+        self.assertEqual(config['CONN_MAX_AGE'], 600)
+
+    def test_sqlite_pragma_settings(self):
+        os.environ.update(SQLITE_JOURNAL_MODE='DELETE', SQLITE_BUSY_TIMEOUT_MS='250')
+        init_command = tune_database(self.sqlite())['OPTIONS']['init_command']
+        self.assertIn('PRAGMA journal_mode=DELETE;', init_command)
+        self.assertIn('PRAGMA busy_timeout=250;', init_command)
+
+    def test_sqlite_tuning_disabled(self):
+        os.environ['SQLITE_TUNING_ENABLED'] = 'false'
+        self.assertEqual(tune_database(self.sqlite())['OPTIONS'], {})
+
+    def test_other_engines_are_left_alone(self):
+        config = {'ENGINE': 'django.db.backends.mysql', 'NAME': 'equipment', 'CONN_MAX_AGE': 600}
+        self.assertEqual(tune_database(dict(config)), {**config, 'OPTIONS': {}})
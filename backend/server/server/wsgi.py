@@ -10,7 +10,41 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.http import UnreadablePostError
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
 
-application = get_wsgi_application()
+
+class CompleteRequestBody:
+    """``wsgi.input`` that raises when the body ends before ``CONTENT_LENGTH`` bytes.
+    
+    Servers such as wsgiref (``runserver``) return a short read when the client
+    disconnects, which Django's multipart parser takes for the end of the request; an
+    upload cancelled partway through would be ingested with the files sent so far.
+    """
+    
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+    
+    def read(self, size=-1):
+        return self._received(self.stream.read(size), size)
+    
+    def readline(self, size=-1):
+        return self._received(self.stream.readline(size), size)
+    
+    def _received(self, data, size):
+        self.remaining -= len(data)
+        if not data and size != 0 and self.remaining > 0:
+            raise UnreadablePostError(f'Request body ended {self.remaining} bytes early')
+        return data
+
+
+django_application = get_wsgi_application()
+
+
+def application(environ, start_response):
+    length = environ.get('CONTENT_LENGTH', '')
+    if length.isdigit() and int(length) > 0:
+        environ['wsgi.input'] = CompleteRequestBody(environ['wsgi.input'], int(length))
+    return django_application(environ, start_response)
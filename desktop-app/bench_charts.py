@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Benchmark parameter chart redraws: full rebuild vs. in-place updates, and zoom/pan frames.
+
+    python bench_charts.py --points 1000,100000,1000000
+
+Runs without a display with ``QT_QPA_PLATFORM=offscreen``.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+# Without a display, matplotlib only accepts the Qt backend once a QApplication exists.
+app = QApplication(sys.argv[:1])
+
+from ui.chart_widget import PARAMETER_STYLES, ZOOM_STEP, ParameterChart  # noqa: E402
+
+
+def generate(points: int, seed: int):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"EQ-{i:07d}" for i in range(points)], dtype=object)
+    values = {
+        "flowrate": rng.uniform(50, 500, points),
+        "pressure": rng.uniform(1, 10, points),
+        "temperature": rng.uniform(20, 200, points),
+    }
+    return names, values
+
+
+def rebuild(chart: ParameterChart, names, values):
+    """What ``update_chart`` used to do: clear the figure and plot every point again.
+
+    The old chart also put every equipment name on its own tick, which alone makes it
+    unusable beyond a few thousand rows; that part is left out so the rest can be timed.
+    """
+    chart.figure.clear()
+    ax = chart.figure.add_subplot(111)
+    x = np.arange(len(names))
+    for parameter, (label, color, marker) in PARAMETER_STYLES.items():
+        ax.plot(x, values[parameter], color=color, marker=marker, label=label, markersize=5,
+                linewidth=2, markeredgecolor='white', markeredgewidth=1.5)
+    ax.legend(loc='upper right', fontsize=9)
+    ax.grid(True, alpha=0.15, linestyle='-', linewidth=0.5, color='#e5e7eb')
+    chart.figure.tight_layout()
+    chart.canvas.draw()
+
+
+def incremental(chart: ParameterChart, names, values):
+    chart.set_data(names, values)
+    # set_data schedules a draw_idle; paint now so the timing includes rendering.
+    chart.canvas.draw()
+
+
+def zoom_and_pan(chart: ParameterChart) -> list:
+    """Frame times of zooming from every row down to a dozen around the middle, then panning.
+    
+    The first frame renders the background, and each switch between equipment names and
+    row numbers on the ticks renders it again; all other frames are blitted.
+    """
+    frames = []
+    left, right = chart.full_view()
+    views = []
+    while right - left > 12:
+        middle = (left + right) / 2
+        left, right = middle - (middle - left) / ZOOM_STEP, middle + (right - middle) / ZOOM_STEP
+        views.append((left, right))
+    span = right - left
+    views += [(left + span * i / 4, right + span * i / 4) for i in range(1, 20)]
+    left, right = views[len(views) // 3]
+    views += [(left + (right - left) * i / 10, right + (right - left) * i / 10) for i in range(1, 20)]
+    for view in views:
+        started = time.perf_counter()
+        chart.move_view(*view)
+        frames.append(time.perf_counter() - started)
+    chart.settle()
+    return frames
+
+
+def drawn_points(chart: ParameterChart) -> int:
+    """Points per series actually drawn: the line's, or the band's columns once decimated."""
+    band = chart.bands["flowrate"]
+    if band.get_visible():
+        return len(band.get_paths()[0].vertices) // 2
+    return len(chart.lines["flowrate"].get_xdata())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", default="1000,100000,1000000",
+                        help="Comma-separated series lengths to time.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed redraws per configuration.")
+    parser.add_argument("--width", type=int, default=900, help="Chart width in pixels.")
+    args = parser.parse_args()
+
+    print(f"{'points':>10}{'rebuild ms':>14}{'in-place ms':>14}{'drawn':>10}"
+          f"{'frame p50 ms':>15}{'frame p95 ms':>15}")
+    for points in (int(value) for value in args.points.split(",")):
+        timings = {}
+        for label, redraw in (("rebuild", rebuild), ("in-place", incremental)):
+            chart = ParameterChart()
+            chart.resize(args.width, 400)
+            chart.show()
+            app.processEvents()
+            # Alternate two datasets, as when switching between them in the app.
+            datasets = [generate(points, seed) for seed in (0, 1)]
+            redraw(chart, *datasets[1])
+            samples = []
+            for i in range(args.repeat):
+                started = time.perf_counter()
+                redraw(chart, *datasets[i % 2])
+                samples.append(time.perf_counter() - started)
+            timings[label] = np.median(samples) * 1000
+            if label == "in-place":
+                drawn = drawn_points(chart)
+                frames = zoom_and_pan(chart)
+            chart.close()
+        print(f"{points:>10,}{timings['rebuild']:>14.1f}{timings['in-place']:>14.1f}{drawn:>10,}"
+              f"{np.median(frames) * 1000:>15.1f}{np.percentile(frames, 95) * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
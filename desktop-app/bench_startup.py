@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Measure desktop startup: time to the login dialog, and from login to the first dataset.
+
+    python bench_startup.py --runs 5
+    python bench_startup.py --runs 5 --username alice --password secret
+
+Each run starts a fresh interpreter. "eager" imports the main window (and matplotlib)
+before showing the login dialog, as the app used to; "lazy" is the current startup, which
+imports it on a background thread once the dialog is up. With credentials, each run also
+logs in and times, from the login response, until the main window is built and until it
+shows the newest dataset, with and without the login-time prefetch. The prefetch saves
+roughly one round trip, so it shows against a remote server rather than a local one.
+Runs without a display with ``QT_QPA_PLATFORM=offscreen``.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def child(mode: str, started: float, username: str, password: str, prefetch: bool):
+    """One startup in this process; prints its timings (ms since ``started``) as JSON."""
+    sys.path.insert(0, HERE)
+    from PyQt5.QtCore import QThreadPool
+    from PyQt5.QtWidgets import QApplication
+    
+    app = QApplication(sys.argv[:1])
+    if mode == "eager":
+        import ui.main_window  # noqa: F401
+    import main
+    from ui.login_dialog import LoginDialog
+    
+    timings = {}
+    dialog = LoginDialog()
+    dialog.show()
+    app.processEvents()
+    timings["login_shown"] = (time.time() - started) * 1000
+    if mode == "lazy":
+        main.preload_main_window()
+    while "ui.main_window" not in sys.modules or not hasattr(sys.modules["ui.main_window"], "MainWindow"):
+        app.processEvents()
+        time.sleep(0.001)
+    timings["charts_ready"] = (time.time() - started) * 1000
+    
+    if username:
+        from services.api_client import api_client
+        from ui.main_window import MainWindow
+        
+        dialog.hide()
+        api_client.login(username, password)
+        logged_in = time.time()
+        if prefetch:
+            api_client.prefetch_datasets()
+        window = MainWindow(api_client.username)
+        window.show()
+        timings["window_built"] = (time.time() - logged_in) * 1000
+        while window.equipment_model.rowCount() == 0 or window.total_label.text() in ("", "0", "-"):
+            app.processEvents()
+            time.sleep(0.001)
+        timings["login_to_data"] = (time.time() - logged_in) * 1000
+        # Let the remaining requests finish; exiting under running Qt workers aborts.
+        QThreadPool.globalInstance().waitForDone()
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode.")
+    parser.add_argument("--username", help="Also time login to first dataset as this user.")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--started", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--no-prefetch", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.started, args.username, args.password, not args.no_prefetch)
+        return
+    
+    columns = ["login_shown", "charts_ready"] + (["window_built", "login_to_data"] if args.username else [])
+    print(f"{'mode':<18}" + "".join(f"{column + ' ms':>18}" for column in columns))
+    modes = [("eager", False), ("lazy", False), ("lazy", True)]
+    for mode, prefetch in modes:
+        results = []
+        for _ in range(args.runs):
+            command = [sys.executable, __file__, "--child", mode, "--started", str(time.time())]
+            if args.username:
+                command += ["--username", args.username, "--password", args.password]
+            if not prefetch:
+                command.append("--no-prefetch")
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        label = f"{mode}{' + prefetch' if prefetch else ''}"
+        print(f"{label:<18}" + "".join(
+            f"{statistics.median(r[column] for r in results if column in r):>18.0f}" for column in columns
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,36 @@
 #!/usr/bin/env python3
 """Main entry point for the Chemical Equipment Visualizer desktop app."""
 
+import importlib
 import sys
 import os
+import threading
 
-# Add parent directory to path for imports
+# Add parent directory to path for imports, and the repository root for ``shared``
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from ui.login_dialog import LoginDialog
-from ui.main_window import MainWindow
+from ui.workers import install_event_loop
+
+
+def preload_main_window():
+    """Import the main window, and with it matplotlib and the charts, on a background thread.
+    
+    Started once the login dialog is up, so the import overlaps with the user typing.
+    """
+    threading.Thread(
+        target=importlib.import_module, args=("ui.main_window",), name="preload", daemon=True
+    ).start()
 
 
 def main():
     """Application entry point."""
     app = QApplication(sys.argv)
     app.setApplicationName("Chemical Equipment Visualizer")
+    loop = install_event_loop(app)
     
     # Apply clean, minimal stylesheet matching web frontend
     app.setStyleSheet("""
@@ -40,12 +55,12 @@ def main():
             left: 12px;
             padding: 0 8px;
         }
-        QTableWidget {
+        QTableView {
             background-color: white;
             border: none;
             gridline-color: #f3f4f6;
         }
-        QTableWidget::item {
+        QTableView::item {
             padding: 8px 12px;
             color: #374151;
         }
@@ -82,11 +97,19 @@ def main():
     
     # Show login dialog
     login_dialog = LoginDialog()
+    QTimer.singleShot(0, preload_main_window)
     if login_dialog.exec_() == LoginDialog.Accepted:
+        # Waits for the preload if it is still running
+        from ui.main_window import MainWindow
+        
         # Show main window
         main_window = MainWindow(login_dialog.username)
         main_window.show()
-        sys.exit(app.exec_())
+        if loop is None:
+            sys.exit(app.exec_())
+        # The asyncio loop runs the Qt event loop until the app quits.
+        with loop:
+            sys.exit(loop.run_forever())
     else:
         sys.exit(0)
 
@@ -1,15 +1,172 @@
 """API client for communicating with the Django backend."""
 
+import gzip
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlencode
+
 import requests
-from utils.config import API_BASE_URL
+from requests.adapters import HTTPAdapter
+from services.cache import open_cache
+from utils.config import (
+    API_BASE_URL,
+    CHUNKED_UPLOAD_THRESHOLD,
+    EQUIPMENT_PAGE_SIZE,
+    HEALTH_CHECK_TIMEOUT,
+    HTTP_MAX_PARALLEL,
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    RECONNECT_INTERVAL,
+    SERIES_BUCKETS,
+    UPLOAD_CHUNK_RETRIES,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_STREAM_BLOCK_SIZE,
+    UPLOAD_TIMEOUT,
+)
+
+COMPRESSED_SUFFIXES = (".csv.gz", ".csv.bz2", ".csv.zst")
+
+
+def query_url(path: str, params: dict = None) -> str:
+    """``path`` with ``params`` in a fixed order, the key GETs are coalesced and cached by."""
+    return f"{path}?{urlencode(sorted(params.items()))}" if params else path
+
+
+class RequestCancelled(Exception):
+    """Raised when a transfer is stopped through its ``cancelled`` callback."""
+
+
+class NotAvailableOffline(requests.ConnectionError):
+    """Raised in offline mode for data that was never cached."""
+
+
+class MultipartEncoder:
+    """A ``multipart/form-data`` request body that streams its files from disk.
+    
+    ``fields`` maps form fields to values; ``files`` lists ``(field, filename, path)``.
+    Its length is known up front, so it is sent with a ``Content-Length`` while only
+    one block of ``block_size`` bytes is held in memory. Iterating it (as ``requests``
+    does when it is passed as ``data``) reports ``progress(sent, total)`` bytes and
+    raises ``RequestCancelled`` between blocks once ``cancelled()`` returns True, which
+    aborts the request.
+    """
+    
+    def __init__(self, fields: dict = None, files: list = (), progress=None, cancelled=None,
+                 block_size: int = UPLOAD_STREAM_BLOCK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress = progress
+        self.cancelled = cancelled
+        self.block_size = block_size
+        # (part headers, value bytes or file path)
+        self._parts = [(self._part_headers(name), str(value).encode()) for name, value in (fields or {}).items()]
+        self._parts += [(self._part_headers(name, filename), path) for name, filename, path in files]
+        self._closing = f"--{self.boundary}--\r\n".encode()
+        self.total = len(self._closing) + sum(
+            len(headers) + (len(body) if isinstance(body, bytes) else os.path.getsize(body)) + 2
+            for headers, body in self._parts
+        )
+    
+    def _part_headers(self, name: str, filename: str = None) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is None:
+            return f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode()
+        return (
+            f"--{self.boundary}\r\nContent-Disposition: {disposition}; filename=\"{_quote(filename)}\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+    
+    def __len__(self) -> int:
+        return self.total
+    
+    def __iter__(self):
+        sent = 0
+        for block in self._blocks():
+            yield block
+            sent += len(block)
+            if self.progress:
+                self.progress(sent, self.total)
+    
+    def _blocks(self):
+        for headers, body in self._parts:
+            yield headers
+            if isinstance(body, bytes):
+                yield body
+            else:
+                yield from self._read_blocks(body)
+            yield b"\r\n"
+        yield self._closing
+    
+    def _read_blocks(self, path: str):
+        with open(path, "rb") as f:
+            while True:
+                if self.cancelled and self.cancelled():
+                    raise RequestCancelled()
+                block = f.read(self.block_size)
+                if not block:
+                    return
+                yield block
+
+
+def _quote(value: str) -> str:
+    """Escape a form field or file name for a ``Content-Disposition`` header, as browsers do."""
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class HttpSession(requests.Session):
+    """Session with a connection pool sized for parallel requests and a default timeout.
+    
+    Connections are kept alive and reused across requests and threads; a request
+    without an explicit ``timeout`` gets ``HTTP_TIMEOUT``.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return super().request(method, url, **kwargs)
 
 
 class ApiClient:
-    """Client for making API requests to the backend."""
+    """Client for making API requests to the backend.
+    
+    Safe to use from several threads at once. Identical GETs that overlap are sent
+    only once, and every caller receives the same decoded response, so callers must
+    not mutate what the ``get_*`` methods return.
+    
+    GET responses are cached on disk and revalidated with their ETags. A GET that cannot
+    reach the server is answered from the cache; if a health probe of the server fails as
+    well, the client switches to ``offline`` mode and answers GETs from the cache only,
+    until ``reconnect`` finds the server again (which GETs also try, now and then).
+    """
     
     def __init__(self):
         self.token = None
-        self.session = requests.Session()
+        self.username = None
+        self.offline = False
+        self.cache = open_cache()
+        self.session = HttpSession()
+        self.executor = ThreadPoolExecutor(max_workers=HTTP_MAX_PARALLEL, thread_name_prefix="api")
+        # GETs currently on the wire, keyed by URL, parameters and token.
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        # GETs started by ``prefetch_datasets``, keyed like ``_in_flight``, until claimed.
+        self._prefetched = {}
+        # Chunked upload sessions left unfinished, keyed by file identity, so that
+        # uploading the same file again resumes instead of starting over.
+        self._upload_sessions = {}
+        # When a health probe last failed; the server is not probed again for RECONNECT_INTERVAL.
+        self._probe_lock = threading.Lock()
+        self._probe_failed_at = float("-inf")
     
     def set_token(self, token: str):
         """Set the authentication token."""
@@ -20,6 +177,8 @@ class ApiClient:
         """Clear the authentication token."""
         self.token = None
         self.session.headers.pop("Authorization", None)
+        with self._in_flight_lock:
+            self._prefetched.clear()
     
     def register(self, username: str, email: str, password: str) -> dict:
         """Register a new user."""
@@ -35,6 +194,9 @@ class ApiClient:
         response.raise_for_status()
         data = response.json()
         self.set_token(data["token"])
+        self.username = data["username"]
+        self.offline = False
+        self.remember_login(data["username"], password)
         return data
     
     def login(self, username: str, password: str) -> dict:
@@ -46,54 +208,440 @@ class ApiClient:
         response.raise_for_status()
         data = response.json()
         self.set_token(data["token"])
+        self.username = data["username"]
+        self.offline = False
+        self.remember_login(data["username"], password)
         return data
     
+    def remember_login(self, username: str, password: str):
+        """Keep a verifier of the password, which ``work_offline`` checks later."""
+        if self.cache is not None:
+            self.cache.remember_login(username, password)
+    
     def logout(self):
         """Logout and clear token."""
-        try:
-            self.session.post(f"{API_BASE_URL}/auth/logout/")
-        except Exception:
-            pass
+        if not self.offline:
+            try:
+                self.session.post(f"{API_BASE_URL}/auth/logout/")
+            except Exception:
+                pass
         self.clear_token()
+        self.username = None
+    
+    def work_offline(self, username: str, password: str) -> bool:
+        """Browse the datasets cached for ``username`` without a server.
+        
+        Returns False (and stays online) if nothing is cached for that user, or if
+        ``password`` is not the one they last logged in with on this machine.
+        """
+        if self.cache is None or not self.cache.has_entries(username):
+            return False
+        if not self.cache.verify_login(username, password):
+            return False
+        self.username = username
+        self.offline = True
+        return True
+    
+    def reconnect(self) -> bool:
+        """Go back online if logged in and the server answers again; returns whether online.
+        
+        The server is probed at most once per ``RECONNECT_INTERVAL`` seconds. Browsing
+        offline without logging in (``work_offline``) stays offline.
+        """
+        if self.offline and self.token and self._server_reachable():
+            self.offline = False
+        return not self.offline
+    
+    def _server_reachable(self) -> bool:
+        """Whether the server answers a health probe of the API root (any status will do)."""
+        with self._probe_lock:
+            if self.probe_failed_recently():
+                return False
+            try:
+                self.session.get(f"{API_BASE_URL}/", timeout=HEALTH_CHECK_TIMEOUT)
+                return True
+            except (requests.ConnectionError, requests.Timeout):
+                self.probe_failed()
+                return False
+    
+    def probe_failed_recently(self) -> bool:
+        """Whether a health probe failed within the last ``RECONNECT_INTERVAL`` seconds."""
+        return time.monotonic() - self._probe_failed_at < RECONNECT_INTERVAL
+    
+    def probe_failed(self):
+        self._probe_failed_at = time.monotonic()
+    
+    def upload_csv(self, file_path: str, dataset_id: int = None, progress=None, cancelled=None) -> dict:
+        """Upload a CSV file, or append it to ``dataset_id``.
+        
+        Plain CSVs are gzipped first. The file is streamed from disk, or sent in chunks
+        through a resumable upload session if it is large, reporting
+        ``progress(sent, total)`` bytes and stopping once ``cancelled()`` returns True.
+        """
+        transfer = {"progress": progress, "cancelled": cancelled}
+        if file_path.lower().endswith(COMPRESSED_SUFFIXES):
+            return self._send_upload(file_path, os.path.basename(file_path), dataset_id, **transfer)
+        
+        gz_path = self._gzip(file_path, cancelled)
+        try:
+            return self._send_upload(
+                gz_path, os.path.basename(file_path) + ".gz", dataset_id, key=file_path, **transfer
+            )
+        finally:
+            os.remove(gz_path)
+    
+    def upload_batch(self, file_paths: list, progress=None, cancelled=None) -> dict:
+        """Upload several CSV files in one request; each becomes its own dataset.
+        
+        Returns the server's per-file ``results`` and the ids of datasets removed by
+        retention. Plain CSVs are gzipped first, and the files are streamed from disk
+        one after another, with ``progress``/``cancelled`` as in ``upload_csv``.
+        """
+        temp_paths, files = [], []
+        try:
+            for file_path in file_paths:
+                name = os.path.basename(file_path)
+                if not file_path.lower().endswith(COMPRESSED_SUFFIXES):
+                    file_path = self._gzip(file_path, cancelled)
+                    temp_paths.append(file_path)
+                    name += ".gz"
+                files.append(("files", name, file_path))
+            return self._post_multipart(
+                "/upload/batch/", MultipartEncoder(files=files, progress=progress, cancelled=cancelled)
+            )
+        finally:
+            for path in temp_paths:
+                os.remove(path)
+    
+    def _gzip(self, file_path: str, cancelled=None) -> str:
+        """Compress ``file_path`` into a temporary ``.csv.gz`` file and return its path."""
+        handle, gz_path = tempfile.mkstemp(suffix=".csv.gz")
+        try:
+            with os.fdopen(handle, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as dst:
+                with open(file_path, "rb") as src:
+                    while block := src.read(UPLOAD_CHUNK_SIZE):
+                        if cancelled and cancelled():
+                            raise RequestCancelled()
+                        dst.write(block)
+        except BaseException:
+            os.remove(gz_path)
+            raise
+        return gz_path
+    
+    def _post_multipart(self, path: str, body: MultipartEncoder) -> dict:
+        """POST a streamed multipart ``body`` to ``path`` and return the decoded JSON."""
+        response = self.session.post(
+            f"{API_BASE_URL}{path}",
+            data=body,
+            headers={"Content-Type": body.content_type},
+            timeout=UPLOAD_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def append_csv(self, dataset_id: int, file_path: str, progress=None, cancelled=None) -> dict:
+        """Append the rows of a CSV file to an existing dataset."""
+        return self.upload_csv(file_path, dataset_id=dataset_id, progress=progress, cancelled=cancelled)
+    
+    def _send_upload(self, path: str, filename: str, dataset_id: int = None, key: str = None,
+                     progress=None, cancelled=None) -> dict:
+        """Send ``path`` as ``filename`` in one request, or in chunks if it is large."""
+        if os.path.getsize(path) <= CHUNKED_UPLOAD_THRESHOLD:
+            data = {"dataset": dataset_id} if dataset_id is not None else {}
+            return self._post_multipart("/upload/", MultipartEncoder(
+                data, [("file", filename, path)], progress=progress, cancelled=cancelled
+            ))
+        return self._chunked_upload(path, filename, dataset_id, key or path, progress, cancelled)
     
-    def upload_csv(self, file_path: str) -> dict:
-        """Upload a CSV file."""
-        with open(file_path, "rb") as f:
+    def _chunked_upload(self, path: str, filename: str, dataset_id: int, key: str,
+                        progress=None, cancelled=None) -> dict:
+        """Upload ``path`` through a resumable session, skipping chunks the server has."""
+        stat = os.stat(key)
+        identity = (key, stat.st_size, stat.st_mtime, dataset_id)
+        total_chunks = -(-os.path.getsize(path) // UPLOAD_CHUNK_SIZE)
+        
+        session = None
+        session_id = self._upload_sessions.get(identity)
+        if session_id:
+            response = self.session.get(f"{API_BASE_URL}/uploads/{session_id}/")
+            if response.ok:
+                session = response.json()
+        if session is None:
             response = self.session.post(
-                f"{API_BASE_URL}/upload/",
-                files={"file": f}
+                f"{API_BASE_URL}/uploads/",
+                json={"filename": filename, "total_chunks": total_chunks, "dataset": dataset_id}
             )
+            response.raise_for_status()
+            session = response.json()
+            self._upload_sessions[identity] = session["id"]
+        
+        received = set(session["received"])
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            for index in range(total_chunks):
+                if cancelled and cancelled():
+                    # The session stays open, so uploading the file again resumes here.
+                    raise RequestCancelled()
+                if index not in received:
+                    f.seek(index * UPLOAD_CHUNK_SIZE)
+                    self._put_chunk(session["id"], index, f.read(UPLOAD_CHUNK_SIZE))
+                if progress:
+                    progress(min((index + 1) * UPLOAD_CHUNK_SIZE, size), size)
+        
+        response = self.session.post(
+            f"{API_BASE_URL}/uploads/{session['id']}/complete/", timeout=UPLOAD_TIMEOUT
+        )
         response.raise_for_status()
+        del self._upload_sessions[identity]
         return response.json()
     
+    def _put_chunk(self, session_id: str, index: int, data: bytes):
+        """PUT one chunk, retrying with backoff on connection errors and 5xx responses."""
+        for attempt in range(UPLOAD_CHUNK_RETRIES + 1):
+            try:
+                response = self.session.put(
+                    f"{API_BASE_URL}/uploads/{session_id}/chunks/{index}/",
+                    data=data,
+                    headers={"Content-Type": "application/octet-stream"}
+                )
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return
+            except requests.ConnectionError:
+                if attempt == UPLOAD_CHUNK_RETRIES:
+                    raise
+            if attempt == UPLOAD_CHUNK_RETRIES:
+                response.raise_for_status()
+            time.sleep(2 ** attempt)
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run ``fn(*args, **kwargs)`` on the client's request pool and return its future.
+        
+        Use it to issue independent calls in parallel, e.g.
+        ``submit(api_client.get_summary, 3)``.
+        """
+        return self.executor.submit(fn, *args, **kwargs)
+    
+    def prefetch_datasets(self):
+        """Start loading what the main window shows first, right after logging in.
+        
+        The dataset list is fetched in the background, then the newest dataset's summary,
+        first page of rows, chart series and default histogram, in parallel. The next GET of each of these
+        URLs, from this client or an ``AsyncApiClient`` sharing it, takes over the prefetched
+        response (or waits for it) instead of sending its own request.
+        """
+        def prefetch():
+            datasets = self._prefetch("/datasets/").result()
+            if datasets:
+                dataset_id = datasets[0]["id"]
+                self._prefetch(f"/datasets/{dataset_id}/summary/", dataset_id=dataset_id)
+                self._prefetch(
+                    "/equipment/", {"dataset": dataset_id, "page": 1, "page_size": EQUIPMENT_PAGE_SIZE},
+                    dataset_id
+                )
+                self._prefetch(f"/datasets/{dataset_id}/series/", {"buckets": SERIES_BUCKETS}, dataset_id)
+                self._prefetch(
+                    f"/datasets/{dataset_id}/histogram/", {"parameter": "flowrate", "bins": 20}, dataset_id
+                )
+        
+        self.submit(prefetch)
+    
+    def _prefetch(self, path: str, params: dict = None, dataset_id: int = None) -> Future:
+        url = query_url(path, params)
+        future = self.submit(self._fetch, url, dataset_id)
+        with self._in_flight_lock:
+            self._prefetched[(url, self.token)] = future
+        return future
+    
+    def take_prefetched(self, url: str) -> Optional[Future]:
+        """Claim the prefetched response for ``url``, if there is one."""
+        with self._in_flight_lock:
+            return self._prefetched.pop((url, self.token), None)
+    
+    def _get(self, path: str, params: dict = None, dataset_id: int = None):
+        """GET ``path`` and return the decoded JSON, joining an identical request in flight.
+        
+        ``dataset_id`` names the dataset the response is about, so its cache entries can
+        be dropped when the dataset is deleted.
+        """
+        url = query_url(path, params)
+        prefetched = self.take_prefetched(url)
+        if prefetched is not None and prefetched.exception() is None:
+            return prefetched.result()
+        key = (url, self.token)
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return future.result()
+        
+        try:
+            data = self._fetch(url, dataset_id)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+    
+    def _fetch(self, url: str, dataset_id: int = None):
+        """GET ``url`` (relative to the API root), revalidating or falling back to the cache.
+        
+        If the server cannot be reached, the cached response answers this request, and the
+        client goes offline only if the server does not answer a health probe either.
+        """
+        cache = self.cache if self.username else None
+        cached = cache.get(self.username, url) if cache else None
+        if not self.reconnect():
+            if cached is None:
+                raise NotAvailableOffline(f"{url} is not available offline")
+            return cached.data
+        
+        headers = {"If-None-Match": cached.etag} if cached else {}
+        try:
+            response = self.session.get(f"{API_BASE_URL}{url}", headers=headers)
+        except (requests.ConnectionError, requests.Timeout):
+            if not self._server_reachable():
+                self.offline = True
+            if cached is None:
+                raise
+            return cached.data
+        
+        if response.status_code == 304 and cached:
+            return cached.data
+        if response.status_code == 404 and cache and dataset_id is not None:
+            cache.drop_dataset(self.username, dataset_id)
+        response.raise_for_status()
+        data = response.json()
+        if cache and response.headers.get("ETag"):
+            cache.put(self.username, url, response.headers["ETag"], data, dataset_id)
+        return data
+    
     def get_datasets(self) -> list:
         """Get list of user's datasets."""
-        response = self.session.get(f"{API_BASE_URL}/datasets/")
-        response.raise_for_status()
-        return response.json()
+        datasets = self._get("/datasets/")
+        if self.cache and self.username:
+            # Datasets removed by retention or deleted elsewhere are not coming back.
+            self.cache.retain_datasets(self.username, [dataset["id"] for dataset in datasets])
+        return datasets
     
     def get_dataset(self, dataset_id: int) -> dict:
         """Get dataset details."""
-        response = self.session.get(f"{API_BASE_URL}/datasets/{dataset_id}/")
-        response.raise_for_status()
-        return response.json()
+        return self._get(f"/datasets/{dataset_id}/", dataset_id=dataset_id)
     
     def get_summary(self, dataset_id: int) -> dict:
         """Get dataset summary statistics."""
-        response = self.session.get(f"{API_BASE_URL}/datasets/{dataset_id}/summary/")
-        response.raise_for_status()
-        return response.json()
+        return self._get(f"/datasets/{dataset_id}/summary/", dataset_id=dataset_id)
     
-    def download_report(self, dataset_id: int, save_path: str):
-        """Download PDF report for a dataset."""
-        response = self.session.get(
-            f"{API_BASE_URL}/datasets/{dataset_id}/report/",
-            stream=True
-        )
+    def get_equipment_page(self, dataset_id: int, page: int = 1, page_size: int = 100,
+                           ordering: str = None) -> dict:
+        """Get one page of a dataset's equipment rows (``count``, ``next`` and ``results``)."""
+        params = {"dataset": dataset_id, "page": page, "page_size": page_size}
+        if ordering:
+            params["ordering"] = ordering
+        return self._get("/equipment/", params, dataset_id)
+    
+    def get_histogram(self, dataset_id: int, parameter: str, bins: int = 20,
+                      group_by_type: bool = False) -> dict:
+        """Get binned counts for one parameter of a dataset."""
+        params = {"parameter": parameter, "bins": bins}
+        if group_by_type:
+            params["group_by"] = "type"
+        return self._get(f"/datasets/{dataset_id}/histogram/", params, dataset_id)
+    
+    def get_series(self, dataset_id: int, start: int = None, stop: int = None,
+                   buckets: int = SERIES_BUCKETS) -> dict:
+        """Get per-bucket parameter minima and maxima of rows ``start:stop`` (default: all rows)."""
+        params = {"buckets": buckets}
+        if start is not None:
+            params["start"] = start
+        if stop is not None:
+            params["stop"] = stop
+        return self._get(f"/datasets/{dataset_id}/series/", params, dataset_id)
+    
+    def get_all_rows(self, dataset_id: int, progress=None, cancelled=None) -> dict:
+        """Every row of a dataset in upload order, as ``{field: values}`` NumPy arrays.
+        
+        Online, the first page of the equipment table is revalidated for the row count;
+        if every page is cached at that count the rows are put together from the cache,
+        otherwise the CSV export is downloaded to a temporary file, with ``progress`` and
+        ``cancelled`` as in ``download_report``, and parsed. Offline, the rows come from
+        the cached pages, and ``NotAvailableOffline`` is raised if any was never cached.
+        """
+        # Imported here so that pandas is only loaded once every row is needed.
+        from services.preview import columns_from_rows, read_equipment_csv
+        if self.offline:
+            return columns_from_rows(self._cached_rows(dataset_id, cancelled))
+        count = self.get_equipment_page(dataset_id, 1, EQUIPMENT_PAGE_SIZE)["count"]
+        rows = self.cached_rows(dataset_id, count)
+        if rows is not None:
+            return columns_from_rows(rows)
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        try:
+            self._download(f"/datasets/{dataset_id}/export.csv", path, progress, cancelled)
+            return read_equipment_csv(path)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def cached_rows(self, dataset_id: int, count: int) -> Optional[list]:
+        """Rows of ``dataset_id`` from the cache alone, if every page is cached at ``count`` rows.
+        
+        Rows are only ever appended, so pages cached at the current count are current.
+        Returns None, without sending any request, when a page is missing or older.
+        """
+        if not (self.cache and self.username):
+            return None
+        rows = []
+        for page in range(1, max(-(-count // EQUIPMENT_PAGE_SIZE), 1) + 1):
+            url = query_url("/equipment/", {"dataset": dataset_id, "page": page, "page_size": EQUIPMENT_PAGE_SIZE})
+            cached = self.cache.get(self.username, url)
+            if cached is None or cached.data["count"] != count:
+                return None
+            rows += cached.data["results"]
+        return rows
+    
+    def _cached_rows(self, dataset_id: int, cancelled=None) -> list:
+        """Rows of ``dataset_id`` from its cached equipment pages, in upload order."""
+        rows, page = [], 1
+        while page:
+            if cancelled and cancelled():
+                raise RequestCancelled()
+            data = self.get_equipment_page(dataset_id, page, EQUIPMENT_PAGE_SIZE)
+            rows += data["results"]
+            page = page + 1 if data["next"] else None
+        return rows
+    
+    def download_report(self, dataset_id: int, save_path: str, progress=None, cancelled=None):
+        """Download PDF report for a dataset.
+        
+        Reports ``progress(received, total)`` bytes (total is 0 when unknown) and
+        stops, removing the partial file, once ``cancelled()`` returns True.
+        """
+        self._download(f"/datasets/{dataset_id}/report/", save_path, progress, cancelled)
+    
+    def _download(self, path: str, save_path: str, progress=None, cancelled=None):
+        """Stream ``path`` to the file ``save_path``; see ``download_report``."""
+        response = self.session.get(f"{API_BASE_URL}{path}", stream=True)
         response.raise_for_status()
-        with open(save_path, "wb") as f:
+        total = int(response.headers.get("Content-Length", 0))
+        received = 0
+        with response, open(save_path, "wb") as f:
             for chunk in response.iter_content(chunk_size=8192):
+                if cancelled and cancelled():
+                    break
                 f.write(chunk)
-
+                received += len(chunk)
+                if progress:
+                    progress(received, total)
+        if cancelled and cancelled():
+            os.remove(save_path)
+            raise RequestCancelled()
 
 api_client = ApiClient()
@@ -0,0 +1,424 @@
+"""asyncio API client, for running many requests at once on the Qt event loop.
+
+Needs ``httpx`` (plus ``h2`` for HTTP/2); without it ``async_api_client`` is None and the
+app uses the thread-based ``api_client`` for everything.
+"""
+
+import asyncio
+import importlib.util
+import os
+import tempfile
+
+try:
+    import httpx
+except ImportError:  # optional dependency
+    httpx = None
+
+from services.api_client import (
+    COMPRESSED_SUFFIXES,
+    ApiClient,
+    MultipartEncoder,
+    NotAvailableOffline,
+    RequestCancelled,
+    api_client,
+    query_url,
+)
+from utils.config import (
+    API_BASE_URL,
+    CHUNKED_UPLOAD_THRESHOLD,
+    EQUIPMENT_PAGE_SIZE,
+    HEALTH_CHECK_TIMEOUT,
+    HTTP_MAX_PARALLEL,
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    SERIES_BUCKETS,
+    UPLOAD_CHUNK_RETRIES,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_TIMEOUT,
+)
+
+
+# Downloads are written on a worker thread per chunk, so chunks are larger than the
+# thread-based client's to keep the hand-offs few.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _timeout(seconds: tuple):
+    connect, read = seconds
+    return httpx.Timeout(read, connect=connect)
+
+
+async def _stream(body: MultipartEncoder):
+    """``body`` as the async iterable httpx streams request content from.
+    
+    Each block is read from disk on a worker thread, so the event loop keeps running.
+    """
+    blocks = iter(body)
+    while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+        yield block
+
+
+def _read_chunk(path: str, index: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(index * UPLOAD_CHUNK_SIZE)
+        return f.read(UPLOAD_CHUNK_SIZE)
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class AsyncApiClient:
+    """Coroutine counterpart of ``ApiClient`` with the same methods.
+    
+    It shares the token, user, offline state and response cache of the ``ApiClient`` it
+    is created with, so either can be used after logging in with the other. Requests go
+    through one ``httpx.AsyncClient``: over HTTPS they are multiplexed on a single HTTP/2
+    connection when the server supports it, otherwise spread over a keep-alive pool of
+    ``HTTP_POOL_SIZE`` connections. Identical GETs that overlap are sent once, as in
+    ``ApiClient``, and callers must not mutate what the ``get_*`` methods return.
+    
+    Cancelling the task awaiting a method stops the request; ``progress``/``cancelled``
+    callbacks work as in ``ApiClient``. Reading upload files, the response cache and JSON
+    decoding run on worker threads, so the event loop, which is also the GUI's, only waits.
+    """
+    
+    def __init__(self, client: ApiClient):
+        self.client = client
+        self.http = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+            timeout=_timeout(HTTP_TIMEOUT),
+        )
+        # GETs currently on the wire, keyed by URL and token.
+        self._in_flight = {}
+        # Chunked upload sessions left unfinished, keyed by file identity.
+        self._upload_sessions = {}
+    
+    @property
+    def offline(self) -> bool:
+        return self.client.offline
+    
+    def _headers(self) -> dict:
+        return {"Authorization": f"Token {self.client.token}"} if self.client.token else {}
+    
+    async def _request(self, method: str, path: str, headers: dict = None, **kwargs):
+        headers = {**self._headers(), **(headers or {})}
+        return await self.http.request(method, f"{API_BASE_URL}{path}", headers=headers, **kwargs)
+    
+    async def register(self, username: str, email: str, password: str) -> dict:
+        """Register a new user."""
+        response = await self._request("POST", "/auth/register/", json={
+            "username": username,
+            "email": email,
+            "password": password,
+            "password_confirm": password,
+        })
+        response.raise_for_status()
+        data = response.json()
+        self._logged_in(data)
+        await asyncio.to_thread(self.client.remember_login, data["username"], password)
+        return data
+    
+    async def login(self, username: str, password: str) -> dict:
+        """Login and get auth token."""
+        response = await self._request(
+            "POST", "/auth/login/", json={"username": username, "password": password}
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._logged_in(data)
+        await asyncio.to_thread(self.client.remember_login, data["username"], password)
+        return data
+    
+    def _logged_in(self, data: dict):
+        self.client.set_token(data["token"])
+        self.client.username = data["username"]
+        self.client.offline = False
+    
+    async def logout(self):
+        """Logout and clear token."""
+        if not self.offline:
+            try:
+                await self._request("POST", "/auth/logout/")
+            except Exception:
+                pass
+        self.client.clear_token()
+        self.client.username = None
+    
+    async def reconnect(self) -> bool:
+        """Go back online if logged in and the server answers again; see ``ApiClient.reconnect``."""
+        client = self.client
+        if client.offline and client.token and await self._server_reachable():
+            client.offline = False
+        return not client.offline
+    
+    async def _server_reachable(self) -> bool:
+        """Whether the server answers a health probe of the API root (any status will do)."""
+        if self.client.probe_failed_recently():
+            return False
+        try:
+            await self._request("GET", "/", timeout=_timeout(HEALTH_CHECK_TIMEOUT))
+            return True
+        except httpx.TransportError:
+            self.client.probe_failed()
+            return False
+    
+    async def upload_csv(self, file_path: str, dataset_id: int = None, progress=None, cancelled=None) -> dict:
+        """Upload a CSV file, or append it to ``dataset_id``.
+        
+        Plain CSVs are gzipped first, on a worker thread. The file is streamed from disk,
+        or sent through a resumable upload session with up to ``HTTP_MAX_PARALLEL`` chunks
+        in flight if it is large.
+        """
+        transfer = {"progress": progress, "cancelled": cancelled}
+        if file_path.lower().endswith(COMPRESSED_SUFFIXES):
+            return await self._send_upload(file_path, os.path.basename(file_path), dataset_id, **transfer)
+        
+        gz_path = await asyncio.to_thread(self.client._gzip, file_path, cancelled)
+        try:
+            return await self._send_upload(
+                gz_path, os.path.basename(file_path) + ".gz", dataset_id, key=file_path, **transfer
+            )
+        finally:
+            await asyncio.to_thread(os.remove, gz_path)
+    
+    async def append_csv(self, dataset_id: int, file_path: str, progress=None, cancelled=None) -> dict:
+        """Append the rows of a CSV file to an existing dataset."""
+        return await self.upload_csv(file_path, dataset_id=dataset_id, progress=progress, cancelled=cancelled)
+    
+    async def _send_upload(self, path: str, filename: str, dataset_id: int = None, key: str = None,
+                           progress=None, cancelled=None) -> dict:
+        """Send ``path`` as ``filename`` in one request, or in chunks if it is large."""
+        if os.path.getsize(path) <= CHUNKED_UPLOAD_THRESHOLD:
+            data = {"dataset": dataset_id} if dataset_id is not None else {}
+            body = MultipartEncoder(data, [("file", filename, path)], progress=progress, cancelled=cancelled)
+            response = await self._request(
+                "POST", "/upload/", content=_stream(body), timeout=_timeout(UPLOAD_TIMEOUT),
+                headers={"Content-Type": body.content_type, "Content-Length": str(len(body))}
+            )
+            response.raise_for_status()
+            return response.json()
+        return await self._chunked_upload(path, filename, dataset_id, key or path, progress, cancelled)
+    
+    async def _chunked_upload(self, path: str, filename: str, dataset_id: int, key: str,
+                              progress=None, cancelled=None) -> dict:
+        """Upload ``path`` through a resumable session, sending missing chunks concurrently."""
+        stat = os.stat(key)
+        identity = (key, stat.st_size, stat.st_mtime, dataset_id)
+        size = os.path.getsize(path)
+        total_chunks = -(-size // UPLOAD_CHUNK_SIZE)
+        
+        session = None
+        session_id = self._upload_sessions.get(identity)
+        if session_id:
+            response = await self._request("GET", f"/uploads/{session_id}/")
+            if response.is_success:
+                session = response.json()
+        if session is None:
+            response = await self._request("POST", "/uploads/", json={
+                "filename": filename, "total_chunks": total_chunks, "dataset": dataset_id
+            })
+            response.raise_for_status()
+            session = response.json()
+            self._upload_sessions[identity] = session["id"]
+        
+        received = set(session["received"])
+        sent = min(len(received) * UPLOAD_CHUNK_SIZE, size)
+        slots = asyncio.Semaphore(HTTP_MAX_PARALLEL)
+        
+        async def send(index: int):
+            nonlocal sent
+            async with slots:
+                if cancelled and cancelled():
+                    # The session stays open, so uploading the file again resumes here.
+                    raise RequestCancelled()
+                # Chunks in flight are read concurrently, each on a worker thread.
+                data = await asyncio.to_thread(_read_chunk, path, index)
+                await self._put_chunk(session["id"], index, data)
+                sent += len(data)
+                if progress:
+                    progress(sent, size)
+        
+        tasks = [asyncio.ensure_future(send(index)) for index in range(total_chunks) if index not in received]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        response = await self._request(
+            "POST", f"/uploads/{session['id']}/complete/", timeout=_timeout(UPLOAD_TIMEOUT)
+        )
+        response.raise_for_status()
+        del self._upload_sessions[identity]
+        return response.json()
+    
+    async def _put_chunk(self, session_id: str, index: int, data: bytes):
+        """PUT one chunk, retrying with backoff on connection errors and 5xx responses."""
+        for attempt in range(UPLOAD_CHUNK_RETRIES + 1):
+            try:
+                response = await self._request(
+                    "PUT", f"/uploads/{session_id}/chunks/{index}/", content=data,
+                    headers={"Content-Type": "application/octet-stream"}
+                )
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return
+            except httpx.TransportError:
+                if attempt == UPLOAD_CHUNK_RETRIES:
+                    raise
+            if attempt == UPLOAD_CHUNK_RETRIES:
+                response.raise_for_status()
+            await asyncio.sleep(2 ** attempt)
+    
+    async def _get(self, path: str, params: dict = None, dataset_id: int = None):
+        """GET ``path`` and return the decoded JSON, joining an identical request in flight.
+        
+        The shared request is shielded, so one caller being cancelled does not fail the
+        others.
+        """
+        url = query_url(path, params)
+        prefetched = self.client.take_prefetched(url)
+        if prefetched is not None:
+            try:
+                return await asyncio.wrap_future(prefetched)
+            except Exception:
+                pass
+        key = (url, self.client.token)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._fetch(url, dataset_id))
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    async def _fetch(self, url: str, dataset_id: int = None):
+        """GET ``url`` (relative to the API root), revalidating or falling back to the cache.
+        
+        If the server cannot be reached, the cached response answers this request, and the
+        client goes offline only if the server does not answer a health probe either. The
+        cache's SQLite and zlib work and JSON decoding run on worker threads.
+        """
+        client = self.client
+        cache = client.cache if client.username else None
+        cached = await asyncio.to_thread(cache.get, client.username, url) if cache else None
+        if not await self.reconnect():
+            if cached is None:
+                raise NotAvailableOffline(f"{url} is not available offline")
+            return cached.data
+        
+        headers = {**self._headers(), "If-None-Match": cached.etag} if cached else self._headers()
+        try:
+            response = await self.http.get(f"{API_BASE_URL}{url}", headers=headers)
+        except (httpx.TransportError, httpx.TimeoutException):
+            if not await self._server_reachable():
+                client.offline = True
+            if cached is None:
+                raise
+            return cached.data
+        
+        if response.status_code == 304 and cached:
+            return cached.data
+        if response.status_code == 404 and cache and dataset_id is not None:
+            await asyncio.to_thread(cache.drop_dataset, client.username, dataset_id)
+        response.raise_for_status()
+        data = await asyncio.to_thread(response.json)
+        if cache and response.headers.get("ETag"):
+            await asyncio.to_thread(cache.put, client.username, url, response.headers["ETag"], data, dataset_id)
+        return data
+    
+    async def get_datasets(self) -> list:
+        """Get list of user's datasets."""
+        datasets = await self._get("/datasets/")
+        if self.client.cache and self.client.username:
+            await asyncio.to_thread(
+                self.client.cache.retain_datasets, self.client.username, [dataset["id"] for dataset in datasets]
+            )
+        return datasets
+    
+    async def get_dataset(self, dataset_id: int) -> dict:
+        """Get dataset details."""
+        return await self._get(f"/datasets/{dataset_id}/", dataset_id=dataset_id)
+    
+    async def get_summary(self, dataset_id: int) -> dict:
+        """Get dataset summary statistics."""
+        return await self._get(f"/datasets/{dataset_id}/summary/", dataset_id=dataset_id)
+    
+    async def get_equipment_page(self, dataset_id: int, page: int = 1, page_size: int = 100,
+                                 ordering: str = None) -> dict:
+        """Get one page of a dataset's equipment rows (``count``, ``next`` and ``results``)."""
+        params = {"dataset": dataset_id, "page": page, "page_size": page_size}
+        if ordering:
+            params["ordering"] = ordering
+        return await self._get("/equipment/", params, dataset_id)
+    
+    async def get_histogram(self, dataset_id: int, parameter: str, bins: int = 20,
+                            group_by_type: bool = False) -> dict:
+        """Get binned counts for one parameter of a dataset."""
+        params = {"parameter": parameter, "bins": bins}
+        if group_by_type:
+            params["group_by"] = "type"
+        return await self._get(f"/datasets/{dataset_id}/histogram/", params, dataset_id)
+    
+    async def get_series(self, dataset_id: int, start: int = None, stop: int = None,
+                         buckets: int = SERIES_BUCKETS) -> dict:
+        """Get per-bucket parameter minima and maxima of rows ``start:stop`` (default: all rows)."""
+        params = {"buckets": buckets}
+        if start is not None:
+            params["start"] = start
+        if stop is not None:
+            params["stop"] = stop
+        return await self._get(f"/datasets/{dataset_id}/series/", params, dataset_id)
+    
+    async def get_all_rows(self, dataset_id: int, progress=None, cancelled=None) -> dict:
+        """Every row of a dataset in upload order; cache reads and parsing run on worker threads."""
+        from services.preview import columns_from_rows, read_equipment_csv
+        if self.offline:
+            rows = await asyncio.to_thread(self.client._cached_rows, dataset_id, cancelled)
+            return await asyncio.to_thread(columns_from_rows, rows)
+        count = (await self.get_equipment_page(dataset_id, 1, EQUIPMENT_PAGE_SIZE))["count"]
+        rows = await asyncio.to_thread(self.client.cached_rows, dataset_id, count)
+        if rows is not None:
+            return await asyncio.to_thread(columns_from_rows, rows)
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        try:
+            await self._download(f"/datasets/{dataset_id}/export.csv", path, progress, cancelled)
+            return await asyncio.to_thread(read_equipment_csv, path)
+        finally:
+            await asyncio.to_thread(_remove, path)
+    
+    async def download_report(self, dataset_id: int, save_path: str, progress=None, cancelled=None):
+        """Download PDF report for a dataset, removing the partial file if it is cancelled."""
+        await self._download(f"/datasets/{dataset_id}/report/", save_path, progress, cancelled)
+    
+    async def _download(self, path: str, save_path: str, progress=None, cancelled=None):
+        """Stream ``path`` to ``save_path``, opening, writing and removing the file on worker threads."""
+        f = None
+        try:
+            async with self.http.stream("GET", f"{API_BASE_URL}{path}", headers=self._headers()) as response:
+                response.raise_for_status()
+                total = int(response.headers.get("Content-Length", 0))
+                f = await asyncio.to_thread(open, save_path, "wb")
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    if cancelled and cancelled():
+                        raise RequestCancelled()
+                    await asyncio.to_thread(f.write, chunk)
+                    if progress:
+                        progress(response.num_bytes_downloaded, total)
+        except (RequestCancelled, asyncio.CancelledError):
+            if f is not None:
+                await asyncio.to_thread(f.close)
+            await asyncio.to_thread(_remove, save_path)
+            raise
+        finally:
+            if f is not None and not f.closed:
+                await asyncio.to_thread(f.close)
+    
+    async def aclose(self):
+        await self.http.aclose()
+
+
+async_api_client = AsyncApiClient(api_client) if httpx is not None else None
@@ -0,0 +1,154 @@
+"""On-disk cache of API responses for fast reloads and offline reading."""
+
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterable, NamedTuple, Optional
+
+from utils.config import CACHE_DIR, CACHE_MAX_BYTES
+
+# PBKDF2-SHA256 rounds for the password verifiers that unlock offline mode.
+VERIFIER_ITERATIONS = 200_000
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    data: object
+
+
+class ResponseCache:
+    """GET responses stored in SQLite with their ETags, evicted least recently used first.
+    
+    Entries are keyed by user and URL, and those about one dataset also record its id,
+    so everything cached for a deleted dataset can be dropped at once. Bodies are stored
+    as zlib-compressed JSON, and the total is kept under ``max_bytes``.
+    
+    A salted PBKDF2 hash of each user's password at their last online login is kept as
+    well, so that their cached responses are only opened offline with the same password.
+    """
+    
+    def __init__(self, path: str, max_bytes: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                username TEXT NOT NULL,
+                url TEXT NOT NULL,
+                dataset_id INTEGER,
+                etag TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (username, url)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_dataset ON responses (username, dataset_id)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS verifiers (
+                username TEXT PRIMARY KEY,
+                salt BLOB NOT NULL,
+                hash BLOB NOT NULL
+            )
+        """)
+    
+    def get(self, username: str, url: str) -> Optional[CachedResponse]:
+        """Return the cached response for ``url`` and mark it as recently used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, body FROM responses WHERE username = ? AND url = ?", (username, url)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET last_used = ? WHERE username = ? AND url = ?",
+                (time.time(), username, url)
+            )
+        return CachedResponse(row[0], json.loads(zlib.decompress(row[1])))
+    
+    def put(self, username: str, url: str, etag: str, data, dataset_id: int = None):
+        """Store ``data`` for ``url``, then evict old entries if the cache is over its cap."""
+        body = zlib.compress(json.dumps(data).encode())
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (username, url, dataset_id, etag, body, len(body), time.time())
+            )
+            self._evict()
+    
+    def _evict(self):
+        excess = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for username, url, size in self._db.execute(
+            "SELECT username, url, size FROM responses ORDER BY last_used"
+        ):
+            victims.append((username, url))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM responses WHERE username = ? AND url = ?", victims)
+    
+    def drop_dataset(self, username: str, dataset_id: int):
+        """Forget every response cached for ``dataset_id``."""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM responses WHERE username = ? AND dataset_id = ?", (username, dataset_id)
+            )
+    
+    def retain_datasets(self, username: str, dataset_ids: Iterable[int]):
+        """Forget responses for datasets of ``username`` other than ``dataset_ids``."""
+        ids = list(dataset_ids)
+        placeholders = ", ".join("?" * len(ids))
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM responses WHERE username = ? AND dataset_id IS NOT NULL "
+                f"AND dataset_id NOT IN ({placeholders})",
+                (username, *ids)
+            )
+    
+    def remember_login(self, username: str, password: str):
+        """Store a fresh salted verifier of ``password``, after it logged ``username`` in online."""
+        salt = os.urandom(16)
+        digest = _verifier(password, salt)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO verifiers VALUES (?, ?, ?)", (username, salt, digest))
+    
+    def verify_login(self, username: str, password: str) -> bool:
+        """Whether ``password`` is the one ``username`` last logged in with online."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT salt, hash FROM verifiers WHERE username = ?", (username,)
+            ).fetchone()
+        return row is not None and hmac.compare_digest(_verifier(password, row[0]), row[1])
+    
+    def has_entries(self, username: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM responses WHERE username = ? LIMIT 1", (username,)
+            ).fetchone() is not None
+
+
+def _verifier(password: str, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, VERIFIER_ITERATIONS)
+
+
+def open_cache() -> Optional[ResponseCache]:
+    """Open the cache under ``CACHE_DIR``, or return None if it is disabled or unusable."""
+    if CACHE_MAX_BYTES <= 0:
+        return None
+    try:
+        return ResponseCache(os.path.join(CACHE_DIR, "responses.sqlite3"), CACHE_MAX_BYTES)
+    except (OSError, sqlite3.Error):
+        return None
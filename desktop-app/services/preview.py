@@ -0,0 +1,191 @@
+"""Local parsing of a CSV before it is uploaded, for a provisional view of the dataset.
+
+The columns are checked and typed the way the server's upload parser does, and the
+summary and histograms have the shapes of the API's ``summary``/``histogram`` responses,
+so the window can show them until the uploaded dataset arrives. Uses ``pandas`` when it
+is installed (and its multi-threaded ``pyarrow`` engine with ``pyarrow``), otherwise the
+``csv`` module with NumPy conversion.
+"""
+
+import bz2
+import csv
+import gzip
+import importlib.util
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # optional dependency
+    pd = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# CSV header -> API field, as in the server's upload parser.
+CSV_COLUMNS = {
+    "Equipment Name": "equipment_name",
+    "Type": "equipment_type",
+    "Flowrate": "flowrate",
+    "Pressure": "pressure",
+    "Temperature": "temperature",
+}
+PARAMETERS = ("flowrate", "pressure", "temperature")
+HISTOGRAM_BINS = 20
+
+
+class CsvPreviewError(ValueError):
+    """The file would be rejected by the server: a required column is missing or invalid."""
+
+
+def preview_csv(path: str, bins: int = HISTOGRAM_BINS) -> dict:
+    """Parse ``path`` and compute what the window shows for a dataset.
+    
+    Returns ``columns`` (``{field: values}`` in file order), ``summary`` and
+    ``histograms``, the latter keyed by ``(parameter, group_by_type)``.
+    """
+    columns = read_equipment_csv(path)
+    types, codes = type_codes(columns["equipment_type"])
+    return {
+        "columns": columns,
+        "summary": summarize(columns, types, codes),
+        "histograms": {
+            (parameter, group_by_type): histogram(columns, parameter, bins, types, codes, group_by_type)
+            for parameter in PARAMETERS
+            for group_by_type in (False, True)
+        },
+    }
+
+
+def read_equipment_csv(path: str) -> dict:
+    """Read the required columns of ``path`` (plain or compressed) as NumPy arrays.
+    
+    Raises ``CsvPreviewError`` for missing columns, non-numeric values or empty cells.
+    """
+    if pd is not None:
+        return _read_with_pandas(path)
+    with _open_text(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        _check_header(header)
+        positions = [header.index(name) for name in CSV_COLUMNS]
+        rows = [[row[i] if i < len(row) else "" for i in positions] for row in reader if row]
+    
+    columns = {}
+    for i, (name, field) in enumerate(CSV_COLUMNS.items()):
+        values = np.array([row[i] for row in rows], dtype=object)
+        empty = {field: int(np.count_nonzero(values == ""))}
+        if empty[field]:
+            raise CsvPreviewError(f"Empty values in required columns: {empty}")
+        if field in PARAMETERS:
+            try:
+                values = values.astype(np.float64)
+            except ValueError as e:
+                raise CsvPreviewError(f"{name}: {e}") from e
+        columns[field] = values
+    return columns
+
+
+def _read_with_pandas(path: str) -> dict:
+    header = pd.read_csv(path, nrows=0).columns
+    _check_header(header)
+    engine = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+    dtypes = {name: "float64" if field in PARAMETERS else "string" for name, field in CSV_COLUMNS.items()}
+    try:
+        frame = pd.read_csv(path, usecols=list(CSV_COLUMNS), dtype=dtypes, engine=engine)
+    except ValueError:
+        # pyarrow is stricter about quoting and malformed lines than the C parser.
+        try:
+            frame = pd.read_csv(path, usecols=list(CSV_COLUMNS), dtype=dtypes, engine="c")
+        except ValueError as e:
+            raise CsvPreviewError(str(e)) from e
+    frame = frame[list(CSV_COLUMNS)].rename(columns=CSV_COLUMNS)
+    empty = {column: int(count) for column, count in frame.isna().sum().items() if count}
+    if empty:
+        raise CsvPreviewError(f"Empty values in required columns: {empty}")
+    return {
+        field: frame[field].to_numpy(dtype=np.float64 if field in PARAMETERS else object)
+        for field in CSV_COLUMNS.values()
+    }
+
+
+def columns_from_rows(rows: list) -> dict:
+    """Equipment rows as returned by the API, as the arrays ``read_equipment_csv`` returns."""
+    return {
+        field: np.array([row[field] for row in rows], dtype=np.float64 if field in PARAMETERS else object)
+        for field in CSV_COLUMNS.values()
+    }
+
+
+def _check_header(header):
+    missing_cols = [col for col in CSV_COLUMNS if col not in header]
+    if missing_cols:
+        raise CsvPreviewError(f"Missing columns: {missing_cols}")
+
+
+def _open_text(path: str):
+    lower = path.lower()
+    if lower.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    if lower.endswith(".bz2"):
+        return bz2.open(path, "rt", newline="")
+    if lower.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is needed to read .zst files")
+        return zstandard.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def type_codes(values: np.ndarray):
+    """The distinct types in sorted order, and each row's index into them.
+    
+    ``np.unique`` sorts every row's string, which takes most of the time of a preview.
+    """
+    if pd is not None:
+        codes, types = pd.factorize(values, sort=True)
+        return np.asarray(types, dtype=object), codes
+    first_seen = {}
+    codes = np.fromiter(
+        (first_seen.setdefault(value, len(first_seen)) for value in values), dtype=np.intp, count=len(values)
+    )
+    types = np.array(list(first_seen), dtype=object)
+    order = np.argsort(types)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return types[order], rank[codes]
+
+
+def summarize(columns: dict, types: np.ndarray, codes: np.ndarray) -> dict:
+    """The dataset's ``summary``: row count, parameter averages and rows per type."""
+    count = len(columns["equipment_name"])
+    summary = {"total_count": count, "type_distribution": {
+        str(equipment_type): int(n) for equipment_type, n in zip(types, np.bincount(codes, minlength=len(types)))
+    }}
+    for parameter in PARAMETERS:
+        summary[f"avg_{parameter}"] = float(columns[parameter].mean()) if count else 0.0
+    return summary
+
+
+def histogram(columns: dict, parameter: str, bins: int, types: np.ndarray, codes: np.ndarray,
+              group_by_type: bool = False) -> dict:
+    """Equal-width binned counts of one parameter, computed like the server's ``histogram``."""
+    values = columns[parameter]
+    edges = np.histogram_bin_edges(values, bins)
+    bin_count = len(edges) - 1
+    index = np.searchsorted(edges, values, side="right") - 1
+    index[values == edges[-1]] = bin_count - 1
+    result = {
+        "parameter": parameter,
+        "edges": edges.tolist(),
+        "counts": np.bincount(index, minlength=bin_count).tolist(),
+        "total": int(len(values)),
+    }
+    if group_by_type:
+        grid = np.bincount(codes * bin_count + index, minlength=len(types) * bin_count)
+        result["groups"] = {
+            str(equipment_type): counts.tolist()
+            for equipment_type, counts in zip(types, grid.reshape(len(types), bin_count))
+        }
+    return result
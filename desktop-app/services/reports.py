@@ -0,0 +1,55 @@
+"""PDF reports rendered locally, with the layout the server's ``/datasets/<id>/report/`` uses.
+
+Both build the report with ``shared/reports.py`` at the repository root. Rendering runs
+in a separate process, so neither matplotlib nor reportlab holds the GIL of the GUI
+process while a large report is built. Needs ``reportlab``; without it
+``reports_available()`` is False and reports are always downloaded from the server.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+try:
+    from shared.reports import build_report
+except ImportError:  # optional dependency
+    build_report = None
+
+from services.api_client import RequestCancelled
+
+_executor = None
+
+
+def reports_available() -> bool:
+    return build_report is not None
+
+
+def generate_report(save_path: str, name: str, columns: dict, progress=None, cancelled=None) -> str:
+    """Render the report for a dataset's rows to ``save_path`` in the report process.
+    
+    ``columns`` maps each equipment field to its values, in upload order. The file only
+    appears once it is complete; once ``cancelled()`` returns True this stops waiting and
+    the partial output is discarded.
+    """
+    global _executor
+    if _executor is None:
+        # Spawned rather than forked: forking a process running Qt threads is unsafe.
+        _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    part_path = save_path + ".part"
+    future = _executor.submit(write_report, part_path, name, columns)
+    while True:
+        try:
+            future.result(timeout=0.1)
+            break
+        except TimeoutError:
+            if cancelled and cancelled():
+                future.add_done_callback(lambda _: os.path.exists(part_path) and os.remove(part_path))
+                raise RequestCancelled()
+    os.replace(part_path, save_path)
+    return save_path
+
+
+def write_report(path: str, name: str, columns: dict):
+    """Build the PDF report and write it to ``path``; runs in the report process."""
+    with open(path, "wb") as f:
+        f.write(build_report(name, columns).getbuffer())
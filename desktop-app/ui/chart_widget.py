@@ -1,15 +1,92 @@
 """Matplotlib chart widgets for PyQt5."""
 
+from typing import NamedTuple, Optional
+
+import numpy as np
+from PyQt5.QtCore import QTimer, pyqtSignal
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter, MaxNLocator
 import matplotlib
 matplotlib.use('Qt5Agg')
 
+# Muted slate colors matching the web frontend
+COLORS = ['#475569', '#64748b', '#94a3b8', '#334155', '#1e293b']
+# Parameter -> (label, color, marker)
+PARAMETER_STYLES = {
+    "flowrate": ("Flowrate", '#1e293b', 'o'),
+    "pressure": ("Pressure", '#94a3b8', 's'),
+    "temperature": ("Temperature", '#64748b', '^'),
+}
+# Above these many points in view, markers are dropped and equipment names no longer label the ticks.
+MARKER_LIMIT = 200
+NAME_LABEL_LIMIT = 30
+# Each scroll step zooms by this factor, down to this many rows in view.
+ZOOM_STEP = 1.25
+MIN_ZOOM_SPAN = 5
+# While zooming or panning, series are drawn at one column per this many pixels; once
+# that has paused for SETTLE_MS, at full detail with the y-axis refitted.
+MOVING_COLUMN_WIDTH = 2
+SETTLE_MS = 150
+# A settled view coarser than its pixel columns requests the rows in view plus this fraction
+# of the view on each side, so small pans stay within them; the server sends at most
+# SERIES_MAX_BUCKETS buckets.
+DETAIL_MARGIN = 0.5
+SERIES_MAX_BUCKETS = 10000
+
+
+def min_max_envelope(x: np.ndarray, low: np.ndarray, high: np.ndarray, step: int):
+    """Split a band into runs of ``step`` points and return each run's centre, minimum and maximum.
+    
+    A plain series is the band with ``low`` and ``high`` both the values. With one run per
+    pixel column, the band between the minima and maxima covers exactly the pixels the
+    full series would.
+    """
+    starts = np.arange(0, len(x), step)
+    ends = np.minimum(starts + step, len(x)) - 1
+    return (x[starts] + x[ends]) / 2, np.minimum.reduceat(low, starts), np.maximum.reduceat(high, starts)
+
+
+class Buckets(NamedTuple):
+    """Rows ``start:stop`` of a dataset in buckets of ``step`` rows.
+    
+    ``x`` holds the bucket centres, ``lows``/``highs`` each parameter's per-bucket minima and
+    maxima, and ``names`` the rows' names when buckets are single rows.
+    """
+    start: int
+    stop: int
+    step: int
+    x: np.ndarray
+    lows: dict
+    highs: dict
+    names: np.ndarray
+    
+    @classmethod
+    def from_series(cls, series: dict) -> "Buckets":
+        """The buckets of a dataset's ``series`` response."""
+        parameters = series["parameters"]
+        return cls(
+            series["start"], series["stop"], series["step"], np.asarray(series["x"], dtype=float),
+            {parameter: np.asarray(parameters[parameter]["min"], dtype=float) for parameter in PARAMETER_STYLES},
+            {parameter: np.asarray(parameters[parameter]["max"], dtype=float) for parameter in PARAMETER_STYLES},
+            np.asarray(series.get("names", []), dtype=object)
+        )
+    
+    def covers(self, first: int, last: int) -> bool:
+        """Whether rows ``first`` to ``last`` are all in the buckets."""
+        return self.start <= first and last < self.stop
+
 
 class ChartWidget(QWidget):
-    """Base widget for matplotlib charts."""
+    """Base widget for matplotlib charts.
+    
+    The axes and their styling are built once. Subclasses update their artists in place
+    and call ``redraw``, which schedules one repaint through ``draw_idle``; the layout is
+    only recomputed on resize or when tick labels change.
+    """
+    grid_axis = 'y'
+    grid_alpha = 0.2
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -20,116 +97,450 @@ class ChartWidget(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self.canvas)
+        
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_facecolor('white')
+        self.ax.tick_params(axis='both', labelsize=9, colors='#6b7280')
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.spines['left'].set_color('#e5e7eb')
+        self.ax.spines['bottom'].set_color('#e5e7eb')
+        self.ax.grid(True, axis=self.grid_axis, alpha=self.grid_alpha, linestyle='-',
+                    linewidth=0.5, color='#e5e7eb')
+        self.ax.set_axisbelow(True)
+        self.empty_text = self.ax.text(0.5, 0.5, "No data", transform=self.ax.transAxes,
+                                       ha='center', va='center', color='#9ca3af', fontsize=12)
+        self.canvas.mpl_connect('resize_event', lambda event: self.relayout())
+    
+    def set_labels(self, xlabel: str, ylabel: str, title: str):
+        self.ax.set_xlabel(xlabel, fontsize=11, color='#6b7280', fontweight=500)
+        self.ax.set_ylabel(ylabel, fontsize=11, color='#6b7280', fontweight=500)
+        self.ax.set_title(title, fontsize=13, color='#111827', fontweight=600, pad=15)
+    
+    def show_empty(self, empty: bool):
+        self.empty_text.set_visible(empty)
+    
+    def relayout(self):
+        """Fit the axes to the figure again, e.g. after a resize or new tick labels."""
+        self.figure.tight_layout()
+        self.redraw()
+    
+    def redraw(self):
+        self.canvas.draw_idle()
     
     def clear(self):
         """Clear the chart."""
-        self.figure.clear()
-        self.canvas.draw()
+        self.show_empty(True)
+        self.redraw()
 
 
 class TypeDistributionChart(ChartWidget):
     """Bar chart for equipment type distribution."""
     
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.types = []
+        self.bars = None
+        self.set_labels("Equipment Type", "Count", "Equipment Type Distribution")
+        self.ax.set_xticks([])
+    
     def update_chart(self, distribution: dict):
-        """Update the chart with new data."""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('white')
+        """Update the chart with new data; bars are resized in place when the types match."""
+        types = list(distribution.keys()) if distribution else []
+        counts = list(distribution.values()) if distribution else []
+        self.show_empty(not types)
         
-        if not distribution:
-            ax.text(0.5, 0.5, "No data", ha='center', va='center', 
-                   color='#9ca3af', fontsize=12)
-            self.canvas.draw()
-            return
+        if types == self.types and self.bars is not None:
+            for bar, count in zip(self.bars, counts):
+                bar.set_height(count)
+        else:
+            if self.bars is not None:
+                self.bars.remove()
+                self.bars = None
+            positions = range(len(types))
+            if types:
+                bar_colors = [COLORS[i % len(COLORS)] for i in positions]
+                self.bars = self.ax.bar(positions, counts, color=bar_colors, alpha=0.8,
+                                        edgecolor='white', linewidth=1.5)
+            self.ax.set_xticks(list(positions))
+            if len(types) > 4:
+                self.ax.set_xticklabels(types, rotation=45, ha='right')
+            else:
+                self.ax.set_xticklabels(types)
+            self.types = types
+            self.figure.tight_layout()
         
-        types = list(distribution.keys())
-        counts = list(distribution.values())
-        # Use muted slate colors matching web frontend
-        colors = ['#475569', '#64748b', '#94a3b8', '#334155', '#1e293b', 
-                 '#475569', '#64748b', '#94a3b8', '#334155', '#1e293b']
-        bar_colors = [colors[i % len(colors)] for i in range(len(types))]
-        
-        bars = ax.bar(types, counts, color=bar_colors, alpha=0.8, edgecolor='white', linewidth=1.5)
-        ax.set_xlabel("Equipment Type", fontsize=11, color='#6b7280', fontweight=500)
-        ax.set_ylabel("Count", fontsize=11, color='#6b7280', fontweight=500)
-        ax.set_title("Equipment Type Distribution", fontsize=13, color='#111827', 
-                    fontweight=600, pad=15)
-        
-        # Clean up tick labels
-        ax.tick_params(axis='both', labelsize=9, colors='#6b7280')
-        if len(types) > 4:
-            ax.set_xticklabels(types, rotation=45, ha='right')
-        
-        # Remove top and right spines for cleaner look
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('#e5e7eb')
-        ax.spines['bottom'].set_color('#e5e7eb')
-        
-        # Add subtle grid
-        ax.grid(True, axis='y', alpha=0.2, linestyle='-', linewidth=0.5, color='#e5e7eb')
-        ax.set_axisbelow(True)
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.redraw()
 
 
 class ParameterChart(ChartWidget):
-    """Line chart for equipment parameters."""
+    """Line chart for equipment parameters, zoomed with the scroll wheel and panned by dragging.
     
-    def update_chart(self, equipment: list):
-        """Update the chart with new data."""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_facecolor('white')
-        
-        if not equipment:
-            ax.text(0.5, 0.5, "No data", ha='center', va='center',
-                   color='#9ca3af', fontsize=12)
-            self.canvas.draw()
-            return
-        
-        names = [e["equipment_name"] for e in equipment]
-        flowrates = [e["flowrate"] for e in equipment]
-        pressures = [e["pressure"] for e in equipment]
-        temperatures = [e["temperature"] for e in equipment]
-        
-        x = range(len(names))
+    The chart plots a series of buckets of consecutive rows, each with the minimum and
+    maximum of every parameter: single rows for data at hand (``set_data``), or a dataset
+    reduced by the server (``set_series``), so its size does not depend on how many rows
+    the table has loaded. Only the buckets in view are drawn, at a level of detail matching
+    the axes width, and the y-axis fits them. Double-clicking returns to the overview of
+    every row.
+    
+    When a settled view has fewer rows per pixel column than the overview has per bucket,
+    the chart emits ``range_requested(start, stop, buckets)`` for finer buckets of the rows
+    around it, which are passed back to ``set_detail``. They are drawn while they cover the
+    view; zoomed out beyond them, the overview of the whole dataset is drawn again.
+    
+    While the view moves, each frame is blitted: the rest of the figure is rendered once into
+    a background, and only the x-axis and the series are redrawn over it, at a coarser level
+    of detail. The y-axis stays put until the movement pauses; then the figure is redrawn
+    in full.
+    """
+    grid_axis = 'both'
+    grid_alpha = 0.15
+    range_requested = pyqtSignal(int, int, int)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.total = 0
+        # Buckets of every row, and finer ones of the rows around a zoomed-in view, if any.
+        self.overview = Buckets(0, 0, 1, np.empty(0), {}, {}, np.empty(0, dtype=object))
+        self.detail: Optional[Buckets] = None
+        self.lines = {}
+        self.bands = {}
+        for parameter, (label, color, marker) in PARAMETER_STYLES.items():
+            self.lines[parameter], = self.ax.plot(
+                [], [], color=color, marker=marker, label=label, markersize=5, linewidth=2,
+                markeredgecolor='white', markeredgewidth=1.5
+            )
+            self.bands[parameter] = self.ax.fill_between(
+                [], [], [], facecolor=color, edgecolor=color, alpha=0.8, linewidth=1.5
+            )
+        self.set_labels("Equipment", "Value", "Equipment Parameters")
+        self.ax.xaxis.set_major_locator(MaxNLocator(nbins='auto', integer=True))
+        self.ax.xaxis.set_major_formatter(FuncFormatter(self.format_tick))
         
-        # Use muted colors matching web frontend
-        ax.plot(x, flowrates, color='#1e293b', marker='o', label='Flowrate', 
-               markersize=5, linewidth=2, markeredgecolor='white', markeredgewidth=1.5)
-        ax.plot(x, pressures, color='#94a3b8', marker='s', label='Pressure', 
-               markersize=5, linewidth=2, markeredgecolor='white', markeredgewidth=1.5)
-        ax.plot(x, temperatures, color='#64748b', marker='^', label='Temperature', 
-               markersize=5, linewidth=2, markeredgecolor='white', markeredgewidth=1.5)
+        # Clean legend; opaque, since moving frames stamp it back over the series
+        self.legend = self.ax.legend(loc='upper right', frameon=True, fancybox=False,
+                                     shadow=False, fontsize=9, framealpha=1)
+        self.legend.get_frame().set_facecolor('white')
+        self.legend.get_frame().set_edgecolor('#e5e7eb')
+        self.legend.get_frame().set_linewidth(1)
+        self.labelled = False
+        self.drag = None
+        self.background = None
+        self.legend_background = None
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(SETTLE_MS)
+        self.settle_timer.timeout.connect(self.settle)
         
-        ax.set_xticks(x)
-        ax.set_xticklabels(names, rotation=45, ha='right', fontsize=9, color='#6b7280')
-        ax.set_xlabel("Equipment", fontsize=11, color='#6b7280', fontweight=500)
-        ax.set_ylabel("Value", fontsize=11, color='#6b7280', fontweight=500)
-        ax.set_title("Equipment Parameters", fontsize=13, color='#111827', 
-                    fontweight=600, pad=15)
+        self.canvas.setToolTip("Scroll to zoom, drag to pan, double-click to show all rows")
+        self.canvas.mpl_connect('scroll_event', self.on_scroll)
+        self.canvas.mpl_connect('button_press_event', self.on_press)
+        self.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        self.canvas.mpl_connect('button_release_event', self.on_release)
+    
+    def update_chart(self, equipment: list):
+        """Update the chart with a list of equipment rows."""
+        self.set_data(
+            [e["equipment_name"] for e in equipment],
+            {parameter: [e[parameter] for e in equipment] for parameter in PARAMETER_STYLES}
+        )
+    
+    def set_data(self, names, values: dict):
+        """Plot one series per parameter from equal-length sequences (NumPy arrays are not copied)."""
+        count = len(names)
+        values = {parameter: np.asarray(values[parameter], dtype=float) for parameter in PARAMETER_STYLES}
+        self.set_overview(count, Buckets(0, count, 1, np.arange(count), values, values, np.asarray(names, dtype=object)))
+    
+    def set_series(self, series: dict):
+        """Plot a dataset's overview ``series`` response, bucketed by the server."""
+        self.set_overview(series["total"], Buckets.from_series(series))
+    
+    def set_overview(self, total: int, overview: Buckets):
+        """Plot the buckets of all ``total`` rows, and show every row."""
+        self.end_interaction()
+        self.total = total
+        self.overview = overview
+        self.detail = None
+        self.show_empty(len(overview.x) == 0)
+        self.reset_view()
+    
+    def set_detail(self, series: dict):
+        """Draw a ``series`` response for part of the dataset wherever it covers the view."""
+        if series["total"] != self.total:
+            return
+        self.detail = Buckets.from_series(series)
+        if self.background is None:
+            if self.labelled:
+                # Names replace the row numbers on the ticks.
+                self.figure.tight_layout()
+            self.update_lines()
+            self.redraw()
+    
+    def full_view(self):
+        return -0.5, max(self.total, 1) - 0.5
+    
+    def is_zoomed(self) -> bool:
+        return tuple(self.ax.get_xlim()) != self.full_view()
+    
+    def reset_view(self):
+        self.set_view(*self.full_view())
+    
+    def clamp_view(self, left: float, right: float):
+        """Keep a view within the data and at least ``MIN_ZOOM_SPAN`` rows wide."""
+        lower, upper = self.full_view()
+        span = min(max(right - left, MIN_ZOOM_SPAN), upper - lower)
+        left = min(max(left, lower), upper - span)
+        return left, left + span
+    
+    def set_view(self, left: float, right: float):
+        """Show rows ``left`` to ``right`` and fit the y-axis to them."""
+        self.end_interaction()
+        self.ax.set_xlim(*self.clamp_view(left, right))
+        self.update_ticks()
+        self.update_lines()
+        self.redraw()
+        self.request_detail()
+    
+    def move_view(self, left: float, right: float):
+        """Show rows ``left`` to ``right`` as one frame of an ongoing zoom or pan."""
+        self.ax.set_xlim(*self.clamp_view(left, right))
+        if self.update_ticks():
+            # The layout changed, so the background no longer matches.
+            self.end_interaction()
+        self.begin_interaction()
+        self.update_lines(fit_y=False, column_width=MOVING_COLUMN_WIDTH)
+        self.canvas.restore_region(self.background)
+        for artist in self.moving_artists():
+            self.ax.draw_artist(artist)
+        self.canvas.restore_region(self.legend_background)
+        self.canvas.blit(self.figure.bbox)
+        self.settle_timer.start()
+    
+    def moving_artists(self):
+        return [self.ax.xaxis, *self.bands.values(), *self.lines.values()]
+    
+    def begin_interaction(self):
+        """Render everything that stays still while the view moves, and keep it as the background."""
+        if self.background is not None:
+            return
+        for artist in self.moving_artists():
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.legend_background = self.canvas.copy_from_bbox(self.legend.get_window_extent())
+    
+    def end_interaction(self):
+        self.settle_timer.stop()
+        if self.background is None:
+            return
+        for artist in self.moving_artists():
+            artist.set_animated(False)
+        self.background = None
+        self.legend_background = None
+    
+    def settle(self):
+        """Refit the y-axis to the rows in view, redraw the whole figure and ask for more detail."""
+        self.end_interaction()
+        self.update_lines()
+        self.redraw()
+        self.request_detail()
+    
+    def visible_rows(self):
+        """First and last row in view."""
+        left, right = self.ax.get_xlim()
+        return max(int(np.ceil(left)), 0), min(int(np.floor(right)), self.total - 1)
+    
+    def buckets_in_view(self) -> Buckets:
+        """The detail buckets if they cover the view and are finer than the overview, else the overview."""
+        detail = self.detail
+        if detail is not None and detail.step < self.overview.step and detail.covers(*self.visible_rows()):
+            return detail
+        return self.overview
+    
+    def request_detail(self):
+        """Emit ``range_requested`` if the buckets in view are coarser than the pixel columns.
         
-        # Clean legend
-        legend = ax.legend(loc='upper right', frameon=True, fancybox=False, 
-                          shadow=False, fontsize=9)
-        legend.get_frame().set_facecolor('white')
-        legend.get_frame().set_edgecolor('#e5e7eb')
-        legend.get_frame().set_linewidth(1)
+        The range takes in ``DETAIL_MARGIN`` of the view on each side, in buckets as fine as
+        the columns.
+        """
+        first, last = self.visible_rows()
+        if last < first:
+            return
+        width = max(int(self.ax.bbox.width), 1)
+        step = -(-(last - first + 1) // width)
+        if self.buckets_in_view().step <= step:
+            return
+        margin = int((last - first + 1) * DETAIL_MARGIN)
+        start, stop = max(first - margin, 0), min(last + 1 + margin, self.total)
+        self.range_requested.emit(start, stop, min(-(-(stop - start) // step), SERIES_MAX_BUCKETS))
+    
+    def visible_buckets(self, buckets: Buckets):
+        """Index range of the buckets in view, plus one on each side so lines run off the edges."""
+        left, right = self.ax.get_xlim()
+        first = int(np.floor((left - buckets.start) / buckets.step))
+        last = int(np.ceil((right - buckets.start) / buckets.step)) + 1
+        return max(first, 0), min(max(last, 0), len(buckets.x))
+    
+    def update_lines(self, fit_y: bool = True, column_width: int = 1):
+        """Redraw the rows in view for the current axes width, and fit the y-axis to them.
         
-        # Clean up spines
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color('#e5e7eb')
-        ax.spines['bottom'].set_color('#e5e7eb')
+        When more than two buckets fall on each column of ``column_width`` pixels, each series
+        is drawn as a band between the minimum and maximum of every column's buckets. At one
+        pixel per column that covers the same pixels as the full line, which would zigzag
+        over each column's whole range and take far longer to rasterize. Columns are aligned
+        to multiples of their size, so panning shifts the band instead of regrouping the
+        buckets under it. Buckets of several rows are drawn as a band in any case.
+        """
+        width = max(int(self.ax.bbox.width) // column_width, 1)
+        buckets = self.buckets_in_view()
+        start, stop = self.visible_buckets(buckets)
+        step = -(-(stop - start) // width)
+        if step > 2:
+            start -= start % step
+        else:
+            step = 1
+        decimated = stop > start and (step > 1 or buckets.step > 1)
+        x = buckets.x[start:stop]
+        low, high = np.inf, -np.inf
+        for parameter, line in self.lines.items():
+            band = self.bands[parameter]
+            if decimated:
+                xs, lows, highs = min_max_envelope(
+                    x, buckets.lows[parameter][start:stop], buckets.highs[parameter][start:stop], step
+                )
+                band.set_verts([np.column_stack([
+                    np.concatenate([xs, xs[::-1]]), np.concatenate([highs, lows[::-1]])
+                ])])
+                line.set_data([], [])
+                low, high = min(low, lows.min()), max(high, highs.max())
+            else:
+                y = buckets.lows.get(parameter, buckets.x)[start:stop]
+                band.set_verts([])
+                line.set_data(x, y)
+                line.set_marker(PARAMETER_STYLES[parameter][2] if len(x) <= MARKER_LIMIT else 'None')
+                if len(y):
+                    low, high = min(low, y.min()), max(high, y.max())
+            band.set_visible(decimated)
+        if fit_y and low <= high:
+            margin = (high - low) * 0.05 or 1
+            self.ax.set_ylim(low - margin, high + margin)
+    
+    def update_ticks(self) -> bool:
+        """Label ticks with equipment names once few enough rows are in view, else with row numbers.
         
-        # Subtle grid
-        ax.grid(True, alpha=0.15, linestyle='-', linewidth=0.5, color='#e5e7eb')
-        ax.set_axisbelow(True)
+        Returns whether the labelling changed, which also refits the layout.
+        """
+        left, right = self.ax.get_xlim()
+        labelled = 0 < self.total and right - left <= NAME_LABEL_LIMIT
+        if labelled == self.labelled:
+            return False
+        if labelled:
+            self.ax.tick_params(axis='x', labelrotation=45)
+        else:
+            self.ax.tick_params(axis='x', labelrotation=0)
+        for label in self.ax.get_xticklabels():
+            label.set_ha('right' if labelled else 'center')
+        self.labelled = labelled
+        self.figure.tight_layout()
+        return True
+    
+    def format_tick(self, value: float, position=None) -> str:
+        row = int(round(value))
+        if not self.labelled:
+            return f"{row:,}"
+        if row != value:
+            return ""
+        for buckets in (self.detail, self.overview):
+            if buckets is not None and 0 <= row - buckets.start < len(buckets.names):
+                return str(buckets.names[row - buckets.start])
+        return f"{row:,}"
+    
+    def on_scroll(self, event):
+        """Zoom in or out around the row under the cursor."""
+        if event.inaxes is not self.ax or not self.total:
+            return
+        factor = 1 / ZOOM_STEP if event.button == 'up' else ZOOM_STEP
+        left, right = self.ax.get_xlim()
+        self.move_view(event.xdata - (event.xdata - left) * factor,
+                       event.xdata + (right - event.xdata) * factor)
+    
+    def on_press(self, event):
+        if event.inaxes is not self.ax or event.button != 1 or not self.total:
+            return
+        if event.dblclick:
+            self.reset_view()
+        else:
+            self.drag = (event.x, self.ax.get_xlim())
+    
+    def on_motion(self, event):
+        if self.drag is None:
+            return
+        x, (left, right) = self.drag
+        shift = (x - event.x) * (right - left) / self.ax.bbox.width
+        self.move_view(left + shift, right + shift)
+    
+    def on_release(self, event):
+        if self.drag is not None:
+            self.drag = None
+            if self.background is not None:
+                self.settle()
+    
+    def relayout(self):
+        self.end_interaction()
+        self.figure.tight_layout()
+        self.update_lines()
+        self.redraw()
+
+
+class HistogramChart(ChartWidget):
+    """Bar chart of server-side binned parameter counts."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.set_labels("", "Count", "Parameter Distribution")
+        self.bars = []
+    
+    def update_chart(self, histogram: dict):
+        """Update the chart with a histogram response; same-shaped bars are updated in place."""
+        edges = histogram.get("edges", []) if histogram else []
+        empty = len(edges) < 2 or not histogram.get("total")
+        self.show_empty(empty)
+        lefts = edges[:-1]
+        widths = [right - left for left, right in zip(edges[:-1], edges[1:])]
+        groups = None if empty else histogram.get("groups")
         
-        # Clean tick labels
-        ax.tick_params(axis='y', labelsize=9, colors='#6b7280')
+        if not empty and not groups and len(self.bars) == 1 and len(self.bars[0]) == len(lefts):
+            for bar, left, width, count in zip(self.bars[0], lefts, widths, histogram["counts"]):
+                bar.set_x(left)
+                bar.set_width(width)
+                bar.set_height(count)
+        else:
+            for bars in self.bars:
+                bars.remove()
+            self.bars = []
+            legend = self.ax.get_legend()
+            if legend is not None:
+                legend.remove()
+            if groups:
+                bottoms = [0] * len(lefts)
+                for i, (equipment_type, counts) in enumerate(groups.items()):
+                    self.bars.append(self.ax.bar(
+                        lefts, counts, width=widths, bottom=bottoms, align='edge',
+                        color=COLORS[i % len(COLORS)], alpha=0.8, edgecolor='white',
+                        linewidth=1, label=equipment_type
+                    ))
+                    bottoms = [b + c for b, c in zip(bottoms, counts)]
+                legend = self.ax.legend(loc='upper right', frameon=True, fancybox=False, fontsize=8)
+                legend.get_frame().set_edgecolor('#e5e7eb')
+            elif not empty:
+                self.bars.append(self.ax.bar(
+                    lefts, histogram["counts"], width=widths, align='edge',
+                    color='#64748b', alpha=0.8, edgecolor='white', linewidth=1
+                ))
         
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.ax.set_xlabel(histogram["parameter"].capitalize() if not empty else "")
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.redraw()
@@ -0,0 +1,235 @@
+"""Table model that pages a dataset's equipment rows in from the API as they are scrolled to."""
+
+from typing import Optional
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+from ui.workers import TaskRunner, request_client
+from utils.config import EQUIPMENT_CACHED_PAGES, EQUIPMENT_PAGE_SIZE
+
+# (header, API field, dtype); values are kept as one NumPy array per column.
+COLUMNS = [
+    ("Name", "equipment_name", object),
+    ("Type", "equipment_type", object),
+    ("Flowrate", "flowrate", np.float64),
+    ("Pressure", "pressure", np.float64),
+    ("Temperature", "temperature", np.float64),
+]
+# Shown in the cells of rows whose page has not arrived yet.
+LOADING_TEXT = "…"
+
+
+class EquipmentTableModel(QAbstractTableModel):
+    """Equipment rows of one dataset, stored column-wise and formatted only when displayed.
+    
+    The table has a row for every row of the dataset from the first page on, but only
+    holds the pages the view has asked for: a cell of a missing row shows a placeholder
+    and requests its page by index, and beyond ``max_pages`` the pages farthest from the
+    last one displayed are dropped, so memory stays bounded however far the view is
+    scrolled. Requests for pages the view has since left behind are cancelled. Sorting
+    refetches the rows in the requested order from the server.
+    
+    Rows that are not on the server (``show_rows``) are held whole and sorted locally.
+    """
+    page_loaded = pyqtSignal(int)
+    fetch_failed = pyqtSignal(object)
+    
+    def __init__(self, tasks: TaskRunner, page_size: int = EQUIPMENT_PAGE_SIZE,
+                 max_pages: int = EQUIPMENT_CACHED_PAGES, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.client = request_client()
+        self.page_size = page_size
+        self.max_pages = max(max_pages, 1)
+        self.dataset_id: Optional[int] = None
+        self.total = 0
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        # Bumped on every reload, so pages of an earlier dataset or ordering are dropped.
+        self._generation = 0
+        self._pending = set()
+        self._reset_rows()
+    
+    def _reset_rows(self):
+        self._cancel_pending()
+        self._generation += 1
+        # Page number -> one array per column.
+        self._pages = {}
+        self._pending = set()
+        # Pages whose fetch failed are not retried until the next reload.
+        self._failed = set()
+        self._viewed_page = 1
+        # Rows shown by ``show_rows``: the arrays, and the array row each table row shows.
+        self._local = None
+        self._order = np.empty(0, dtype=np.intp)
+    
+    def _cancel_pending(self):
+        for page in self._pending:
+            self.tasks.cancel(f"rows:{page}")
+    
+    def load(self, dataset_id: Optional[int]):
+        """Show the rows of ``dataset_id`` (nothing for None), fetching the first page."""
+        self.beginResetModel()
+        self.dataset_id = dataset_id
+        self.total = 0
+        self._reset_rows()
+        self.endResetModel()
+        if dataset_id is not None:
+            self._request_page(1)
+    
+    def show_rows(self, columns: dict):
+        """Show rows that are not on the server, such as those of a file being uploaded."""
+        self.beginResetModel()
+        self.dataset_id = None
+        self._reset_rows()
+        self._local = [np.asarray(columns[field], dtype=dtype) for _, field, dtype in COLUMNS]
+        self._order = np.arange(len(self._local[0]))
+        self.total = len(self._order)
+        self.endResetModel()
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+    
+    def held_rows(self, dataset_id: int) -> Optional[dict]:
+        """Every row of ``dataset_id`` in upload order, as ``{field: values}``, if the table holds them all.
+        
+        That is the case for a dataset of at most ``max_pages`` pages that has been
+        scrolled through unsorted; otherwise this returns None.
+        """
+        if dataset_id is None or dataset_id != self.dataset_id or self._sort_column >= 0:
+            return None
+        pages = range(1, max(-(-self.total // self.page_size), 1) + 1)
+        if any(page not in self._pages for page in pages):
+            return None
+        return {
+            field: np.concatenate([self._pages[page][column] for page in pages])
+            for column, (_, field, _) in enumerate(COLUMNS)
+        }
+    
+    def all_rows(self, **callbacks):
+        """Fetch every row of the dataset in upload order, as ``{field: values}``.
+        
+        Unless every page is cached, this transfers the whole dataset, so it runs as a
+        task of its own; ``callbacks`` (``on_result``, ``key``, ...) are passed to
+        ``TaskRunner.run``.
+        """
+        return self.tasks.run(self.client.get_all_rows, self.dataset_id, **callbacks)
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.total
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        if self._local is not None:
+            value = self._local[index.column()][self._order[index.row()]]
+        else:
+            page, offset = divmod(index.row(), self.page_size)
+            page += 1
+            columns = self._pages.get(page)
+            if columns is None:
+                self._view_page(page)
+                self._request_page(page)
+                return LOADING_TEXT
+            if page != self._viewed_page:
+                self._view_page(page)
+            value = columns[index.column()][offset]
+        return value if COLUMNS[index.column()][2] is object else f"{value:.2f}"
+    
+    def _view_page(self, page: int):
+        """Note that ``page`` is on screen, and drop requests for pages far from it."""
+        self._viewed_page = page
+        for pending in [p for p in self._pending if abs(p - page) > self.max_pages // 2]:
+            self.tasks.cancel(f"rows:{pending}")
+            self._pending.discard(pending)
+    
+    def _request_page(self, page: int):
+        if page in self._pending or page in self._failed or page in self._pages:
+            return
+        self._pending.add(page)
+        generation = self._generation
+        self.tasks.run(
+            self.client.get_equipment_page,
+            self.dataset_id,
+            page,
+            self.page_size,
+            self._ordering(),
+            key=f"rows:{page}",
+            on_result=lambda result: generation == self._generation and self._page_arrived(page, result),
+            on_error=lambda error: generation == self._generation and self._fetch_failed(page, error)
+        )
+    
+    def _ordering(self) -> Optional[str]:
+        """Server ordering for the current sort, with ``id`` breaking ties so pages are stable."""
+        if self._sort_column < 0:
+            return None
+        field = COLUMNS[self._sort_column][1]
+        prefix = "-" if self._sort_order == Qt.DescendingOrder else ""
+        return f"{prefix}{field},{prefix}id"
+    
+    def _page_arrived(self, page: int, result: dict):
+        self._pending.discard(page)
+        results = result["results"]
+        columns = [np.array([row[field] for row in results], dtype=dtype) for _, field, dtype in COLUMNS]
+        if result["count"] != self.total:
+            # The first page, or rows were added since the others were fetched: start over
+            # from this page, sized to the dataset.
+            self.beginResetModel()
+            self.total = result["count"]
+            self._pages = {page: columns}
+            self.endResetModel()
+        elif results:
+            self._pages[page] = columns
+            self._evict()
+            first = (page - 1) * self.page_size
+            self.dataChanged.emit(
+                self.index(first, 0), self.index(first + len(results) - 1, len(COLUMNS) - 1)
+            )
+        self.page_loaded.emit(page)
+    
+    def _evict(self):
+        """Drop the pages farthest from the one last displayed, down to ``max_pages``."""
+        while len(self._pages) > self.max_pages:
+            del self._pages[max(self._pages, key=lambda page: abs(page - self._viewed_page))]
+    
+    def _fetch_failed(self, page: int, error: Exception):
+        self._pending.discard(page)
+        first_failure = not self._failed
+        self._failed.add(page)
+        if first_failure:
+            self.fetch_failed.emit(error)
+    
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """Sort by ``column``; -1 restores upload order."""
+        self._sort_column = column
+        self._sort_order = order
+        if self.dataset_id is not None:
+            # The rows held are only a window of the dataset: let the server order all of it.
+            self.load(self.dataset_id)
+            return
+        if self._local is None:
+            return
+        
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        rows = [self._order[index.row()] for index in persistent]
+        if column < 0:
+            self._order = np.arange(len(self._order))
+        else:
+            self._order = np.argsort(self._local[column], kind="stable")
+            if order == Qt.DescendingOrder:
+                self._order = self._order[::-1]
+        position = np.empty_like(self._order)
+        position[self._order] = np.arange(len(self._order))
+        self.changePersistentIndexList(
+            persistent, [self.index(int(position[row]), index.column()) for row, index in zip(rows, persistent)]
+        )
+        self.layoutChanged.emit()
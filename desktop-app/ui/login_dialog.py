@@ -5,7 +5,9 @@ from PyQt5.QtWidgets import (
     QPushButton, QMessageBox, QTabWidget, QWidget, QFormLayout
 )
 from PyQt5.QtCore import Qt
+import requests
 from services.api_client import api_client
+from ui.workers import TaskRunner
 
 
 class LoginDialog(QDialog):
@@ -16,6 +18,7 @@ class LoginDialog(QDialog):
         self.setWindowTitle("Chemical Equipment Visualizer - Login")
         self.setFixedSize(400, 300)
         self.username = None
+        self.tasks = TaskRunner(self)
         self.setup_ui()
     
     def setup_ui(self):
@@ -105,9 +108,9 @@ class LoginDialog(QDialog):
         self.login_password.setEchoMode(QLineEdit.Password)
         layout.addRow("Password:", self.login_password)
         
-        login_btn = QPushButton("Login")
-        login_btn.clicked.connect(self.handle_login)
-        layout.addRow("", login_btn)
+        self.login_btn = QPushButton("Login")
+        self.login_btn.clicked.connect(self.handle_login)
+        layout.addRow("", self.login_btn)
         
         return widget
     
@@ -130,9 +133,9 @@ class LoginDialog(QDialog):
         self.reg_password.setEchoMode(QLineEdit.Password)
         layout.addRow("Password:", self.reg_password)
         
-        register_btn = QPushButton("Register")
-        register_btn.clicked.connect(self.handle_register)
-        layout.addRow("", register_btn)
+        self.register_btn = QPushButton("Register")
+        self.register_btn.clicked.connect(self.handle_register)
+        layout.addRow("", self.register_btn)
         
         return widget
     
@@ -145,12 +148,14 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Error", "Please fill in all fields")
             return
         
-        try:
-            data = api_client.login(username, password)
-            self.username = data["username"]
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Login Failed", "Invalid username or password")
+        self.set_busy(True)
+        self.tasks.run(
+            api_client.login,
+            username,
+            password,
+            on_result=self.authenticated,
+            on_error=lambda e: self.login_failed(username, password, e)
+        )
     
     def handle_register(self):
         """Handle register button click."""
@@ -166,9 +171,66 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "Error", "Password must be at least 6 characters")
             return
         
-        try:
-            data = api_client.register(username, email, password)
-            self.username = data["username"]
+        self.set_busy(True)
+        self.tasks.run(
+            api_client.register,
+            username,
+            email,
+            password,
+            on_result=self.authenticated,
+            on_error=lambda e: self.failed("Registration Failed", str(e))
+        )
+    
+    def set_busy(self, busy: bool):
+        """Disable the buttons while a request is in flight."""
+        self.login_btn.setEnabled(not busy)
+        self.register_btn.setEnabled(not busy)
+        self.login_btn.setText("Signing in..." if busy else "Login")
+    
+    def authenticated(self, data: dict):
+        self.username = data["username"]
+        # Loaded while the main window is being built.
+        api_client.prefetch_datasets()
+        self.accept()
+    
+    def reject(self):
+        # Closing the dialog mid-request must not accept it when the response arrives.
+        self.tasks.cancel_all()
+        super().reject()
+    
+    def login_failed(self, username: str, password: str, error: Exception):
+        """Offer the cached datasets read-only when the server cannot be reached.
+        
+        They only open with the password of the user's last online login on this machine.
+        """
+        if not isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            self.failed("Login Failed", "Invalid username or password")
+            return
+        self.set_busy(False)
+        answer = QMessageBox.question(
+            self, "Server Unreachable",
+            "The server cannot be reached. Browse your cached datasets offline (read-only)?"
+        )
+        if answer != QMessageBox.Yes:
+            return
+        # Checking the password takes a deliberately slow hash.
+        self.tasks.run(
+            api_client.work_offline,
+            username,
+            password,
+            on_result=lambda unlocked: self.offline_opened(username, unlocked)
+        )
+    
+    def offline_opened(self, username: str, unlocked: bool):
+        if unlocked:
+            self.username = username
             self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Registration Failed", str(e))
+        else:
+            QMessageBox.warning(
+                self, "Offline",
+                f"No cached data for {username}, or the password does not match their last login here."
+            )
+    
+    def failed(self, title: str, message: str):
+        self.set_busy(False)
+        QMessageBox.critical(self, title, message)
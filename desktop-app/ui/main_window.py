@@ -3,13 +3,22 @@
 import os
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
-    QPushButton, QLabel, QListWidget, QListWidgetItem, QTableWidget,
-    QTableWidgetItem, QFileDialog, QMessageBox, QGroupBox, QGridLayout,
-    QHeaderView
+    QPushButton, QLabel, QListWidget, QListWidgetItem, QTableView,
+    QFileDialog, QMessageBox, QGroupBox, QGridLayout,
+    QHeaderView, QComboBox, QCheckBox, QProgressBar
 )
-from PyQt5.QtCore import Qt
-from services.api_client import api_client
-from ui.chart_widget import TypeDistributionChart, ParameterChart
+from PyQt5.QtCore import Qt, QTimer
+from services.api_client import NotAvailableOffline, api_client
+from services.preview import PARAMETERS, CsvPreviewError, preview_csv
+from services.reports import generate_report, reports_available
+from ui.chart_widget import TypeDistributionChart, ParameterChart, HistogramChart
+from ui.equipment_table import EquipmentTableModel
+from ui.workers import TaskRunner, request_client
+from utils.config import RECONNECT_INTERVAL
+
+# Keys of transfers the Cancel button stops.
+TRANSFER_TASKS = ("upload", "download")
+OFFLINE_TEXT = "Offline: showing cached data (read-only)"
 
 
 class MainWindow(QMainWindow):
@@ -20,12 +29,25 @@ class MainWindow(QMainWindow):
         self.username = username
         self.current_dataset_id = None
         self.datasets = []
+        # Parsed locally from the file being uploaded, and shown until the upload completes.
+        self.preview = None
+        # Every API call runs on a pool thread, or as a task on the asyncio event loop when
+        # there is one; results come back through signals.
+        self.tasks = TaskRunner(self)
+        self.client = request_client()
         
         self.setWindowTitle(f"Chemical Equipment Visualizer - {username}")
         self.setMinimumSize(1400, 900)
         
         self.setup_ui()
+        self.setup_status_bar()
         self.load_datasets()
+        
+        # While offline, check now and then whether the server is back.
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setInterval(RECONNECT_INTERVAL * 1000)
+        self.reconnect_timer.timeout.connect(self.try_reconnect)
+        self.reconnect_timer.start()
     
     def setup_ui(self):
         """Set up the main UI."""
@@ -63,6 +85,74 @@ class MainWindow(QMainWindow):
         splitter.setSizes([300, 1100])
         main_layout.addWidget(splitter)
     
+    def setup_status_bar(self):
+        """Set up the status bar with activity text, a progress bar and a cancel button."""
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #64748b; font-size: 12px;")
+        self.statusBar().addWidget(self.status_label, 1)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.handle_cancel_transfer)
+        self.cancel_btn.hide()
+        self.statusBar().addPermanentWidget(self.cancel_btn)
+        
+        self.offline_label = QLabel(OFFLINE_TEXT)
+        self.offline_label.setStyleSheet("color: #b45309; font-size: 12px; font-weight: 500;")
+        self.offline_label.hide()
+        self.statusBar().addPermanentWidget(self.offline_label)
+        
+        self.tasks.busy_changed.connect(self.set_busy)
+        self.tasks.task_finished.connect(self.update_cancel_button)
+    
+    def set_busy(self, busy: bool):
+        """Show an indeterminate progress bar while any request is running."""
+        if busy:
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.show()
+        else:
+            self.progress_bar.hide()
+            self.status_label.clear()
+            self.update_offline_state()
+    
+    def load_failed(self, message: str, error: Exception):
+        """Report a failed read; offline, data that was never cached is just noted."""
+        if isinstance(error, NotAvailableOffline):
+            self.offline_label.setText("Offline: parts of this dataset were never cached")
+        else:
+            QMessageBox.warning(self, "Error", f"{message}: {error}")
+    
+    def update_offline_state(self):
+        """Disable everything that needs the server while the client is offline."""
+        offline = api_client.offline
+        self.offline_label.setVisible(offline)
+        self.upload_btn.setEnabled(not offline and not self.tasks.is_running("upload"))
+        self.pdf_btn.setEnabled(self.current_dataset_id is not None and (not offline or reports_available()))
+    
+    def try_reconnect(self):
+        """Go back online once the server answers again, and reload what is shown from it."""
+        if not api_client.offline or not api_client.token or self.tasks.is_running("reconnect"):
+            return
+        self.tasks.run(
+            self.client.reconnect,
+            key="reconnect",
+            on_result=lambda online: online and self.load_datasets(select_id=self.current_dataset_id)
+        )
+    
+    def update_cancel_button(self):
+        self.cancel_btn.setVisible(any(self.tasks.is_running(key) for key in TRANSFER_TASKS))
+    
+    def show_progress(self, done: int, total: int):
+        """Show byte progress of an upload or download (indeterminate if total is unknown)."""
+        if total:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(done * 1000 / total))
+    
     def create_header(self) -> QWidget:
         """Create the header bar."""
         header = QWidget()
@@ -132,8 +222,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(sidebar)
         
         # Upload section
-        upload_btn = QPushButton("Upload CSV File")
-        upload_btn.setStyleSheet("""
+        self.upload_btn = QPushButton("Upload CSV File")
+        self.upload_btn.setStyleSheet("""
             QPushButton {
                 background-color: #4f46e5;
                 color: white;
@@ -150,8 +240,8 @@ class MainWindow(QMainWindow):
                 background-color: #3730a3;
             }
         """)
-        upload_btn.clicked.connect(self.handle_upload)
-        layout.addWidget(upload_btn)
+        self.upload_btn.clicked.connect(self.handle_upload)
+        layout.addWidget(self.upload_btn)
         
         # Dataset list
         datasets_label = QLabel("Recent Datasets")
@@ -224,8 +314,26 @@ class MainWindow(QMainWindow):
         charts_layout.addWidget(self.type_chart)
         
         self.param_chart = ParameterChart()
+        self.param_chart.range_requested.connect(self.load_series_window)
         charts_layout.addWidget(self.param_chart)
         
+        # Histogram with its own parameter controls
+        histogram_layout = QVBoxLayout()
+        histogram_controls = QHBoxLayout()
+        self.histogram_param = QComboBox()
+        self.histogram_param.addItems(["Flowrate", "Pressure", "Temperature"])
+        self.histogram_param.currentIndexChanged.connect(self.load_histogram)
+        histogram_controls.addWidget(self.histogram_param)
+        self.histogram_by_type = QCheckBox("Group by type")
+        self.histogram_by_type.stateChanged.connect(self.load_histogram)
+        histogram_controls.addWidget(self.histogram_by_type)
+        histogram_controls.addStretch()
+        histogram_layout.addLayout(histogram_controls)
+        
+        self.histogram_chart = HistogramChart()
+        histogram_layout.addWidget(self.histogram_chart)
+        charts_layout.addLayout(histogram_layout)
+        
         layout.addLayout(charts_layout)
         
         # Data table with PDF button
@@ -233,6 +341,9 @@ class MainWindow(QMainWindow):
         table_label = QLabel("Equipment Data")
         table_label.setStyleSheet("font-size: 15px; font-weight: 600; color: #111827;")
         table_header.addWidget(table_label)
+        self.rows_label = QLabel()
+        self.rows_label.setStyleSheet("font-size: 12px; color: #6b7280;")
+        table_header.addWidget(self.rows_label)
         table_header.addStretch()
         
         self.pdf_btn = QPushButton("Download PDF Report")
@@ -260,77 +371,257 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(table_header)
         
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(5)
-        self.data_table.setHorizontalHeaderLabels([
-            "Name", "Type", "Flowrate", "Pressure", "Temperature"
-        ])
+        # Rows are paged in from the server as the table scrolls.
+        self.equipment_model = EquipmentTableModel(self.tasks, parent=self)
+        self.equipment_model.page_loaded.connect(self.equipment_page_loaded)
+        self.equipment_model.fetch_failed.connect(
+            lambda e: self.load_failed("Failed to load equipment", e)
+        )
+        self.data_table = QTableView()
+        self.data_table.setModel(self.equipment_model)
         self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # No sort indicator at first, so rows start in upload order.
+        self.data_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.data_table.setSortingEnabled(True)
         layout.addWidget(self.data_table)
         
         return content
     
-    def load_datasets(self):
-        """Load user's datasets from API."""
-        try:
-            self.datasets = api_client.get_datasets()
-            self.dataset_list.clear()
-            for ds in self.datasets:
-                item = QListWidgetItem(f"{ds['name']} ({ds['equipment_count']} items)")
-                item.setData(Qt.UserRole, ds['id'])
-                self.dataset_list.addItem(item)
-            
-            if self.datasets:
-                self.dataset_list.setCurrentRow(0)
-                self.load_dataset_detail(self.datasets[0]['id'])
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load datasets: {e}")
+    def load_datasets(self, select_id: int = None):
+        """Load user's datasets from API, then show ``select_id`` (or the newest)."""
+        self.tasks.run(
+            self.client.get_datasets,
+            key="datasets",
+            on_result=lambda datasets: self.show_datasets(datasets, select_id),
+            on_error=lambda e: QMessageBox.warning(self, "Error", f"Failed to load datasets: {e}")
+        )
+    
+    def show_datasets(self, datasets: list, select_id: int = None):
+        """Fill the dataset list and open the selected dataset."""
+        self.datasets = datasets
+        self.dataset_list.clear()
+        for ds in self.datasets:
+            item = QListWidgetItem(f"{ds['name']} ({ds['equipment_count']} items)")
+            item.setData(Qt.UserRole, ds['id'])
+            self.dataset_list.addItem(item)
+        
+        if self.datasets:
+            ids = [ds['id'] for ds in self.datasets]
+            row = ids.index(select_id) if select_id in ids else 0
+            self.dataset_list.setCurrentRow(row)
+            self.load_dataset_detail(ids[row])
+        else:
+            self.show_no_dataset()
+    
+    def show_no_dataset(self):
+        """Empty the summary, charts and table."""
+        self.end_preview()
+        self.current_dataset_id = None
+        self.show_dataset_detail({
+            'total_count': 0, 'avg_flowrate': 0, 'avg_pressure': 0, 'avg_temperature': 0,
+            'type_distribution': {}
+        })
+        self.equipment_model.load(None)
+        self.rows_label.clear()
+        self.param_chart.set_data([], {parameter: [] for parameter in PARAMETERS})
+        self.histogram_chart.update_chart({})
+        self.update_offline_state()
     
     def load_dataset_detail(self, dataset_id: int):
-        """Load and display dataset details."""
-        try:
-            self.current_dataset_id = dataset_id
-            dataset = api_client.get_dataset(dataset_id)
-            summary = api_client.get_summary(dataset_id)
-            
-            # Update summary
-            self.total_label.setText(str(summary['total_count']))
-            self.avg_flow_label.setText(f"{summary['avg_flowrate']:.2f}")
-            self.avg_press_label.setText(f"{summary['avg_pressure']:.2f}")
-            self.avg_temp_label.setText(f"{summary['avg_temperature']:.2f}")
-            
-            # Update charts
-            self.type_chart.update_chart(summary['type_distribution'])
-            self.param_chart.update_chart(dataset['equipment'])
-            
-            # Update table
-            equipment = dataset['equipment']
-            self.data_table.setRowCount(len(equipment))
-            for i, eq in enumerate(equipment):
-                self.data_table.setItem(i, 0, QTableWidgetItem(eq['equipment_name']))
-                self.data_table.setItem(i, 1, QTableWidgetItem(eq['equipment_type']))
-                self.data_table.setItem(i, 2, QTableWidgetItem(f"{eq['flowrate']:.2f}"))
-                self.data_table.setItem(i, 3, QTableWidgetItem(f"{eq['pressure']:.2f}"))
-                self.data_table.setItem(i, 4, QTableWidgetItem(f"{eq['temperature']:.2f}"))
-            
-            self.pdf_btn.setEnabled(True)
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load dataset: {e}")
+        """Load and display dataset details; any earlier, still-running load is dropped."""
+        self.end_preview()
+        self.current_dataset_id = dataset_id
+        self.status_label.setText("Loading dataset...")
+        self.offline_label.setText(OFFLINE_TEXT)
+        self.tasks.run(
+            self.client.get_summary,
+            dataset_id,
+            key="detail",
+            on_result=self.show_dataset_detail,
+            on_error=lambda e: self.load_failed("Failed to load dataset", e)
+        )
+        self.equipment_model.load(dataset_id)
+        self.tasks.cancel("series_window")
+        self.tasks.run(
+            self.client.get_series,
+            dataset_id,
+            key="series",
+            on_result=self.param_chart.set_series,
+            on_error=lambda e: self.load_failed("Failed to load parameter chart", e)
+        )
+        self.load_histogram()
+    
+    def show_dataset_detail(self, summary: dict):
+        """Display a dataset's summary."""
+        # Update summary
+        self.total_label.setText(str(summary['total_count']))
+        self.avg_flow_label.setText(f"{summary['avg_flowrate']:.2f}")
+        self.avg_press_label.setText(f"{summary['avg_pressure']:.2f}")
+        self.avg_temp_label.setText(f"{summary['avg_temperature']:.2f}")
+        
+        # Update charts
+        self.type_chart.update_chart(summary['type_distribution'])
+        
+        self.pdf_btn.setEnabled(not api_client.offline or reports_available())
+    
+    def load_series_window(self, start: int, stop: int, buckets: int):
+        """Fetch finer chart buckets for the rows around a zoomed-in view.
+        
+        A failure (e.g. offline, for a range never cached) just leaves the overview shown.
+        """
+        if self.preview is not None or not self.current_dataset_id:
+            return
+        dataset_id = self.current_dataset_id
+        self.tasks.run(
+            self.client.get_series,
+            dataset_id,
+            start,
+            stop,
+            buckets,
+            key="series_window",
+            on_result=lambda series: dataset_id == self.current_dataset_id and self.param_chart.set_detail(series)
+        )
+    
+    def equipment_page_loaded(self, page: int):
+        """Show the dataset's row count once the table knows it."""
+        self.rows_label.setText(f"{self.equipment_model.total:,} rows")
+    
+    def load_histogram(self):
+        """Fetch and display the histogram for the selected parameter."""
+        if self.preview is not None:
+            key = (self.histogram_param.currentText().lower(), self.histogram_by_type.isChecked())
+            self.histogram_chart.update_chart(self.preview["histograms"][key])
+            return
+        if not self.current_dataset_id:
+            return
+        self.tasks.run(
+            self.client.get_histogram,
+            self.current_dataset_id,
+            self.histogram_param.currentText().lower(),
+            group_by_type=self.histogram_by_type.isChecked(),
+            key="histogram",
+            on_result=self.histogram_chart.update_chart,
+            on_error=lambda e: self.load_failed("Failed to load histogram", e)
+        )
     
     def handle_upload(self):
-        """Handle CSV file upload."""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select CSV File", "", "CSV Files (*.csv)"
+        """Handle CSV file upload; several files go up as one batch."""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select CSV Files", "", "CSV Files (*.csv *.csv.gz *.csv.bz2 *.csv.zst)"
+        )
+        if len(file_paths) == 1:
+            self.start_upload(f"Uploading {os.path.basename(file_paths[0])}...")
+            self.tasks.run(
+                self.client.upload_csv,
+                file_paths[0],
+                key="upload",
+                on_progress=self.show_progress,
+                on_result=self.upload_finished,
+                on_error=self.upload_failed
+            )
+            self.update_cancel_button()
+            self.tasks.run(
+                preview_csv,
+                file_paths[0],
+                key="preview",
+                on_result=lambda preview: self.show_preview(file_paths[0], preview),
+                on_error=self.preview_failed
+            )
+        elif file_paths:
+            self.upload_batch(file_paths)
+    
+    def show_preview(self, file_path: str, preview: dict):
+        """Show the summary, charts and rows parsed from a file while it is still uploading.
+        
+        They stay until the upload completes and the new dataset is loaded from the server,
+        another dataset is selected, or the upload fails, which returns to the dataset that
+        was shown before.
+        """
+        if not self.tasks.is_running("upload"):
+            return
+        self.preview = preview
+        self.tasks.cancel("detail")
+        self.tasks.cancel("series")
+        self.tasks.cancel("series_window")
+        self.tasks.cancel("histogram")
+        self.dataset_list.clearSelection()
+        self.show_dataset_detail(preview["summary"])
+        self.pdf_btn.setEnabled(False)
+        columns = preview["columns"]
+        self.equipment_model.show_rows(columns)
+        self.rows_label.setText(f"{len(columns['equipment_name']):,} rows (preview, not uploaded yet)")
+        self.param_chart.set_data(
+            columns["equipment_name"], {parameter: columns[parameter] for parameter in PARAMETERS}
+        )
+        self.load_histogram()
+        self.status_label.setText(f"Uploading {os.path.basename(file_path)}; showing a local preview...")
+    
+    def preview_failed(self, error: Exception):
+        """Stop an upload the server would reject; other errors just mean no preview."""
+        if isinstance(error, CsvPreviewError) and self.tasks.is_running("upload"):
+            self.tasks.cancel("upload")
+            self.update_cancel_button()
+            self.upload_failed(error)
+    
+    def end_preview(self):
+        """Forget the upload preview, if one is shown or still being parsed."""
+        self.tasks.cancel("preview")
+        self.preview = None
+    
+    def start_upload(self, message: str):
+        self.upload_btn.setEnabled(False)
+        self.status_label.setText(message)
+    
+    def upload_finished(self, dataset: dict):
+        self.upload_btn.setEnabled(True)
+        self.load_datasets(select_id=dataset['id'])
+        QMessageBox.information(self, "Success", "File uploaded successfully!")
+    
+    def upload_failed(self, error: Exception):
+        self.upload_btn.setEnabled(True)
+        self.restore_after_preview()
+        QMessageBox.critical(self, "Upload Failed", str(error))
+    
+    def restore_after_preview(self):
+        """Show the dataset that was on screen before an upload's preview replaced it."""
+        previewing = self.preview is not None
+        self.end_preview()
+        if previewing:
+            self.show_datasets(self.datasets, self.current_dataset_id)
+    
+    def upload_batch(self, file_paths: list):
+        """Upload several files at once and report the outcome per file."""
+        self.start_upload(f"Uploading {len(file_paths)} files...")
+        self.tasks.run(
+            api_client.upload_batch,
+            file_paths,
+            key="upload",
+            on_progress=self.show_progress,
+            on_result=lambda batch: self.batch_finished(file_paths, batch),
+            on_error=self.upload_failed
         )
-        if file_path:
-            try:
-                dataset = api_client.upload_csv(file_path)
-                self.load_datasets()
-                self.load_dataset_detail(dataset['id'])
-                QMessageBox.information(self, "Success", "File uploaded successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Upload Failed", str(e))
+        self.update_cancel_button()
+    
+    def batch_finished(self, file_paths: list, batch: dict):
+        self.upload_btn.setEnabled(True)
+        uploaded = [r for r in batch["results"] if "dataset" in r]
+        failed = [r for r in batch["results"] if "error" in r]
+        retained = [r for r in uploaded if r["retained"]]
+        self.load_datasets(select_id=retained[-1]["dataset"]["id"] if retained else None)
+        
+        lines = [f"{len(uploaded)} of {len(file_paths)} files uploaded."]
+        dropped = len(uploaded) - len(retained)
+        if dropped:
+            lines.append(f"{dropped} older upload(s) from this batch were removed by the dataset limit.")
+        # Results come back in upload order; name files as the user picked them.
+        lines += [
+            f"{os.path.basename(path)}: {r['error']}"
+            for path, r in zip(file_paths, batch["results"]) if "error" in r
+        ]
+        if failed:
+            QMessageBox.warning(self, "Upload Finished With Errors", "\n".join(lines))
+        else:
+            QMessageBox.information(self, "Success", "\n".join(lines))
     
     def handle_dataset_select(self, item: QListWidgetItem):
         """Handle dataset selection from list."""
@@ -338,21 +629,92 @@ class MainWindow(QMainWindow):
         self.load_dataset_detail(dataset_id)
     
     def handle_download_pdf(self):
-        """Handle PDF report download."""
+        """Save the PDF report: rendered locally from every row of the dataset, else by the server.
+        
+        The rows are taken from the table if it holds them all, else from the cached pages
+        of the table, and only downloaded through the CSV export when neither has them.
+        """
         if not self.current_dataset_id:
             return
         
         save_path, _ = QFileDialog.getSaveFileName(
             self, "Save PDF Report", "equipment_report.pdf", "PDF Files (*.pdf)"
         )
-        if save_path:
-            try:
-                api_client.download_report(self.current_dataset_id, save_path)
-                QMessageBox.information(self, "Success", f"Report saved to {save_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Download Failed", str(e))
+        if not save_path:
+            return
+        if not reports_available():
+            self.download_report(save_path)
+            return
+        
+        dataset_id = self.current_dataset_id
+        rows = self.equipment_model.held_rows(dataset_id)
+        if rows is not None:
+            self.render_report(dataset_id, save_path, rows)
+            return
+        self.status_label.setText("Fetching rows for the report...")
+        self.equipment_model.all_rows(
+            key="download",
+            on_progress=self.show_progress,
+            on_result=lambda rows: self.render_report(dataset_id, save_path, rows),
+            on_error=lambda e: self.report_failed(dataset_id, save_path, e)
+        )
+        self.update_cancel_button()
+    
+    def render_report(self, dataset_id: int, save_path: str, rows: dict):
+        """Render the report locally from a dataset's rows."""
+        names = {ds['id']: ds['name'] for ds in self.datasets}
+        self.status_label.setText("Generating report...")
+        self.tasks.run(
+            generate_report,
+            save_path,
+            names.get(dataset_id, ""),
+            rows,
+            key="download",
+            on_progress=self.show_progress,
+            on_result=lambda _: self.report_saved(save_path),
+            on_error=lambda e: self.report_failed(dataset_id, save_path, e)
+        )
+        self.update_cancel_button()
+    
+    def download_report(self, save_path: str, dataset_id: int = None):
+        """Download the report rendered by the server."""
+        self.status_label.setText("Downloading report...")
+        self.tasks.run(
+            self.client.download_report,
+            dataset_id or self.current_dataset_id,
+            save_path,
+            key="download",
+            on_progress=self.show_progress,
+            on_result=lambda _: self.report_saved(save_path),
+            on_error=lambda e: QMessageBox.critical(self, "Download Failed", str(e))
+        )
+        self.update_cancel_button()
+    
+    def report_failed(self, dataset_id: int, save_path: str, error: Exception):
+        """Fall back to the server's report if rendering locally failed."""
+        if api_client.offline:
+            QMessageBox.critical(self, "Report Failed", str(error))
+        else:
+            self.download_report(save_path, dataset_id)
+    
+    def report_saved(self, save_path: str):
+        QMessageBox.information(self, "Success", f"Report saved to {save_path}")
+    
+    def handle_cancel_transfer(self):
+        """Stop running uploads and downloads."""
+        for key in TRANSFER_TASKS:
+            self.tasks.cancel(key)
+        self.restore_after_preview()
+        self.upload_btn.setEnabled(True)
+        self.update_cancel_button()
+        self.status_label.setText("Cancelled")
     
     def handle_logout(self):
         """Handle logout."""
-        api_client.logout()
-        self.close()
+        self.tasks.cancel_all()
+        self.tasks.run(api_client.logout, on_result=lambda _: self.close())
+    
+    def closeEvent(self, event):
+        # Results arriving after the window is gone must not touch its widgets.
+        self.tasks.cancel_all()
+        super().closeEvent(event)
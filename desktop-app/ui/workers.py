@@ -0,0 +1,210 @@
+"""Background workers that keep network calls off the GUI thread."""
+
+import asyncio
+import inspect
+import threading
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+try:
+    import qasync
+except ImportError:  # optional dependency
+    qasync = None
+
+from services.api_client import RequestCancelled, api_client
+from utils.config import MIN_TASK_THREADS
+
+_event_loop = None
+
+
+def install_event_loop(app) -> Optional[asyncio.AbstractEventLoop]:
+    """Run asyncio on the Qt event loop of ``app``, if qasync is installed.
+
+    Returns the loop, which must then be run with ``run_forever`` in place of
+    ``app.exec_()``, or None if coroutine tasks are unavailable.
+    """
+    global _event_loop
+    if qasync is not None and _event_loop is None:
+        _event_loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(_event_loop)
+    return _event_loop
+
+
+def event_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The asyncio loop installed by ``install_event_loop``, if any."""
+    return _event_loop
+
+
+def request_client():
+    """The API client for tasks: ``async_api_client`` when coroutine tasks can run, else ``api_client``."""
+    if _event_loop is None:
+        return api_client
+    # Imported here so that httpx is only loaded once the main window needs it.
+    from services.async_api_client import async_api_client
+    return async_api_client or api_client
+
+
+class WorkerSignals(QObject):
+    """Signals a worker emits; delivered to the GUI thread through queued connections."""
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    progress = pyqtSignal(object, object)
+    done = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """Runs ``fn(*args, **kwargs)`` on a pool thread and reports back through signals.
+
+    Cancelling a worker drops its result. Calls that accept ``progress``/``cancelled``
+    keywords (see ``TaskRunner.run``) also stop early between chunks.
+    """
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        # The runner keeps a reference until ``done``; let Python own the object's lifetime.
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            if self.is_cancelled():
+                return
+            result = self.fn(*self.args, **self.kwargs)
+            if not self.is_cancelled():
+                self.signals.result.emit(result)
+        except RequestCancelled:
+            pass
+        except Exception as e:
+            if not self.is_cancelled():
+                self.signals.error.emit(e)
+        finally:
+            self.signals.done.emit()
+
+
+class AsyncWorker:
+    """Runs the coroutine ``fn(*args, **kwargs)`` as a task on the Qt event loop.
+
+    It behaves like ``Worker``, but waiting on the network occupies no thread, and
+    cancelling it also cancels the task.
+    """
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.task = None
+        self._cancelled = False
+
+    def start(self):
+        self.task = _event_loop.create_task(self.run())
+        # Not in ``run``: a task cancelled before it starts never enters the coroutine.
+        self.task.add_done_callback(lambda task: self.signals.done.emit())
+
+    def cancel(self):
+        self._cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    async def run(self):
+        try:
+            result = await self.fn(*self.args, **self.kwargs)
+            if not self.is_cancelled():
+                self.signals.result.emit(result)
+        except (RequestCancelled, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            if not self.is_cancelled():
+                self.signals.error.emit(e)
+
+
+class TaskRunner(QObject):
+    """Starts workers on a thread pool and tracks them for cancellation and progress.
+
+    Coroutine functions, such as the methods of ``async_api_client``, run as tasks on the
+    event loop from ``install_event_loop`` instead. A task started with a ``key``
+    supersedes any running task with the same key, so clicking through datasets quickly
+    only ever shows the last one.
+    """
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(object, object)
+    task_finished = pyqtSignal(object)
+
+    def __init__(self, parent: Optional[QObject] = None, pool: Optional[QThreadPool] = None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.pool.setMaxThreadCount(max(self.pool.maxThreadCount(), MIN_TASK_THREADS))
+        self._active = set()
+        self._keyed = {}
+
+    def run(self, fn: Callable, *args, on_result: Callable = None, on_error: Callable = None,
+            on_progress: Callable = None, key: str = None, **kwargs):
+        """Run ``fn`` in the background; callbacks are invoked on the GUI thread.
+
+        With ``on_progress``, ``fn`` is also passed ``progress(done, total)`` and
+        ``cancelled()`` keyword arguments.
+        """
+        if key is not None:
+            self.cancel(key)
+        coroutine = inspect.iscoroutinefunction(fn)
+        worker = (AsyncWorker if coroutine else Worker)(fn, *args, **kwargs)
+        if on_progress is not None:
+            worker.kwargs["progress"] = worker.signals.progress.emit
+            worker.kwargs["cancelled"] = worker.is_cancelled
+            worker.signals.progress.connect(on_progress)
+        worker.signals.progress.connect(self.progress)
+        # Checked again on the GUI thread: a task may be superseded after its result was
+        # emitted but before the queued signal is delivered.
+        if on_result is not None:
+            worker.signals.result.connect(lambda result: worker.is_cancelled() or on_result(result))
+        if on_error is not None:
+            worker.signals.error.connect(lambda error: worker.is_cancelled() or on_error(error))
+        worker.signals.done.connect(lambda: self._finished(worker, key))
+
+        self._active.add(worker)
+        if key is not None:
+            self._keyed[key] = worker
+        if len(self._active) == 1:
+            self.busy_changed.emit(True)
+        if coroutine:
+            worker.start()
+        else:
+            self.pool.start(worker)
+        return worker
+
+    def cancel(self, key: str):
+        """Cancel the running task started with ``key``, if any."""
+        worker = self._keyed.pop(key, None)
+        if worker is not None:
+            worker.cancel()
+
+    def cancel_all(self):
+        for worker in self._active:
+            worker.cancel()
+        self._keyed.clear()
+
+    def is_running(self, key: str) -> bool:
+        return key in self._keyed
+
+    def _finished(self, worker, key: Optional[str]):
+        self._active.discard(worker)
+        if key is not None and self._keyed.get(key) is worker:
+            del self._keyed[key]
+        self.task_finished.emit(key)
+        if not self._active:
+            self.busy_changed.emit(False)
@@ -1,3 +1,51 @@
 """Configuration settings for the desktop app."""
 
+import os
+
 API_BASE_URL = "http://localhost:8000/api"
+
+# Uploads: plain CSVs are gzipped before sending; anything larger than the threshold
+# (after compression) goes through the resumable chunked-upload protocol. Multipart
+# uploads are streamed from disk in blocks of UPLOAD_STREAM_BLOCK_SIZE bytes.
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+UPLOAD_CHUNK_RETRIES = 3
+UPLOAD_STREAM_BLOCK_SIZE = 256 * 1024
+
+# HTTP: one keep-alive connection pool shared by all requests. Parallel reads go through a
+# small thread pool; timeouts are (connect, read) seconds, with a longer read timeout for
+# uploads, which the server answers only after parsing and storing the file.
+HTTP_POOL_SIZE = 10
+HTTP_MAX_PARALLEL = 4
+HTTP_TIMEOUT = (5, 60)
+UPLOAD_TIMEOUT = (5, 600)
+
+# Background tasks of the window (requests, parsing an upload's preview, reports) run on
+# Qt's thread pool, given at least this many threads however few cores there are: most
+# tasks wait on the network, and a long upload must not hold up everything else.
+MIN_TASK_THREADS = 8
+
+# Equipment table: rows are fetched page by page as the table is scrolled (server maximum 1000),
+# and only the EQUIPMENT_CACHED_PAGES pages nearest the visible rows are kept in memory.
+EQUIPMENT_PAGE_SIZE = 1000
+EQUIPMENT_CACHED_PAGES = 20
+
+# Parameter chart: the server reduces a dataset to at most this many min/max buckets for the
+# overview (server maximum 10000), independently of the rows loaded into the table.
+SERIES_BUCKETS = 2000
+
+# Offline cache: API responses are kept on disk with their ETags, so revisiting a dataset only
+# revalidates it, and cached datasets stay readable while the server is unreachable. The least
+# recently used entries are evicted beyond CACHE_MAX_BYTES (0 disables the cache).
+CACHE_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "chemical-equipment-visualizer"
+)
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Connectivity: a request that cannot reach the server is answered from the cache, and the app
+# only goes offline once a quick health probe of the API root fails too. While offline, the
+# server is probed again at most every RECONNECT_INTERVAL seconds, and the app goes back online
+# as soon as it answers.
+HEALTH_CHECK_TIMEOUT = (2, 5)
+RECONNECT_INTERVAL = 15
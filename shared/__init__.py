@@ -0,0 +1,5 @@
+"""Code used by both the Django backend and the desktop app.
+
+Neither app is installed as a package, so each puts the repository root on ``sys.path``
+(``server/settings.py`` and ``desktop-app/main.py``) to import from here.
+"""
@@ -0,0 +1,189 @@
+"""The dataset PDF report, as served by the backend and rendered locally by the desktop app.
+
+Works on plain columns (``{field: values}`` in upload order) so it needs neither Django
+nor Qt. Charts are drawn on standalone matplotlib figures rather than through pyplot,
+which keeps rendering safe on server worker threads.
+"""
+
+import io
+from collections import Counter
+from contextlib import nullcontext
+
+import numpy as np
+from matplotlib.figure import Figure
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+FIELDS = ["equipment_name", "equipment_type", "flowrate", "pressure", "temperature"]
+
+
+def _no_phase(name):
+    return nullcontext()
+
+
+def _png(figure) -> io.BytesIO:
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=150, bbox_inches="tight", facecolor="white", edgecolor="none")
+    buffer.seek(0)
+    return buffer
+
+
+def _style_axes(ax, ylabel: str, title: str):
+    ax.set_ylabel(ylabel, fontsize=10, color="#334155")
+    ax.set_title(title, fontsize=14, fontweight="bold", color="#1e293b", pad=15)
+    ax.tick_params(axis="y", labelsize=8, colors="#64748b")
+    ax.tick_params(axis="x", colors="#64748b")
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_color("#cbd5e1")
+    ax.spines["bottom"].set_color("#cbd5e1")
+    ax.set_facecolor("#f8fafc")
+
+
+def type_distribution_chart(type_distribution: dict) -> io.BytesIO:
+    """Render the type distribution bar chart as a PNG buffer."""
+    figure = Figure(figsize=(7, 3.5), facecolor="#ffffff")
+    ax = figure.add_subplot(111)
+    types = list(type_distribution.keys())
+    ax.bar(types, list(type_distribution.values()), color=["#64748b"] * len(types),
+           edgecolor="#334155", linewidth=0.5)
+    _style_axes(ax, "Count", "Equipment Type Distribution")
+    ax.set_xticks(range(len(types)))
+    ax.set_xticklabels(types, rotation=45, ha="right", fontsize=8)
+    figure.tight_layout()
+    return _png(figure)
+
+
+def parameter_chart(columns: dict) -> io.BytesIO:
+    """Render the per-equipment parameter line chart as a PNG buffer."""
+    figure = Figure(figsize=(7, 3.5), facecolor="#ffffff")
+    ax = figure.add_subplot(111)
+    x = np.arange(len(columns["equipment_name"]))
+    ax.plot(x, columns["flowrate"], marker="s", label="Flowrate", color="#64748b", linewidth=2, markersize=6)
+    ax.plot(x, columns["pressure"], marker="s", label="Pressure", color="#94a3b8", linewidth=2, markersize=6)
+    ax.plot(x, columns["temperature"], marker="o", label="Temperature", color="#1e293b", linewidth=2, markersize=6)
+    _style_axes(ax, "Value", "Equipment Parameters")
+    ax.set_xticks(x)
+    ax.set_xticklabels(columns["equipment_name"], rotation=45, ha="right", fontsize=7)
+    ax.legend(loc="upper right", fontsize=8, framealpha=0.9)
+    ax.grid(True, linestyle="--", alpha=0.3, color="#cbd5e1")
+    figure.tight_layout()
+    return _png(figure)
+
+
+def build_report(name: str, columns: dict, phase=_no_phase) -> io.BytesIO:
+    """Build the PDF report for a dataset's rows and return it as a buffer.
+
+    ``phase(name)`` returns a context manager timing each step (``aggregation``,
+    ``chart_render``, ``pdf_build``); the backend passes its request instrumentation.
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch
+    )
+    elements = []
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontSize=24,
+        spaceAfter=20,
+        textColor=colors.HexColor("#1e293b"),
+        alignment=TA_CENTER
+    )
+    heading_style = ParagraphStyle(
+        "CustomHeading",
+        parent=styles["Heading2"],
+        fontSize=16,
+        spaceBefore=20,
+        spaceAfter=10,
+        textColor=colors.HexColor("#334155")
+    )
+
+    elements.append(Paragraph(f"Equipment Report: {name}", title_style))
+    elements.append(Spacer(1, 10))
+
+    count = len(columns["equipment_name"])
+    if count:
+        with phase("aggregation"):
+            # Types in order of first appearance.
+            type_distribution = dict(Counter(columns["equipment_type"]))
+            averages = [
+                sum(float(value) for value in columns[field]) / count
+                for field in ("flowrate", "pressure", "temperature")
+            ]
+        summary_data = [
+            ["Total Equipment", "Avg Flowrate", "Avg Pressure", "Avg Temperature"],
+            [str(count)] + [f"{average:.2f}" for average in averages]
+        ]
+        summary_table = Table(summary_data, colWidths=[1.8*inch]*4)
+        summary_table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e293b")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("BACKGROUND", (0, 1), (-1, 1), colors.HexColor("#f1f5f9")),
+            ("TEXTCOLOR", (0, 1), (-1, 1), colors.HexColor("#1e293b")),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTNAME", (0, 1), (-1, 1), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 10),
+            ("FONTSIZE", (0, 1), (-1, 1), 18),
+            ("TOPPADDING", (0, 0), (-1, -1), 12),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+            ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#cbd5e1")),
+            ("LINEBEFORE", (1, 0), (1, -1), 1, colors.HexColor("#cbd5e1")),
+            ("LINEBEFORE", (2, 0), (2, -1), 1, colors.HexColor("#cbd5e1")),
+            ("LINEBEFORE", (3, 0), (3, -1), 1, colors.HexColor("#cbd5e1")),
+        ]))
+        elements.append(summary_table)
+        elements.append(Spacer(1, 20))
+
+        with phase("chart_render"):
+            chart = type_distribution_chart(type_distribution)
+        elements.append(Image(chart, width=6.5*inch, height=3*inch))
+        elements.append(Spacer(1, 15))
+
+        if count > 1:
+            with phase("chart_render"):
+                chart = parameter_chart(columns)
+            elements.append(Image(chart, width=6.5*inch, height=3*inch))
+            elements.append(Spacer(1, 20))
+
+    elements.append(Paragraph("Equipment Data", heading_style))
+    table_data = [["Name", "Type", "Flowrate", "Pressure", "Temperature"]]
+    for row in zip(*(columns[field] for field in FIELDS)):
+        table_data.append([row[0], row[1], f"{row[2]:.2f}", f"{row[3]:.2f}", f"{row[4]:.2f}"])
+
+    table = Table(table_data, colWidths=[2*inch, 1.5*inch, 1*inch, 1*inch, 1*inch])
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e293b")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 10),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("TOPPADDING", (0, 0), (-1, -1), 8),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f8fafc")),
+        ("TEXTCOLOR", (0, 1), (-1, -1), colors.HexColor("#334155")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.HexColor("#f8fafc"), colors.HexColor("#f1f5f9")]),
+        ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#cbd5e1")),
+        ("LINEBELOW", (0, 0), (-1, 0), 2, colors.HexColor("#1e293b")),
+        ("LINEBELOW", (0, 1), (-1, -2), 0.5, colors.HexColor("#e2e8f0")),
+    ]))
+    elements.append(table)
+
+    with phase("pdf_build"):
+        doc.build(elements)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,135 @@
+import { useEffect, useState } from 'react';
+import { Bar } from 'react-chartjs-2';
+import {
+  Chart as ChartJS,
+  CategoryScale,
+  LinearScale,
+  BarElement,
+  Title,
+  Tooltip,
+  Legend,
+} from 'chart.js';
+import { datasetApi } from '../../services/api';
+import type { Histogram, Parameter } from '../../types';
+
+ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend);
+
+interface HistogramChartProps {
+  datasetId: number;
+}
+
+const PARAMETERS: { value: Parameter; label: string }[] = [
+  { value: 'flowrate', label: 'Flowrate' },
+  { value: 'pressure', label: 'Pressure' },
+  { value: 'temperature', label: 'Temperature' },
+];
+
+const palette = [
+  'rgba(79, 70, 229, 0.75)',
+  'rgba(100, 116, 139, 0.75)',
+  'rgba(51, 65, 85, 0.75)',
+  'rgba(148, 163, 184, 0.75)',
+  'rgba(99, 102, 241, 0.75)',
+  'rgba(129, 140, 248, 0.75)',
+];
+
+export default function HistogramChart({ datasetId }: HistogramChartProps) {
+  const [parameter, setParameter] = useState<Parameter>('flowrate');
+  const [groupByType, setGroupByType] = useState(false);
+  const [histogram, setHistogram] = useState<Histogram | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    datasetApi
+      .getHistogram(datasetId, parameter, 20, groupByType)
+      .then((data) => {
+        if (!cancelled) setHistogram(data);
+      })
+      .catch((err) => console.error('Failed to fetch histogram:', err));
+    return () => {
+      cancelled = true;
+    };
+  }, [datasetId, parameter, groupByType]);
+
+  const edges = histogram?.edges ?? [];
+  const labels = edges.slice(0, -1).map((left, i) => `${left.toFixed(1)}–${edges[i + 1].toFixed(1)}`);
+  const groups = histogram?.groups;
+
+  const data = {
+    labels,
+    datasets: groups
+      ? Object.entries(groups).map(([type, counts], i) => ({
+          label: type,
+          data: counts,
+          backgroundColor: palette[i % palette.length],
+          stack: 'types',
+        }))
+      : [
+          {
+            label: 'Count',
+            data: histogram?.counts ?? [],
+            backgroundColor: palette[0],
+          },
+        ],
+  };
+
+  const options = {
+    responsive: true,
+    maintainAspectRatio: false,
+    plugins: {
+      legend: { display: Boolean(groups) },
+      title: {
+        display: true,
+        text: 'Parameter Distribution',
+        font: { size: 14, weight: 'bold' as const },
+        color: '#0f172a',
+        padding: { bottom: 16 },
+      },
+    },
+    scales: {
+      x: {
+        stacked: Boolean(groups),
+        grid: { display: false },
+        ticks: {
+          font: { size: 11 },
+          color: '#64748b',
+          maxRotation: 45,
+        },
+      },
+      y: {
+        stacked: Boolean(groups),
+        beginAtZero: true,
+        grid: { color: '#f1f5f9' },
+        ticks: {
+          font: { size: 11 },
+          color: '#64748b',
+        },
+      },
+    },
+  };
+
+  return (
+    <div>
+      <div className="histogram-controls">
+        <select value={parameter} onChange={(e) => setParameter(e.target.value as Parameter)}>
+          {PARAMETERS.map((p) => (
+            <option key={p.value} value={p.value}>
+              {p.label}
+            </option>
+          ))}
+        </select>
+        <label>
+          <input
+            type="checkbox"
+            checked={groupByType}
+            onChange={(e) => setGroupByType(e.target.checked)}
+          />
+          Group by type
+        </label>
+      </div>
+      <div style={{ height: '300px' }}>
+        <Bar data={data} options={options} />
+      </div>
+    </div>
+  );
+}
@@ -3,6 +3,7 @@ import { datasetApi } from '../../services/api';
 import type { Dataset, Summary } from '../../types';
 import TypeDistributionChart from '../Charts/TypeDistributionChart';
 import ParameterChart from '../Charts/ParameterChart';
+import HistogramChart from '../Charts/HistogramChart';
 import './Dashboard.css';
 
 interface DatasetDetailProps {
@@ -89,6 +90,9 @@ export default function DatasetDetail({ datasetId }: DatasetDetailProps) {
         <div className="chart-wrapper">
           <ParameterChart equipment={dataset.equipment} />
         </div>
+        <div className="chart-wrapper">
+          <HistogramChart datasetId={datasetId} />
+        </div>
       </div>
 
       <div className="data-table-container">
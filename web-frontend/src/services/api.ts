@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { AuthResponse, DatasetListItem, Dataset, Summary } from '../types';
+import type { AuthResponse, DatasetListItem, Dataset, Summary, Histogram, Parameter, AppendResult } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'https://chemical-equipment-visualizer-tiu4.onrender.com/api';
 
@@ -60,6 +60,16 @@ export const datasetApi = {
     return response.data;
   },
 
+  append: async (id: number, file: File): Promise<AppendResult> => {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('dataset', String(id));
+    const response = await api.post('/upload/', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  },
+
   list: async (): Promise<DatasetListItem[]> => {
     const response = await api.get('/datasets/');
     return response.data;
@@ -75,6 +85,18 @@ export const datasetApi = {
     return response.data;
   },
 
+  getHistogram: async (
+    id: number,
+    parameter: Parameter,
+    bins = 20,
+    groupByType = false,
+  ): Promise<Histogram> => {
+    const response = await api.get(`/datasets/${id}/histogram/`, {
+      params: { parameter, bins, ...(groupByType ? { group_by: 'type' } : {}) },
+    });
+    return response.data;
+  },
+
   downloadReport: async (id: number, filename: string): Promise<void> => {
     const response = await api.get(`/datasets/${id}/report/`, {
       responseType: 'blob',
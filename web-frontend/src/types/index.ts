@@ -22,6 +22,7 @@ export interface DatasetListItem {
   id: number;
   name: string;
   uploaded_at: string;
+  revision: number;
   equipment_count: number;
 }
 
@@ -29,6 +30,7 @@ export interface Dataset {
   id: number;
   name: string;
   uploaded_at: string;
+  revision: number;
   file: string;
   equipment: Equipment[];
 }
@@ -39,4 +41,30 @@ export interface Summary {
   avg_pressure: number;
   avg_temperature: number;
   type_distribution: Record<string, number>;
+  parameters: Record<Parameter, ParameterSummary>;
+}
+
+export interface ParameterSummary {
+  mean: number;
+  std: number | null;
+  min: number;
+  max: number;
+}
+
+export interface AppendResult {
+  dataset_id: number;
+  revision: number;
+  appended: number;
+  total_count: number;
+}
+
+export type Parameter = 'flowrate' | 'pressure' | 'temperature';
+
+export interface Histogram {
+  dataset_id: number;
+  parameter: Parameter;
+  edges: number[];
+  counts: number[];
+  total: number;
+  groups?: Record<string, number[]>;
 }